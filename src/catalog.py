@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+CATALOG_FILE = "catalog.db"
+
+# Metadata files written by older versions of PyLytics, imported on first use
+LEGACY_METADATA_FILE = "metadata.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    type TEXT NOT NULL DEFAULT 'dataset',
+    parent TEXT,
+    storage_format TEXT,
+    rows INTEGER,
+    columns INTEGER,
+    version INTEGER,
+    last_modified TEXT,
+    revision INTEGER NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datasets_parent ON datasets (parent);
+CREATE INDEX IF NOT EXISTS datasets_type ON datasets (type);
+CREATE TABLE IF NOT EXISTS catalog_state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    revision INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_state (id, revision) VALUES (0, 0);
+"""
+
+
+class Catalog:
+    """
+    SQLite catalog of dataset metadata.
+
+    Every dataset's metadata entry (the same dictionary metadata.json used to
+    hold) is one row, so saving a change writes that row only, inside a
+    transaction, instead of rewriting the whole file. The database runs in
+    WAL mode: any number of processes can read while one writes, and a
+    writer waits for another instead of overwriting its changes.
+
+    The columns that are looked up (type, parent, format, sizes, version)
+    are stored next to the JSON entry and indexed, e.g. for finding the
+    views of a dataset. Every write also bumps a catalog-wide revision, so
+    changes() can tell a process exactly which entries other processes
+    added, changed or removed since it last looked.
+    """
+
+    def __init__(self, data_dir: Path):
+        """
+        Args:
+            data_dir: Directory the catalog file (and any legacy metadata.json) is in
+        """
+        self.path = Path(data_dir) / CATALOG_FILE
+        self._lock = threading.Lock()
+
+        # Connections are shared by the threads processing chunks, so access is serialized with _lock
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Entry revisions this process has seen (name -> revision) and the last data_version checked
+        self._revisions: Dict[str, int] = {}
+        self._data_version = None
+
+
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        Read every entry, importing a legacy metadata.json first if the catalog is empty.
+
+        Returns:
+            Dict[str, Dict]: Dataset name -> metadata entry, in the order the datasets were added
+        """
+        self._import_legacy_metadata()
+        with self._lock:
+            rows = self._conn.execute("SELECT name, revision, info FROM datasets ORDER BY rowid").fetchall()
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._revisions = {name: revision for name, revision, _ in rows}
+        return {name: json.loads(info) for name, _, info in rows}
+
+    def save(self, entries: Dict[str, Dict]) -> None:
+        """Insert or update entries, all in one transaction."""
+        if not entries:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                revision = self._next_revision()
+                self._conn.executemany(
+                    """INSERT INTO datasets (name, type, parent, storage_format, rows, columns, version,
+                                             last_modified, revision, info)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (name) DO UPDATE SET
+                           type = excluded.type, parent = excluded.parent,
+                           storage_format = excluded.storage_format, rows = excluded.rows,
+                           columns = excluded.columns, version = excluded.version,
+                           last_modified = excluded.last_modified, revision = excluded.revision,
+                           info = excluded.info""",
+                    [self._row(name, info, revision) for name, info in entries.items()])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        for name in entries:
+            self._revisions[name] = revision
+
+    def delete(self, name: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._next_revision()
+                self._conn.execute("DELETE FROM datasets WHERE name = ?", (name,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._revisions.pop(name, None)
+
+    def views_of(self, parent: str) -> List[str]:
+        """Get the names of the views defined on a dataset (indexed lookup)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM datasets WHERE type = 'view' AND parent = ? ORDER BY rowid",
+                                      (parent,)).fetchall()
+        return [name for name, in rows]
+
+    def changes(self) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Get what other processes changed since this one last loaded or checked.
+
+        This is a single cheap PRAGMA call when nothing changed. Our own
+        saves and deletes leave the data_version we compare against alone,
+        so commits other processes made before them are still picked up;
+        our own entries are told apart by their revisions.
+
+        Returns:
+            Tuple of (changed or added entries, names of removed entries)
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return {}, []
+            self._data_version = data_version
+
+            # One read transaction, so the revisions and entries come from the same snapshot
+            self._conn.execute("BEGIN")
+            try:
+                revisions = dict(self._conn.execute("SELECT name, revision FROM datasets").fetchall())
+                changed = {}
+                for name, revision in revisions.items():
+                    if self._revisions.get(name) != revision:
+                        row = self._conn.execute("SELECT info FROM datasets WHERE name = ?", (name,)).fetchone()
+                        changed[name] = json.loads(row[0])
+            finally:
+                self._conn.execute("COMMIT")
+
+        removed = [name for name in self._revisions if name not in revisions]
+        self._revisions = revisions
+        return changed, removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+
+    def _next_revision(self) -> int:
+        self._conn.execute("UPDATE catalog_state SET revision = revision + 1 WHERE id = 0")
+        return self._conn.execute("SELECT revision FROM catalog_state WHERE id = 0").fetchone()[0]
+
+    @staticmethod
+    def _row(name: str, info: Dict, revision: int) -> Tuple:
+        return (name, info.get("type", "dataset"), info.get("parent"), info.get("storage_format"),
+                info.get("rows"), info.get("columns"), info.get("version"), info.get("last_modified"),
+                revision, json.dumps(info))
+
+    def _import_legacy_metadata(self) -> None:
+        """Move the entries of a metadata.json written by an older version into an empty catalog."""
+        legacy_file = self.path.parent / LEGACY_METADATA_FILE
+        if not legacy_file.exists():
+            return
+        with self._lock:
+            empty = self._conn.execute("SELECT COUNT(*) FROM datasets").fetchone()[0] == 0
+        if not empty:
+            return
+
+        with open(legacy_file, "r") as f:
+            entries = json.load(f)
+        self.save(entries)
+        # Keep the old file around (renamed so it isn't imported twice)
+        try:
+            os.replace(legacy_file, f"{legacy_file}.imported")
+        except FileNotFoundError:
+            # Another process imported it at the same time
+            pass
+
@@ -0,0 +1,230 @@
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from imputation import Imputer
+from statistics_engine import categorical_columns
+
+
+class CleaningPipeline:
+    """
+    Cleaning steps queued on a dataset and run together.
+
+    Steps (remove duplicates, drop rows with missing values, fill missing
+    values) are only recorded when they are added. run() optimizes the queue
+    and executes it on one in-memory copy of the dataset, and save() writes the
+    result back with a single update_dataset() call, which records every
+    step in analyses_performed at once - instead of rewriting the dataset
+    file and its catalog entry after each step.
+
+    The queue is optimized before it runs, without changing the result of
+    running the steps one by one in the order they were queued:
+    - A "drop rows with missing values" step moves ahead of the steps it
+      commutes with and is merged with a drop step it reaches: removing
+      duplicates on all columns (duplicates are identical rows, so all
+      copies are dropped or none) and fills of other columns that only use
+      constants. It never moves past removing duplicates on some columns
+      (which copy is kept depends on the other columns) or past a fill
+      computed from the rows (mean, median, mode), since dropping rows
+      changes its values. An impute() step's "drop" columns count as a
+      drop step queued just before the step's fills.
+    - Consecutive fill steps are fused into one Imputer, so all their fill
+      values are computed in one pass and only the filled columns are copied.
+      A column filled twice starts a new fill stage, so the second fill
+      only sees the values the first one left missing.
+    - Removing duplicates stays where it was queued between fill steps,
+      since filling can turn rows into duplicates.
+
+    Usage:
+        pipeline = data_explorer.cleaning_pipeline("titanic")
+        pipeline.remove_duplicates().fill_mean().drop_missing(["Embarked"])
+        cleaned_df = pipeline.run()   # preview
+        pipeline.save()               # one write
+    """
+
+    def __init__(self, dataset_manager, dataset_name: str):
+        """
+        Args:
+            dataset_manager: Instance of DatasetManager
+            dataset_name: Name of the dataset to clean
+        """
+        self.dataset_manager = dataset_manager
+        self.dataset_name = dataset_name
+
+        # Queued steps as (kind, parameters, description), in the order they were added
+        self.steps: List[Tuple[str, Dict[str, Any], str]] = []
+
+        # Result of run(), and the dataset version it was computed from
+        self._result: Optional[pd.DataFrame] = None
+        self._result_version = None
+        self.duplicates_removed = 0
+        self.rows_dropped = 0
+
+
+
+    def remove_duplicates(self, subset: Optional[List[str]] = None) -> "CleaningPipeline":
+        """Queue removing duplicate rows (on all columns, or just `subset`)."""
+        description = f"Removed duplicates on columns: {', '.join(subset) if subset else 'all columns'}"
+        return self._add("dedup", {"subset": subset}, description)
+
+    def drop_missing(self, columns: Optional[List[str]] = None) -> "CleaningPipeline":
+        """Queue removing rows with missing values (in any column, or just `columns`)."""
+        description = f"Removed rows with missing values in: {', '.join(columns)}" if columns \
+            else "Removed rows with missing values"
+        return self._add("drop", {"columns": columns}, description)
+
+    def fill_mean(self, columns: Optional[List[str]] = None) -> "CleaningPipeline":
+        """Queue filling missing values with the column mean (all numerical columns by default)."""
+        return self._add("fill", {"strategy": "mean", "columns": columns},
+                         "Filled missing values in numeric columns with mean")
+
+    def fill_mode(self, columns: Optional[List[str]] = None) -> "CleaningPipeline":
+        """Queue filling missing values with the column mode (all categorical columns by default)."""
+        return self._add("fill", {"strategy": "mode", "columns": columns},
+                         "Filled missing values in categorical columns with mode")
+
+    def impute(self, strategies: Dict[str, str], constants: Optional[Dict[str, Any]] = None) -> "CleaningPipeline":
+        """Queue handling missing values with a strategy per column (see Imputer)."""
+        description = "Handled missing values: " + ", ".join(f"{col} ({s})" for col, s in strategies.items())
+        # Build the imputer now so a bad strategy is reported when it is queued, not when it runs
+        Imputer(strategies, constants)
+        return self._add("impute", {"strategies": dict(strategies), "constants": dict(constants or {})}, description)
+
+    def descriptions(self) -> List[str]:
+        """Get a description of every queued step, in the order they were added."""
+        return [description for _, _, description in self.steps]
+
+    def clear(self) -> None:
+        """Forget every queued step."""
+        self.steps = []
+        self._result = None
+
+
+
+    def plan(self, df: pd.DataFrame) -> List[Tuple[str, Any]]:
+        """
+        Optimize the queue for a DataFrame (see the class docstring).
+
+        Returns:
+            List of stages: ("drop", columns), ("dedup", subset) or ("fill", Imputer)
+        """
+        # Stages as [kind, payload]; fill payloads are (strategies, constants) until the end
+        stages: List[List[Any]] = []
+
+        for kind, params, _ in self.steps:
+            if kind == "drop":
+                self._add_drop(stages, params["columns"] or list(df.columns))
+            elif kind == "dedup":
+                stages.append(["dedup", params["subset"]])
+            else:
+                # An impute() "drop" drops rows before its fill values are computed, like a drop step
+                step_strategies = self._strategies(df, kind, params)
+                drops = [col for col, strategy in step_strategies.items() if strategy == "drop"]
+                if drops:
+                    self._add_drop(stages, drops)
+                for col, strategy in step_strategies.items():
+                    if strategy == "drop":
+                        continue
+                    if not stages or stages[-1][0] != "fill" or col in stages[-1][1][0]:
+                        stages.append(["fill", ({}, {})])
+                    strategies, constants = stages[-1][1]
+                    strategies[col] = strategy
+                    if strategy == "constant":
+                        constants[col] = params["constants"][col]
+
+        return [(kind, Imputer(*payload) if kind == "fill" else payload) for kind, payload in stages
+                if kind != "fill" or payload[0]]
+
+    def run(self) -> Optional[pd.DataFrame]:
+        """
+        Run the queued steps on the dataset (without saving).
+
+        Returns:
+            The cleaned DataFrame, or None if error
+        """
+        try:
+            version = self.dataset_manager.dataset_version(self.dataset_name)
+            if self._result is not None and self._result_version == version:
+                return self._result
+
+            df = self.dataset_manager.get_dataset(self.dataset_name)
+            if df is None:
+                raise ValueError(f"Dataset '{self.dataset_name}' not found")
+
+            self.duplicates_removed = self.rows_dropped = 0
+            for kind, stage in self.plan(df):
+                rows = len(df)
+                if kind == "drop":
+                    df = Imputer({col: "drop" for col in stage}).fit_transform(df)
+                    self.rows_dropped += rows - len(df)
+                elif kind == "dedup":
+                    df = df.drop_duplicates(subset=stage)
+                    self.duplicates_removed += rows - len(df)
+                else:
+                    df = stage.fit_transform(df)
+
+            self._result, self._result_version = df, version
+            return df
+
+        except Exception as e:
+            print(f"Error running cleaning steps: {str(e)}")
+            return None
+
+    def save(self, persist: bool = True) -> bool:
+        """
+        Run the queued steps (if run() hasn't already) and write the result back once.
+
+        Args:
+            persist: Write to disk now (see DatasetManager.update_dataset)
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.steps:
+            return True
+        df = self.run()
+        if df is None:
+            return False
+        if not self.dataset_manager.update_dataset(self.dataset_name, df, self.descriptions(), persist=persist):
+            return False
+        self.clear()
+        return True
+
+
+
+    def _add(self, kind: str, params: Dict[str, Any], description: str) -> "CleaningPipeline":
+        self.steps.append((kind, params, description))
+        self._result = None
+        return self
+
+    @staticmethod
+    def _add_drop(stages: List[List[Any]], columns: List[str]) -> None:
+        """
+        Add a drop stage as early as it gives the same result (see the class
+        docstring), merging it with a drop stage it reaches.
+        """
+        position = len(stages)
+        while position > 0:
+            kind, payload = stages[position - 1]
+            if kind == "drop":
+                payload.extend(col for col in columns if col not in payload)
+                return
+            if kind == "dedup":
+                commutes = payload is None
+            else:
+                strategies = payload[0]
+                commutes = all(strategy == "constant" for strategy in strategies.values()) \
+                    and not any(col in strategies for col in columns)
+            if not commutes:
+                break
+            position -= 1
+        stages.insert(position, ["drop", list(columns)])
+
+    @staticmethod
+    def _strategies(df: pd.DataFrame, kind: str, params: Dict[str, Any]) -> Dict[str, str]:
+        """Get the column -> strategy map of a fill step."""
+        if kind == "impute":
+            return params["strategies"]
+        columns = params["columns"]
+        if columns is None:
+            columns = list(df.select_dtypes(include="number").columns) if params["strategy"] == "mean" \
+                else categorical_columns(df)
+        return {col: params["strategy"] for col in columns}
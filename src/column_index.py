@@ -0,0 +1,339 @@
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from predicates import Predicate
+
+# Columns with at most this many distinct values get a bitmap index by default
+BITMAP_MAX_VALUES = 64
+
+INDEX_DIR = "_index"
+
+# Comparison operators each kind of index can answer
+SORTED_OPS = {"==", "<", "<=", ">", ">="}
+BITMAP_OPS = {"==", "!=", "in", "not in"}
+
+
+class SortedIndex:
+    """
+    Index for range predicates on a numerical column.
+
+    Holds the column's non-missing values in sorted order, next to the row
+    position each one came from, so `Age > 30` becomes a binary search plus
+    a slice instead of a comparison against every row.
+    """
+
+    kind = "sorted"
+
+    def __init__(self, values: np.ndarray, positions: np.ndarray, rows: int):
+        self.values = values
+        self.positions = positions
+        self.rows = rows
+        self.version = None  # Dataset version the index was built from
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "SortedIndex":
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        present = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[present], kind="stable")
+        position_type = np.int32 if len(values) < 2 ** 31 else np.int64
+        return cls(values[present][order], present[order].astype(position_type), len(values))
+
+    def lookup(self, op: str, value: Any) -> Optional[np.ndarray]:
+        if op not in SORTED_OPS or isinstance(value, (str, bool, list, tuple)) or value is None:
+            return None
+
+        if op == "==":
+            start = np.searchsorted(self.values, value, side="left")
+            end = np.searchsorted(self.values, value, side="right")
+        elif op in ("<", "<="):
+            start, end = 0, np.searchsorted(self.values, value, side="left" if op == "<" else "right")
+        else:
+            start, end = np.searchsorted(self.values, value, side="right" if op == ">" else "left"), len(self.values)
+
+        return np.sort(self.positions[start:end])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"values": self.values, "positions": self.positions}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "SortedIndex":
+        return cls(arrays["values"], arrays["positions"], meta["rows"])
+
+
+
+class BitmapIndex:
+    """
+    Index for equality predicates on a low-cardinality column.
+
+    Keeps one packed bitmap (one bit per row) for each distinct value, so
+    `Pclass == 1` or `Embarked in ['C', 'Q']` only has to OR a few bitmaps.
+    """
+
+    kind = "bitmap"
+
+    def __init__(self, values: List[Any], bitmaps: np.ndarray, rows: int):
+        self.values = values
+        self.bitmaps = bitmaps
+        self.rows = rows
+        self.version = None  # Dataset version the index was built from
+        self._lookup = {value: i for i, value in enumerate(values)}
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "BitmapIndex":
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        values = [value.item() if hasattr(value, "item") else value for value in uniques]
+        bitmaps = np.empty((len(values), (len(codes) + 7) // 8), dtype=np.uint8)
+        for i in range(len(values)):
+            bitmaps[i] = np.packbits(codes == i)
+        return cls(values, bitmaps, len(series))
+
+    def _mask(self, values: List[Any]) -> np.ndarray:
+        packed = np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+        for value in values:
+            i = self._lookup.get(value)
+            if i is not None:
+                packed |= self.bitmaps[i]
+        return np.unpackbits(packed, count=self.rows).astype(bool)
+
+    def lookup(self, op: str, value: Any) -> Optional[np.ndarray]:
+        if op not in BITMAP_OPS:
+            return None
+        if op in ("in", "not in") and not isinstance(value, (list, tuple, set)):
+            return None
+        values = list(value) if op in ("in", "not in") else [value]
+        try:
+            mask = self._mask(values)
+        except TypeError:
+            # Unhashable value - leave it to the full scan
+            return None
+        if op in ("!=", "not in"):
+            mask = ~mask  # Missing values are "not equal" too, like in pandas
+        return np.flatnonzero(mask)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"bitmaps": self.bitmaps}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "BitmapIndex":
+        return cls(meta["values"], arrays["bitmaps"], meta["rows"])
+
+
+INDEX_TYPES = {index_type.kind: index_type for index_type in (SortedIndex, BitmapIndex)}
+
+
+
+class IndexManager:
+    """
+    Secondary indexes on dataset columns, saved next to the dataset.
+
+    This class handles:
+    - Building sorted indexes (range predicates) and bitmap indexes
+      (equality on low-cardinality columns)
+    - Saving them under data/<dataset>/_index/ and memory-mapping them back
+    - Answering simple predicates with row positions
+    - Rebuilding them the first time they are used after the dataset changed
+
+    Which columns are indexed is recorded in the dataset's metadata under
+    "indexes". Every index also stores the dataset version it was built
+    from, so one that is out of date is rebuilt instead of used.
+    """
+
+    def __init__(self, dataset_manager):
+        """
+        Args:
+            dataset_manager: Instance of DatasetManager
+        """
+        self.dataset_manager = dataset_manager
+
+        # (dataset name, column) -> loaded index
+        self._loaded: Dict[Tuple[str, str], Any] = {}
+
+        dataset_manager.add_change_listener(self._dataset_changed)
+
+
+
+    def create_index(self, dataset_name: str, column: str, kind: Optional[str] = None) -> bool:
+        """
+        Build an index on a column and save it.
+
+        Args:
+            dataset_name: Name of the dataset
+            column: Column to index
+            kind: "sorted" or "bitmap". By default columns with at most
+                BITMAP_MAX_VALUES distinct values get a bitmap index, other
+                numerical columns a sorted one.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            df = self.dataset_manager.get_dataset(dataset_name)
+            if df is None:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            if column not in df.columns:
+                raise ValueError(f"Column '{column}' not found in dataset '{dataset_name}'")
+
+            series = df[column]
+            if kind is None:
+                kind = "bitmap" if series.nunique(dropna=True) <= BITMAP_MAX_VALUES else "sorted"
+            if kind not in INDEX_TYPES:
+                raise ValueError(f"Unknown index type '{kind}' (use {', '.join(INDEX_TYPES)})")
+            if kind == "sorted" and (not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+                raise ValueError(f"Sorted indexes need a numerical column and '{column}' is {series.dtype}")
+
+            self._build(dataset_name, column, kind, series)
+            self.dataset_manager.metadata[dataset_name].setdefault("indexes", {})[column] = kind
+            self.dataset_manager._save_metadata(dataset_name)
+            return True
+
+        except Exception as e:
+            print(f"Error creating index: {str(e)}")
+            return False
+
+    def drop_index(self, dataset_name: str, column: str) -> bool:
+        """Remove the index on a column."""
+        indexes = self.dataset_manager.metadata.get(dataset_name, {}).get("indexes", {})
+        if column not in indexes:
+            print(f"No index on '{column}' in dataset '{dataset_name}'")
+            return False
+
+        del indexes[column]
+        self._loaded.pop((dataset_name, column), None)
+        shutil.rmtree(self._index_dir(dataset_name, column), ignore_errors=True)
+        self.dataset_manager._save_metadata(dataset_name)
+        return True
+
+    def list_indexes(self, dataset_name: str) -> Dict[str, str]:
+        """Get the indexed columns of a dataset and their index types."""
+        return dict(self.dataset_manager.metadata.get(dataset_name, {}).get("indexes", {}))
+
+
+
+    def lookup(self, dataset_name: str, predicates: List[Predicate]) -> Tuple[Optional[np.ndarray], bool]:
+        """
+        Find the rows matching every predicate an index can answer.
+
+        Args:
+            dataset_name: Name of the dataset
+            predicates: (column, operator, value) comparisons, e.g. PredicatePlan.predicates
+
+        Returns:
+            Tuple of (positions, answered_all): the sorted row positions matching
+            all the indexed predicates (None if no index could be used), and
+            whether every predicate was answered by an index
+        """
+        result, answered_all = None, True
+        for column, op, value in predicates:
+            index = self._get_index(dataset_name, column)
+            positions = None
+            if index is not None:
+                try:
+                    positions = index.lookup(op, value)
+                except TypeError:
+                    # e.g. comparing a number with a string - let the full scan report it
+                    positions = None
+            if positions is None:
+                answered_all = False
+                continue
+            result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+        return result, answered_all
+
+    def _get_index(self, dataset_name: str, column: str):
+        kind = self.list_indexes(dataset_name).get(column)
+        if kind is None:
+            return None
+
+        version = self.dataset_manager.dataset_version(dataset_name)
+        index = self._loaded.get((dataset_name, column))
+        if index is None or index.version != version:
+            index = self._load(dataset_name, column)
+        if index is None or index.version != version:
+            df = self.dataset_manager.get_dataset(dataset_name)
+            if df is None:
+                return None
+            if column not in df.columns:
+                # The column is gone, so is its index
+                self.drop_index(dataset_name, column)
+                return None
+            index = self._build(dataset_name, column, kind, df[column])
+        return index
+
+
+
+    def _index_dir(self, dataset_name: str, column: str) -> Path:
+        return self.dataset_manager.data_dir / dataset_name / INDEX_DIR / quote(str(column), safe="")
+
+    def _build(self, dataset_name: str, column: str, kind: str, series: pd.Series):
+        """Build an index, save it and keep it loaded."""
+        index = INDEX_TYPES[kind].build(series)
+        index.version = self.dataset_manager.dataset_version(dataset_name)
+
+        # Write to a temporary directory first so readers never see a half-written index
+        index_dir = self._index_dir(dataset_name, column)
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        meta = {"kind": kind, "version": index.version, "rows": index.rows}
+        if kind == "bitmap":
+            meta["values"] = index.values
+        with open(tmp_dir / "meta.pkl", "wb") as f:
+            pickle.dump(meta, f)
+        for name, array in index.arrays().items():
+            np.save(tmp_dir / f"{name}.npy", array)
+
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp_dir, index_dir)
+
+        self._loaded[(dataset_name, column)] = index
+        return index
+
+    def _load(self, dataset_name: str, column: str):
+        """Load a saved index (memory-mapped), or None if there is no usable one."""
+        index_dir = self._index_dir(dataset_name, column)
+        try:
+            with open(index_dir / "meta.pkl", "rb") as f:
+                meta = pickle.load(f)
+            index_type = INDEX_TYPES[meta["kind"]]
+            arrays = {path.stem: np.load(path, mmap_mode="r") for path in index_dir.glob("*.npy")}
+            index = index_type.from_arrays(arrays, meta)
+        except Exception:
+            # A missing or corrupt index is simply rebuilt
+            return None
+
+        index.version = meta["version"]
+        self._loaded[(dataset_name, column)] = index
+        return index
+
+    def _dataset_changed(self, dataset_name: str) -> None:
+        """
+        Forget a dataset's indexes after its data changed (or it was removed).
+
+        Nothing is rebuilt here - _get_index rebuilds an index the next time
+        it is used - so changes like appends stay cheap. Saved index files
+        from an older version are deleted; ones already rebuilt for the
+        current version (e.g. by another process) are kept.
+        """
+        for key in [key for key in self._loaded if key[0] == dataset_name]:
+            del self._loaded[key]
+
+        version = self.dataset_manager.dataset_version(dataset_name)
+        column_names = self.dataset_manager.metadata.get(dataset_name, {}).get("column_names", [])
+        for column in self.list_indexes(dataset_name):
+            if column not in column_names:
+                # The column is gone, so is its index
+                self.drop_index(dataset_name, column)
+                continue
+            index_dir = self._index_dir(dataset_name, column)
+            try:
+                with open(index_dir / "meta.pkl", "rb") as f:
+                    stale = pickle.load(f)["version"] != version
+            except Exception:
+                stale = True
+            if stale:
+                shutil.rmtree(index_dir, ignore_errors=True)
@@ -0,0 +1,143 @@
+import warnings
+import numpy as np
+import pandas as pd
+from itertools import combinations_with_replacement
+from typing import List, Optional, Tuple
+from parallel import map_ordered
+
+# Columns per block of the correlation matrix
+CORRELATION_BLOCK_COLUMNS = 256
+
+
+def correlation_matrix(df: pd.DataFrame, block_columns: int = CORRELATION_BLOCK_COLUMNS,
+                       n_workers: int = 1) -> pd.DataFrame:
+    """
+    Pearson correlation matrix of the numerical columns of a DataFrame, like DataFrame.corr().
+
+    Instead of comparing every pair of columns one at a time, the columns are
+    standardized once into a float32 matrix (half the memory of float64) and
+    the matrix is computed in blocks of block_columns x block_columns entries,
+    each one a few matrix products. Blocks are independent, so with
+    n_workers > 1 they run in a thread pool (the products release the GIL).
+
+    Missing values are handled like DataFrame.corr(): each pair of columns is
+    correlated over the rows where both have a value. Without missing values
+    a block is a single product of standardized columns.
+
+    Args:
+        df: Numerical columns (other columns must be encoded first)
+        block_columns: Columns per block
+        n_workers: Number of threads computing blocks
+
+    Returns:
+        pd.DataFrame: Correlations, with the columns as index and columns
+    """
+    columns = list(df.columns)
+    values = df.to_numpy(dtype="float64", na_value=np.nan)
+
+    # Step 1: Standardize every column (over its values, missing values become 0)
+    mask = ~np.isnan(values)
+    has_missing = not mask.all()
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # All-missing columns have no mean (they end up with no correlations)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(columns))
+        std = np.nanstd(values, axis=0) if len(values) else np.zeros(len(columns))
+        z = (values - mean) / np.where(std > 0, std, 1.0)
+    z = np.where(mask, z, 0.0).astype(np.float32)
+    del values
+    valid = mask.astype(np.float32) if has_missing else None
+
+    # Step 2: Compute the upper triangle of blocks
+    starts = range(0, len(columns), block_columns)
+    blocks = list(combinations_with_replacement(starts, 2))
+
+    def compute(block):
+        i, j = block
+        zi, zj = z[:, i:i + block_columns], z[:, j:j + block_columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if valid is None:
+                # Same rows for every pair: correlation = z_i . z_j / sqrt(z_i . z_i * z_j . z_j)
+                norms_i = np.einsum("ij,ij->j", zi, zi, dtype=np.float64)
+                norms_j = np.einsum("ij,ij->j", zj, zj, dtype=np.float64)
+                return (zi.T @ zj) / np.sqrt(np.outer(norms_i, norms_j))
+
+            # Sums over the rows where both columns have a value, for every pair at once
+            mi, mj = valid[:, i:i + block_columns], valid[:, j:j + block_columns]
+            n = (mi.T @ mj).astype(np.float64)
+            sum_x = (zi.T @ mj).astype(np.float64)
+            sum_y = (mi.T @ zj).astype(np.float64)
+            sum_xx = ((zi * zi).T @ mj).astype(np.float64)
+            sum_yy = (mi.T @ (zj * zj)).astype(np.float64)
+            sum_xy = (zi.T @ zj).astype(np.float64)
+            cov = sum_xy - sum_x * sum_y / n
+            var_x = sum_xx - sum_x * sum_x / n
+            var_y = sum_yy - sum_y * sum_y / n
+            return cov / np.sqrt(var_x * var_y)
+
+    corr = np.empty((len(columns), len(columns)))
+    for (i, j), block in zip(blocks, map_ordered(compute, blocks, n_workers)):
+        corr[i:i + block.shape[0], j:j + block.shape[1]] = block
+        corr[j:j + block.shape[1], i:i + block.shape[0]] = block.T
+
+    # float32 rounding can push perfect correlations just past +-1
+    corr = np.clip(corr, -1.0, 1.0)
+    # A column with no variation (or under 2 values) has no correlation, except with itself (like pandas)
+    for k in range(len(columns)):
+        corr[k, k] = 1.0 if np.isfinite(corr[k, k]) else np.nan
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def top_pairs(corr: pd.DataFrame, n: int = 20) -> List[Tuple[str, str, float]]:
+    """
+    Get the n most strongly correlated pairs of different columns.
+
+    Args:
+        corr: Correlation matrix (from correlation_matrix)
+        n: Number of pairs
+
+    Returns:
+        List of (column, column, correlation), strongest (by absolute value) first
+    """
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    strength = np.nan_to_num(np.abs(values[rows, cols]), nan=-1.0)
+    order = np.argsort(-strength, kind="stable")[:n]
+    return [(corr.index[rows[k]], corr.columns[cols[k]], float(values[rows[k], cols[k]]))
+            for k in order if strength[k] >= 0]
+
+
+def cluster_order(corr: pd.DataFrame) -> List[str]:
+    """
+    Order columns so that correlated columns end up next to each other.
+
+    The columns are clustered hierarchically on the distance 1 - |correlation|
+    and listed in the order of the dendrogram's leaves, which turns a wide
+    heatmap into visible blocks of related columns.
+    """
+    if len(corr) < 3:
+        return list(corr.columns)
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    distance = 1.0 - np.abs(np.nan_to_num(corr.to_numpy(), nan=0.0))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    order = leaves_list(linkage(squareform(np.clip(distance, 0.0, None), checks=False), method="average"))
+    return [corr.columns[k] for k in order]
+
+
+def truncate_matrix(corr: pd.DataFrame, max_columns: Optional[int]) -> pd.DataFrame:
+    """
+    Shrink a matrix too wide to read: keep the max_columns columns with the
+    strongest correlation to any other column, in clustered order (see cluster_order).
+    A matrix with at most max_columns columns is returned unchanged.
+    """
+    if max_columns is None or len(corr) <= max_columns:
+        return corr
+    strength = np.abs(np.nan_to_num(corr.to_numpy(), nan=0.0))
+    np.fill_diagonal(strength, 0.0)
+    keep = np.sort(np.argsort(-strength.max(axis=0), kind="stable")[:max_columns])
+    corr = corr.iloc[keep, keep]
+    order = cluster_order(corr)
+    return corr.loc[order, order]
@@ -1,6 +1,20 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Union, Tuple
+from statistics_engine import (FREQUENCY_TOP_K, MAX_EXACT_UNIQUE, categorical_columns, summarize_categorical,
+                               summarize_categorical_chunks, summarize_numeric, summarize_numeric_chunks)
+from result_cache import MISSING, ResultCache
+from column_index import IndexManager
+from encoding_cache import EncodingCache
+from profiling import DatasetProfile, profile_chunks, profile_dataframe
+from predicates import PredicateCompiler
+from dataset_manager import STREAMING_THRESHOLD_BYTES
+from storage import get_storage_backend
+from parallel import map_ordered
+from dedup import StreamingDeduplicator
+from imputation import Imputer
+from cleaning_pipeline import CleaningPipeline
+
 
 class DataExplorer:
     """
@@ -8,57 +22,81 @@ class DataExplorer:
     
     This class provides functionality for:
     - Computing summary statistics
-    - Handling missing data
+    - Handling missing data (several columns and strategies in one pass)
     - Getting frequency counts
+    - Profiling a dataset (all of the above in one scan, for reports)
     - Filtering data
-    - Cleaning data (removing duplicates)
+    - Cleaning data (removing duplicates, also chunk by chunk for large datasets)
+    
+    Summary statistics, missing data info and frequency counts are cached per
+    dataset version, so repeating them on unchanged data is almost free.
+    Filter conditions are compiled once per dataset version (predicate_compiler)
+    and use the column indexes in index_manager where they can. Label encodings
+    of categorical columns are shared with the Visualizer and models through
+    encoding_cache.
     """
     
-    def __init__(self, dataset_manager):
+    def __init__(self, dataset_manager, result_cache: Optional[ResultCache] = None,
+                 index_manager: Optional[IndexManager] = None, encoding_cache: Optional[EncodingCache] = None):
         """
         Initialize DataExplorer with a dataset manager.
-
+        
+        Args:
+            dataset_manager: Instance of DatasetManager
+            result_cache: Cache for analysis results (a new one, saved next to the datasets, by default)
+            index_manager: Column indexes used by filter_dataset (a new one by default)
+            encoding_cache: Label encodings of categorical columns (a new one by default)
         """
         self.dataset_manager = dataset_manager
+        self.result_cache = result_cache if result_cache is not None else ResultCache(dataset_manager)
+        self.index_manager = index_manager if index_manager is not None else IndexManager(dataset_manager)
+        self.encoding_cache = encoding_cache if encoding_cache is not None else EncodingCache(dataset_manager)
+        self.predicate_compiler = PredicateCompiler(dataset_manager)
         
 
         
-    def get_summary_statistics(self, dataset_name: str) -> Dict[str, Dict]:
+    def get_summary_statistics(self, dataset_name: str, streaming: bool = False,
+                               chunksize: int = 100_000, n_workers: int = 1) -> Dict[str, Dict]:
         """
         Calculate summary statistics for numerical columns.
         
+        In streaming mode the dataset is read chunk by chunk instead of being
+        loaded into memory. Count, mean, std, min and max are still exact, but
+        the median and quartiles are approximate (from a quantile sketch) and
+        each column gets a 'rank_error' bound next to them.
+        
         Args:
             dataset_name: Name of the dataset to analyze
+            streaming: Compute the statistics over chunks of the stored dataset
+            chunksize: Rows per chunk in streaming mode
+            n_workers: Number of threads processing chunks in streaming mode
             
         Returns:
             Dictionary containing statistics for each numerical column
         """
         try:
+            # Reuse the result if nothing changed since it was last computed
+            params = {'streaming': streaming}
+            stats = self.result_cache.get(dataset_name, 'summary_statistics', params)
+            if stats is not MISSING:
+                return stats
+            
+            if streaming:
+                chunks = self.dataset_manager.iter_chunks(dataset_name, chunksize)
+                stats = summarize_numeric_chunks(chunks, n_workers)
+                self.result_cache.put(dataset_name, 'summary_statistics', params, stats)
+                return stats
+            
             # Step 1: Get dataset from manager
             df = self.dataset_manager.get_dataset(dataset_name)
             if df is None:
                 raise ValueError(f"Dataset '{dataset_name}' not found")
             
-            # Step 2: Initialize results dictionary (dict of dicts)
-            stats = {}
-            
-            # Step 3: Get numerical columns only
-            numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns
-            
-            # Step 4: Calculate statistics for each numerical column
-            for col in numerical_cols:
-                stats[col] = {
-                    'count': int(df[col].count()),
-                    'mean': round(float(df[col].mean()), 4),
-                    'median': round(float(df[col].median()), 4),
-                    'std': round(float(df[col].std()), 4),
-                    'min': round(float(df[col].min()), 4),
-                    '25%': round(float(df[col].quantile(0.25)), 4),
-                    '50%': round(float(df[col].quantile(0.50)), 4),
-                    '75%': round(float(df[col].quantile(0.75)), 4),
-                    'max': round(float(df[col].max()), 4)
-                }
+            # Step 2: Calculate statistics for all numerical columns in one go
+            # (any width, including compacted and nullable ones - see statistics_engine.py)
+            stats = summarize_numeric(df)
             
+            self.result_cache.put(dataset_name, 'summary_statistics', params, stats)
             return stats
             
         except Exception as e:
@@ -77,6 +115,11 @@ class DataExplorer:
             Dictionary containing missing value information for each column
         """
         try:
+            # Reuse the result if nothing changed since it was last computed
+            missing_info = self.result_cache.get(dataset_name, 'missing_data_info')
+            if missing_info is not MISSING:
+                return missing_info
+            
             # Step 1: Get dataset from manager
             df = self.dataset_manager.get_dataset(dataset_name)
             if df is None:
@@ -96,6 +139,7 @@ class DataExplorer:
                         'percentage': round(float(missing_count / total_rows * 100), 1)
                     }
             
+            self.result_cache.put(dataset_name, 'missing_data_info', None, missing_info)
             return missing_info
             
         except Exception as e:
@@ -106,37 +150,55 @@ class DataExplorer:
 
 
             
-    def get_frequency_counts(self, dataset_name: str) -> Dict[str, Dict]:
+    def get_frequency_counts(self, dataset_name: str, streaming: bool = False, chunksize: int = 100_000,
+                             n_workers: int = 1, top_k: int = FREQUENCY_TOP_K,
+                             max_unique: int = MAX_EXACT_UNIQUE) -> Dict[str, Dict]:
         """
         Get frequency counts for categorical columns.
         
+        Columns with more than max_unique distinct values (names, IDs, ...)
+        automatically switch to top-k mode: only their top_k most frequent
+        values are returned and 'truncated' is set.
+        
+        In streaming mode the dataset is read chunk by chunk and each column
+        is counted with a fixed-size heavy-hitter sketch plus a HyperLogLog
+        distinct count. Columns with up to a thousand distinct values are
+        still exact; for larger ones 'approximate' is set, total_unique is an
+        estimate and counts may be overestimated by up to 'max_error'.
+        
         Args:
             dataset_name: Name of the dataset to analyze
+            streaming: Count over chunks of the stored dataset
+            chunksize: Rows per chunk in streaming mode
+            n_workers: Number of threads processing chunks in streaming mode
+            top_k: Number of values returned for high-cardinality columns
+            max_unique: Number of distinct values above which a column switches to top-k
             
         Returns:
             Dictionary containing value counts for each categorical column
         """
         try:
+            # Reuse the result if nothing changed since it was last computed
+            params = {'streaming': streaming, 'top_k': top_k, 'max_unique': max_unique}
+            freq_counts = self.result_cache.get(dataset_name, 'frequency_counts', params)
+            if freq_counts is not MISSING:
+                return freq_counts
+            
+            if streaming:
+                chunks = self.dataset_manager.iter_chunks(dataset_name, chunksize)
+                freq_counts = summarize_categorical_chunks(chunks, n_workers, top_k, max_unique)
+                self.result_cache.put(dataset_name, 'frequency_counts', params, freq_counts)
+                return freq_counts
+            
             # Step 1: Get dataset from manager
             df = self.dataset_manager.get_dataset(dataset_name)
             if df is None:
                 raise ValueError(f"Dataset '{dataset_name}' not found")
             
-            # Step 2: Initialize results dictionary
-            freq_counts = {} # dict of dicts
-            
-            # Step 3: Get categorical columns (including object and category dtypes)
-            categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-            
-            # Step 4: Calculate frequency counts for each categorical column
-            for col in categorical_cols:
-                value_counts = df[col].value_counts() # Pandas function that counts how many times each unique value appears in a column.
-                
-                freq_counts[col] = {
-                    'counts': value_counts.to_dict(),
-                    'total_unique': len(value_counts)
-                }
+            # Step 2: Count the values of every categorical column (object, category and boolean)
+            freq_counts = summarize_categorical(df, top_k, max_unique)
             
+            self.result_cache.put(dataset_name, 'frequency_counts', params, freq_counts)
             return freq_counts
             
         except Exception as e:
@@ -147,27 +209,144 @@ class DataExplorer:
 
 
 
-    def filter_dataset(self, dataset_name: str, condition: str) -> Optional[pd.DataFrame]:
+    def get_profile(self, dataset_name: str, streaming: Optional[bool] = None, chunksize: int = 100_000,
+                    n_workers: int = 1, top_k: int = FREQUENCY_TOP_K,
+                    max_unique: int = MAX_EXACT_UNIQUE) -> Optional[DatasetProfile]:
+        """
+        Profile a dataset: dtypes, missing values, summary statistics and frequency counts together.
+        
+        Everything is computed in one coordinated scan of the data (see
+        profiling.py) instead of one pass per analysis. The summary statistics,
+        missing data info and frequency counts in the profile are also cached
+        as the results of the matching methods, so they are free afterwards.
+        
+        Args:
+            dataset_name: Name of the dataset to profile
+            streaming: Scan chunks of the stored dataset (approximate medians and
+                quartiles, like get_summary_statistics). None streams datasets that
+                are big and not in memory.
+            chunksize: Rows per chunk in streaming mode
+            n_workers: Number of threads processing chunks in streaming mode
+            top_k: Number of values reported for high-cardinality columns
+            max_unique: Number of distinct values above which a column switches to top-k
+            
+        Returns:
+            DatasetProfile: The profile, or None if it couldn't be computed
+        """
+        try:
+            if dataset_name not in self.dataset_manager.metadata:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            if streaming is None:
+                streaming = self._prefer_streaming(dataset_name)
+            
+            # Reuse the profile if nothing changed since it was last computed
+            params = {'streaming': streaming, 'top_k': top_k, 'max_unique': max_unique}
+            profile = self.result_cache.get(dataset_name, 'profile', params)
+            if profile is not MISSING:
+                return profile
+            
+            # Step 1: Scan the dataset once
+            if streaming:
+                chunks = self.dataset_manager.iter_chunks(dataset_name, chunksize)
+                profile = profile_chunks(chunks, n_workers, top_k, max_unique)
+            else:
+                df = self.dataset_manager.get_dataset(dataset_name)
+                if df is None:
+                    raise ValueError(f"Dataset '{dataset_name}' not found")
+                profile = profile_dataframe(df, top_k, max_unique)
+            
+            # Step 2: Cache the profile and the analyses it answers
+            self.result_cache.put(dataset_name, 'profile', params, profile)
+            self.result_cache.put(dataset_name, 'summary_statistics', {'streaming': streaming},
+                                  profile.summary_statistics())
+            self.result_cache.put(dataset_name, 'missing_data_info', None, profile.missing_data_info())
+            self.result_cache.put(dataset_name, 'frequency_counts', params, profile.frequency_counts())
+            return profile
+            
+        except Exception as e:
+            print(f"Error profiling dataset: {str(e)}")
+            return None
+    
+    
+    def _prefer_streaming(self, dataset_name: str) -> bool:
+        """Scan chunk by chunk when the dataset is big and not in memory anyway."""
+        if dataset_name in self.dataset_manager.datasets:
+            return False
+        return self.dataset_manager.stored_size(dataset_name) > STREAMING_THRESHOLD_BYTES
+
+
+
+
+
+    def filter_dataset(self, dataset_name: str, condition: str, pushdown: Optional[bool] = None,
+                       n_workers: int = 1, chunksize: int = 100_000) -> Optional[pd.DataFrame]:
         """
         Filter dataset based on a condition string.
         
+        The condition (DataFrame.query syntax) is compiled into a vectorized
+        plan that is cached per dataset version, so repeated filters skip
+        parsing, and a condition naming an unknown column is rejected up front.
+        
+        Comparisons of an indexed column with a constant (`Pclass == 1`,
+        `Age > 30`, `Embarked in ['C', 'Q']`) that are joined with `and` are
+        answered from the column indexes (see IndexManager.create_index);
+        only the rows they select are checked against the rest of the condition.
+        
+        With pushdown the dataset isn't loaded: only the columns the condition
+        uses are read from storage to find the matching rows, and then only
+        those rows are read in full.
+        
+        With n_workers > 1 the rows are split into chunks that are evaluated
+        in a thread pool; the matching rows are put back together in their
+        original order, so the result is identical to the serial one.
+        
         Args:
             dataset_name: Name of the dataset to filter
             condition: String condition (e.g., "age > 25 and country == 'USA'")
+            pushdown: Filter from storage instead of in memory. By default this is
+                done for datasets over 256 MB (Parquet/Feather) that aren't in memory yet.
+            n_workers: Number of threads evaluating the condition
+            chunksize: Rows per chunk when evaluating in parallel (or from storage)
             
         Returns:
             Filtered DataFrame or None if error
         """
         try:
-            # Step 1: Get dataset from manager
-            df = self.dataset_manager.get_dataset(dataset_name)
-            if df is None:
-                raise ValueError(f"Dataset '{dataset_name}' not found")
+            # Step 1: Compile the condition (checks its columns against the dataset's)
+            plan = self.predicate_compiler.compile(dataset_name, condition)
+            
+            # Step 2: Narrow the rows down with the column indexes, if any apply
+            positions, answered_all = self.index_manager.lookup(dataset_name, plan.predicates)
+            exact = positions is not None and plan.complete and answered_all
             
-            # Step 2: Apply the filter condition
-            filtered_df = df.query(condition)
+            if not plan.row_local and not exact:
+                # The condition needs whole columns (e.g. "A in B"), so evaluate it on the full dataset at once
+                positions, pushdown, n_workers = None, False, 1
+            elif pushdown is None:
+                pushdown = self._prefer_pushdown(dataset_name)
             
-            # Step 3: Return None if no rows match the condition
+            # Step 3: Apply the filter condition
+            if pushdown:
+                if not exact:
+                    positions = self._matching_positions(dataset_name, plan, n_workers, chunksize)
+                filtered_df = self.dataset_manager.take_rows(dataset_name, positions)
+            else:
+                df = self.dataset_manager.get_dataset(dataset_name)
+                if df is None:
+                    raise ValueError(f"Dataset '{dataset_name}' not found")
+                
+                if exact:
+                    filtered_df = df.iloc[positions]
+                else:
+                    candidates = df if positions is None else df.iloc[positions]
+                    if n_workers > 1:
+                        chunks = ((start, candidates.iloc[start:start + chunksize])
+                                  for start in range(0, len(candidates), chunksize))
+                        filtered_df = candidates.iloc[self._evaluate_chunks(plan, chunks, n_workers)]
+                    else:
+                        filtered_df = candidates[plan.evaluate(candidates)]
+            
+            # Step 4: Return None if no rows match the condition
             if len(filtered_df) == 0:
                 print("No rows match the specified condition")
                 return None
@@ -177,23 +356,79 @@ class DataExplorer:
         except Exception as e:
             print(f"Error filtering dataset: {str(e)}")
             return None
+    
+    
+    def _prefer_pushdown(self, dataset_name: str) -> bool:
+        """Filter from storage when the dataset is big, columnar and not in memory anyway."""
+        if dataset_name in self.dataset_manager.datasets:
+            return False
+        info = self.dataset_manager.metadata.get(dataset_name, {})
+        if info.get("storage_format", "csv") == "csv":
+            return False
+        return self.dataset_manager.stored_size(dataset_name) > STREAMING_THRESHOLD_BYTES
+    
+    
+    def _matching_positions(self, dataset_name: str, plan, n_workers: int = 1,
+                            chunksize: int = 100_000) -> np.ndarray:
+        """Evaluate a plan over the stored dataset, reading only the columns it needs."""
+        def chunks():
+            offset = 0
+            for chunk in self.dataset_manager.iter_chunks(dataset_name, chunksize, columns=plan.columns or None):
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                yield offset, chunk
+                offset += len(chunk)
+        
+        return self._evaluate_chunks(plan, chunks(), n_workers)
+    
+    
+    @staticmethod
+    def _evaluate_chunks(plan, chunks, n_workers: int) -> np.ndarray:
+        """
+        Evaluate a plan on (offset, chunk) pairs, in a thread pool if n_workers > 1.
+        
+        Returns:
+            Sorted positions of the matching rows (chunk offset + position in the chunk)
+        """
+        def matching(item) -> np.ndarray:
+            offset, chunk = item
+            return np.flatnonzero(plan.evaluate(chunk)) + offset
+        
+        positions = list(map_ordered(matching, chunks, n_workers))
+        return np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
 
 
 
 
 
-    def clean_duplicates(self, dataset_name: str, subset: Optional[List[str]] = None) -> Tuple[Optional[pd.DataFrame], int]:
+    def clean_duplicates(self, dataset_name: str, subset: Optional[List[str]] = None, streaming: bool = False,
+                         output_name: Optional[str] = None, chunksize: int = 100_000,
+                         memory_mb: float = 256) -> Tuple[Optional[pd.DataFrame], int]:
         """
         Remove duplicate rows from the dataset.
         
+        In streaming mode the dataset is never loaded as a whole. The rows (or
+        just the subset columns) are read chunk by chunk and hashed, duplicates
+        are found from the hashes (see dedup.py, which spills them to disk
+        when they need more than memory_mb), and the rows to keep are then
+        written chunk by chunk to a new stored dataset, output_name. The rows
+        kept are the same as with drop_duplicates().
+        
         Args:
             dataset_name: Name of the dataset to clean
             subset: Optional list of columns to consider for duplicates
+            streaming: Deduplicate chunk by chunk into a new dataset
+            output_name: Name of the new dataset in streaming mode (default: "<dataset_name>_deduplicated")
+            chunksize: Rows per chunk in streaming mode
+            memory_mb: Memory for row hashes in streaming mode before they are spilled to disk
             
         Returns:
             Tuple of (cleaned DataFrame, number of duplicates removed)
-            or (None, 0) if error
+            or (None, 0) if error. In streaming mode the DataFrame is the new
+            dataset as get_dataset() loads it (memory-mapped if the manager is set up for it).
         """
+        if streaming:
+            return self._clean_duplicates_streaming(dataset_name, subset, output_name, chunksize, memory_mb)
+        
         try:
             # Step 1: Get dataset from manager
             df = self.dataset_manager.get_dataset(dataset_name)
@@ -220,6 +455,130 @@ class DataExplorer:
 
 
 
+    def _clean_duplicates_streaming(self, dataset_name: str, subset: Optional[List[str]], output_name: Optional[str],
+                                    chunksize: int, memory_mb: float) -> Tuple[Optional[pd.DataFrame], int]:
+        """Streaming mode of clean_duplicates: two passes over the stored dataset."""
+        try:
+            # Step 1: Check the dataset, subset and output name
+            info = self.dataset_manager.metadata.get(dataset_name)
+            if info is None:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            missing = [col for col in subset or [] if col not in info["column_names"]]
+            if missing:
+                raise ValueError(f"Columns not found in dataset '{dataset_name}': {', '.join(missing)}")
+            if output_name is None:
+                output_name = f"{dataset_name}_deduplicated"
+            if output_name in self.dataset_manager.metadata:
+                raise ValueError(f"Dataset name '{output_name}' already exists")
+            
+            with StreamingDeduplicator(memory_mb) as dedup:
+                # Step 2: Hash the rows (reading only the columns that define a duplicate)
+                for chunk in self.dataset_manager.iter_chunks(dataset_name, chunksize, subset or None):
+                    dedup.add(chunk)
+                keep = dedup.keep_mask()
+            
+            # Step 3: Write the rows to keep to the new dataset
+            def kept_rows():
+                offset = 0
+                for chunk in self.dataset_manager.iter_chunks(dataset_name, chunksize):
+                    kept = chunk[keep[offset:offset + len(chunk)]]
+                    offset += len(chunk)
+                    # Skip emptied chunks, so the column types come from real rows
+                    if len(kept) > 0 or offset == len(keep):
+                        yield kept
+            
+            # Keep the source's column types (a chunk left with only missing values in a column
+            # can't tell them) and, if it was compacted, its compact dtypes
+            schema = None
+            storage_format = info.get("storage_format", "csv")
+            if "schema" not in info and "file_path" in info \
+                    and storage_format == self.dataset_manager.storage_format:
+                schema = get_storage_backend(storage_format).read_schema(info["file_path"])
+            
+            description = f"Removed duplicates from '{dataset_name}' on columns: {', '.join(subset) if subset else 'all columns'}"
+            if not self.dataset_manager.create_dataset_from_chunks(output_name, kept_rows(), description,
+                                                                   compact="schema" in info, schema=schema):
+                return None, 0
+            
+            # Step 4: Calculate number of duplicates removed
+            duplicates_removed = len(keep) - int(keep.sum())
+            return self.dataset_manager.get_dataset(output_name), duplicates_removed
+            
+        except Exception as e:
+            print(f"Error removing duplicates: {str(e)}")
+            return None, 0
+
+
+
+    def cleaning_pipeline(self, dataset_name: str) -> CleaningPipeline:
+        """
+        Start queueing cleaning steps on a dataset, to run and save them together.
+        
+        Args:
+            dataset_name: Name of the dataset to clean
+            
+        Returns:
+            CleaningPipeline: Add steps to it, then call run() and/or save()
+        """
+        return CleaningPipeline(self.dataset_manager, dataset_name)
+
+
+
+    def impute_missing(self, dataset_name: str, strategies: Dict[str, str], constants: Optional[Dict] = None,
+                       streaming: bool = False, output_name: Optional[str] = None,
+                       chunksize: int = 100_000) -> Optional[pd.DataFrame]:
+        """
+        Handle the missing values of several columns in one go.
+        
+        Every column gets a strategy - "mean", "median", "mode", "constant" or
+        "drop" - and all fill values are computed together (see imputation.py).
+        Only the columns that had missing values are copied; the others are
+        shared with the stored dataset, so don't modify the result in place.
+        
+        In streaming mode the dataset is read chunk by chunk, twice: once to
+        compute the fill values and once to write the cleaned chunks to a new
+        stored dataset, output_name.
+        
+        Args:
+            dataset_name: Name of the dataset to clean
+            strategies: Column name -> strategy
+            constants: Column name -> fill value, for the "constant" columns
+            streaming: Clean chunk by chunk into a new dataset
+            output_name: Name of the new dataset in streaming mode (default: "<dataset_name>_imputed")
+            chunksize: Rows per chunk in streaming mode
+            
+        Returns:
+            The cleaned DataFrame (in streaming mode the new dataset), or None if error
+        """
+        try:
+            imputer = Imputer(strategies, constants)
+            
+            if streaming:
+                if output_name is None:
+                    output_name = f"{dataset_name}_imputed"
+                if output_name in self.dataset_manager.metadata:
+                    raise ValueError(f"Dataset name '{output_name}' already exists")
+                
+                # Only the columns with a strategy are needed for the fill values
+                imputer.fit_chunks(self.dataset_manager.iter_chunks(dataset_name, chunksize, list(strategies)))
+                chunks = imputer.transform_chunks(self.dataset_manager.iter_chunks(dataset_name, chunksize))
+                description = f"Handled missing values of '{dataset_name}': " + \
+                              ", ".join(f"{col} ({strategy})" for col, strategy in strategies.items())
+                if not self.dataset_manager.create_dataset_from_chunks(output_name, chunks, description):
+                    return None
+                return self.dataset_manager.get_dataset(output_name)
+            
+            df = self.dataset_manager.get_dataset(dataset_name)
+            if df is None:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            return imputer.fit_transform(df)
+            
+        except Exception as e:
+            print(f"Error handling missing values: {str(e)}")
+            return None
+
+
+
     def remove_rows_with_missing(self, dataset_name: str):
         """
         Remove rows with any missing values from the dataset.
@@ -235,8 +594,8 @@ class DataExplorer:
             print(f"Dataset '{dataset_name}' not found.")
             return None
         
-        # Step 2: Remove rows with missing values
-        return df.dropna()
+        # Step 2: Remove rows with missing values in any column
+        return Imputer({col: 'drop' for col in df.columns}).fit_transform(df)
 
 
 
@@ -256,17 +615,9 @@ class DataExplorer:
             print(f"Dataset '{dataset_name}' not found.")
             return None
         
-        # Step 2: Copy dataset
-        cleaned_df = df.copy()
-        
-        # Step 3: Fill missing values with mean
-        num_cols = cleaned_df.select_dtypes(include=['int64', 'float64']).columns
-        
-        for col in num_cols:
-            mean_val = cleaned_df[col].mean()
-            cleaned_df[col].fillna(mean_val, inplace=True)
-        
-        return cleaned_df
+        # Step 2: Fill missing values with mean (only the filled columns are copied)
+        num_cols = df.select_dtypes(include='number').columns
+        return Imputer({col: 'mean' for col in num_cols}).fit_transform(df)
 
     
     
@@ -288,16 +639,6 @@ class DataExplorer:
             print(f"Dataset '{dataset_name}' not found.")
             return None
         
-        # Step 2: Copy dataset
-        cleaned_df = df.copy()
-        
-        # Step 3: Fill missing values with mode
-        cat_cols = cleaned_df.select_dtypes(include=['object', 'category']).columns
-        
-        for col in cat_cols:
-            mode_val = cleaned_df[col].mode(dropna=True)
-            
-            if not mode_val.empty:
-                cleaned_df[col].fillna(mode_val[0], inplace=True)
-        
-        return cleaned_df 
\ No newline at end of file
+        # Step 2: Fill missing values with mode (only the filled columns are copied)
+        cat_cols = categorical_columns(df)
+        return Imputer({col: 'mode' for col in cat_cols}).fit_transform(df)
@@ -0,0 +1,193 @@
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class DatasetCache:
+    """
+    A memory-budgeted LRU cache for the DataFrames DatasetManager keeps in memory.
+
+    This class handles:
+    - Tracking roughly how much memory each cached dataset uses
+    - Evicting the least recently used datasets once the budget is exceeded
+    - Pinning datasets so they are never evicted
+    - Flushing dirty (unsaved) datasets to disk before they are dropped
+    - Counting hits, misses and evictions so the budget can be sized
+
+    It supports the dict operations DatasetManager already used on its plain
+    dict (`in`, `[]`, `[] =`, `del`), so callers don't need to change.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None,
+                 flush_callback: Optional[Callable[[str, pd.DataFrame], None]] = None):
+        """
+        Args:
+            memory_budget_mb: Maximum memory (in MB) the cached datasets may use. None means unlimited.
+            flush_callback: Called as flush_callback(name, df) to save a dirty dataset before eviction
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.flush_callback = flush_callback
+
+        # Ordered from least to most recently used
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._pinned = set()
+        self._dirty = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._frames
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        self._frames.move_to_end(name)
+        return self._frames[name]
+
+    def __setitem__(self, name: str, df: pd.DataFrame) -> None:
+        self.put(name, df)
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self._frames:
+            raise KeyError(name)
+        self.pop(name)
+
+    def keys(self):
+        return list(self._frames.keys())
+
+
+
+    def get(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        Look up a dataset, counting the lookup as a hit or a miss.
+
+        Args:
+            name: Name of the dataset
+
+        Returns:
+            The cached DataFrame, or None if it isn't cached
+        """
+        if name not in self._frames:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self[name]
+
+    def put(self, name: str, df: pd.DataFrame, dirty: bool = False) -> None:
+        """
+        Add or replace a dataset in the cache, evicting others if the budget is exceeded.
+
+        Args:
+            name: Name of the dataset
+            df: The DataFrame to cache
+            dirty: True if df has changes that have not been saved to disk yet
+        """
+        self._frames[name] = df
+        self._frames.move_to_end(name)
+        self._sizes[name] = int(df.memory_usage(deep=True).sum())
+
+        if dirty:
+            self._dirty.add(name)
+        else:
+            self._dirty.discard(name)
+
+        self._evict(keep=name)
+
+    def pop(self, name: str, default: Optional[pd.DataFrame] = None, keep_pin: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Remove a dataset from the cache without flushing it (e.g. because it was deleted).
+
+        Args:
+            name: Name of the dataset
+            default: Returned if the dataset isn't cached
+            keep_pin: Keep the dataset pinned, for when its data is only being replaced
+                (the next copy put in the cache is pinned again)
+        """
+        self._sizes.pop(name, None)
+        if not keep_pin:
+            self._pinned.discard(name)
+        self._dirty.discard(name)
+        return self._frames.pop(name, default)
+
+
+
+    def pin(self, name: str) -> None:
+        """Keep a dataset in memory regardless of the budget."""
+        self._pinned.add(name)
+
+    def unpin(self, name: str) -> None:
+        """Allow a pinned dataset to be evicted again."""
+        self._pinned.discard(name)
+        self._evict()
+
+    def is_pinned(self, name: str) -> bool:
+        return name in self._pinned
+
+    def is_dirty(self, name: str) -> bool:
+        return name in self._dirty
+
+    def flush(self, name: str) -> None:
+        """Save a dirty dataset through the flush callback and mark it clean."""
+        if name in self._dirty and self.flush_callback is not None:
+            self.flush_callback(name, self._frames[name])
+        self._dirty.discard(name)
+
+    def flush_all(self) -> None:
+        """Save every dirty dataset."""
+        for name in list(self._dirty):
+            self.flush(name)
+
+
+
+    def memory_used(self) -> int:
+        """Total memory (in bytes) used by the cached datasets."""
+        return sum(self._sizes.values())
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, hit rate and memory usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            "datasets": len(self._frames),
+            "pinned": len(self._pinned),
+            "dirty": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_used_mb": round(self.memory_used() / 1024 ** 2, 2),
+            "memory_budget_mb": self.memory_budget_mb
+        }
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """
+        Drop least recently used datasets until the cache fits in the budget.
+
+        Pinned datasets and `keep` (the dataset just added) are never evicted,
+        so a single dataset bigger than the whole budget can still be used.
+        """
+        if self.memory_budget_mb is None:
+            return
+
+        budget = self.memory_budget_mb * 1024 ** 2
+        for name in list(self._frames.keys()):
+            if self.memory_used() <= budget:
+                break
+            if name in self._pinned or name == keep:
+                continue
+
+            # Never lose unsaved changes
+            self.flush(name)
+            self.pop(name)
+            self.evictions += 1
@@ -1,8 +1,19 @@
 import os
+import numpy as np
 import pandas as pd
-import json
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
+import shutil
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Tuple, Union
+from storage import DEFAULT_STORAGE_FORMAT, csv_dtypes_for_schema, get_storage_backend, read_csv_chunks
+from dataset_cache import DatasetCache
+from dtype_compaction import SchemaBuilder, apply_schema, infer_compact_schema
+from predicates import compile_condition
+from catalog import Catalog
+from version_store import VersionStore
+
+# CSV files bigger than this are streamed in chunks instead of being read in one go
+STREAMING_THRESHOLD_BYTES = 256 * 1024 ** 2
+DEFAULT_CHUNK_ROWS = 100_000
 
 
 class DatasetManager:
@@ -11,29 +22,75 @@ class DatasetManager:
     
     This class handles:
     - Loading datasets from CSV files
-    - Storing datasets in organized folders
+    - Storing datasets in organized folders (Parquet, Feather or CSV)
     - Managing dataset metadata - v v important since well be using it for stats, and tracking modifications!!
     - Viewing dataset information
+    - Appending new rows without rewriting existing data
+    - Keeping every version of a dataset's data (see version_store.py)
     - Removing datasets
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", storage_format: str = DEFAULT_STORAGE_FORMAT,
+                 memory_map: bool = False, memory_budget_mb: Optional[float] = 1024,
+                 compact_dtypes: bool = False, versioning: bool = False):
         """
         Args:
             data_dir (str): Directory where datasets will be stored
+            storage_format (str): Format new datasets are stored in ("parquet", "feather" or "csv")
+            memory_map (bool): Open datasets memory-mapped instead of reading them into memory.
+                Needs a format that supports it, so "feather" is used if the chosen one doesn't.
+            memory_budget_mb (Optional[float]): Memory the in-memory datasets may use before the
+                least recently used ones are evicted (None for no limit)
+            compact_dtypes (bool): Store and load datasets with compact dtypes by default
+                (categories, downcast numbers, nullable types) - see dtype_compaction.py
+            versioning (bool): Record every version of the datasets' data so older ones
+                can be checked out again (see version_store.py). Off by default: the first
+                version of every dataset is a second copy of its data.
         """
         # Set up the data directory path
         self.data_dir = Path(data_dir)
         
-        # Dictionary to store loaded datasets in memory
-        self.datasets: Dict[str, pd.DataFrame] = {}
+        # Pick the storage format, falling back to CSV if pyarrow isn't installed
+        try:
+            get_storage_backend(storage_format)
+            self.storage_format = storage_format
+        except ValueError as e:
+            print(f"Warning: {str(e)}. Falling back to CSV storage.")
+            self.storage_format = "csv"
+        
+        self.compact_dtypes = compact_dtypes
+        
+        # Memory-mapping only works for formats laid out like memory (Arrow IPC)
+        self.memory_map = memory_map
+        if self.memory_map and not get_storage_backend(self.storage_format).supports_memory_map:
+            try:
+                get_storage_backend("feather")
+                self.storage_format = "feather"
+            except ValueError as e:
+                print(f"Warning: {str(e)}. Datasets will not be memory-mapped.")
+                self.memory_map = False
+        
+        # LRU cache of loaded datasets - works like a dictionary where key is the dataset name
+        # and value is the dataframe, but evicts old datasets once the memory budget is used up
+        self.datasets = DatasetCache(memory_budget_mb, flush_callback=self._flush_dataset)
         
-        # Path to the metadata file
-        self.metadata_file = self.data_dir / "metadata.json"
+        # Dataset name -> id() of the cached DataFrame if it was opened memory-mapped
+        self._memory_mapped: Dict[str, int] = {}
+        
+        # SQLite catalog the metadata is saved in (one row per dataset)
+        self.catalog = None
+        
+        # Content-addressed store of every version of the datasets (None if versioning is off)
+        self.version_store = VersionStore(self.data_dir) if versioning else None
+        
+        # Functions called as listener(dataset_name) whenever a dataset's data changes or it is removed
+        # (used by the caches built on top of the datasets to drop stale entries)
+        self._change_listeners: List[Callable[[str], None]] = []
         
         # Create data directory and load metadata
         self._ensure_data_dir()
         self._load_metadata()
+        self._migrate_legacy_metadata()
 
 
 
@@ -44,28 +101,263 @@ class DatasetManager:
 
     def _load_metadata(self) -> None:
         """
-        Load dataset metadata from JSON file.
-        If metadata file doesn't exist, create an empty one.
+        Load dataset metadata from the catalog (data/catalog.db).
+        The catalog is created if it doesn't exist, and a metadata.json written
+        by an older version of PyLytics is imported into it.
+        """
+        self.catalog = Catalog(self.data_dir)
+        self.metadata = self.catalog.load()
+
+    def _save_metadata(self, *dataset_names: str) -> None:
+        """
+        Save metadata entries to the catalog in one transaction.
+        
+        Args:
+            *dataset_names: The datasets whose entries changed (all of them if none are given)
+        """
+        names = dataset_names or self.metadata.keys()
+        self.catalog.save({name: self.metadata[name] for name in names if name in self.metadata})
+
+    def _refresh_metadata(self) -> None:
+        """
+        Pick up the catalog changes other processes made since we last looked.
+        
+        Datasets changed or removed elsewhere are dropped from memory and
+        reported to the change listeners, so nothing stale is served.
+        """
+        changed, removed = self.catalog.changes()
+        for name, info in changed.items():
+            self.metadata[name] = info
+        for name in removed:
+            self.metadata.pop(name, None)
+        for name in list(changed) + removed:
+            self.datasets.pop(name, keep_pin=name in changed)
+            for listener in self._change_listeners:
+                listener(name)
+
+    def _migrate_legacy_metadata(self) -> None:
+        """
+        Bring metadata written by older versions of PyLytics up to date.
+        
+        Old entries have no "storage_format" (they were always CSV) and may
+        have Windows style paths. The CSV files themselves are converted to
+        the configured storage format the first time they are read.
+        """
+        changed = []
+        for name, info in self.metadata.items():
+            if info.get("type") == "view":
+                continue
+            if "storage_format" not in info:
+                info["storage_format"] = "csv"
+                changed.append(name)
+            
+            # Paths saved on Windows use backslashes, which won't resolve anywhere else
+            file_path = Path(info["file_path"].replace("\\", "/"))
+            if not file_path.exists():
+                file_path = self._dataset_file(name, info["storage_format"])
+            if str(file_path) != info["file_path"]:
+                info["file_path"] = str(file_path)
+                changed.append(name)
+        
+        if changed:
+            self._save_metadata(*changed)
+
+    def _dataset_file(self, dataset_name: str, storage_format: str) -> Path:
+        """Return the path a dataset is stored at for the given format."""
+        extension = get_storage_backend(storage_format).extension
+        return self.data_dir / dataset_name / f"{dataset_name}{extension}"
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a function to be called as listener(dataset_name) whenever a
+        dataset's data is updated, appended to, or the dataset is removed.
+        """
+        self._change_listeners.append(listener)
+
+    def _data_changed(self, dataset_name: str) -> None:
+        """
+        Bump the dataset's version (if it still exists) and tell every change listener.
+        
+        Views of the dataset changed too: their materialized rows are dropped
+        and the same happens for them (and for views of those views).
+        """
+        if dataset_name in self.metadata:
+            info = self.metadata[dataset_name]
+            info["version"] = info.get("version", 0) + 1
+        for listener in self._change_listeners:
+            listener(dataset_name)
+        
+        for view_name in self._views_of(dataset_name):
+            self.datasets.pop(view_name, keep_pin=True)
+            self._data_changed(view_name)
+            self._save_metadata(view_name)
+
+    def _is_view(self, dataset_name: str) -> bool:
+        return self.metadata.get(dataset_name, {}).get("type") == "view"
+
+    def _views_of(self, dataset_name: str) -> List[str]:
+        """Names of the views defined directly on a dataset."""
+        return self.catalog.views_of(dataset_name)
+
+    def dataset_version(self, dataset_name: str) -> Optional[int]:
+        """
+        Get the version of a dataset's data. It goes up by one every time the data
+        changes, so anything computed from the data can be keyed on it.
+        
+        Returns:
+            Optional[int]: The version, or None if the dataset doesn't exist
+        """
+        self._refresh_metadata()
+        if dataset_name not in self.metadata:
+            return None
+        return self.metadata[dataset_name].get("version", 0)
+
+    def _read_dataset(self, dataset_name: str, memory_map: Optional[bool] = None) -> pd.DataFrame:
+        """
+        Read a dataset from disk using its storage backend.
+        
+        CSV-backed datasets are converted to the configured storage format
+        on the way, so the next cold start can skip CSV parsing. Rows added
+        with append_rows() live in separate segment files and are stitched on.
+        
+        Args:
+            dataset_name (str): Name of the dataset to read
+            memory_map (Optional[bool]): Open the file memory-mapped (defaults to self.memory_map)
+        """
+        if memory_map is None:
+            memory_map = self.memory_map
+        
+        info = self.metadata[dataset_name]
+        storage_format = info.get("storage_format", "csv")
+        backend = get_storage_backend(storage_format)
+        files = self._dataset_files(dataset_name)
+        
+        if memory_map and backend.supports_memory_map:
+            # Note: stitching appended segments on copies them, so mapping is only fully zero-copy with one file
+            return self._concat_segments([backend.open_memory_mapped(f) for f in files])
+        
+        df = self._concat_segments([backend.read(f) for f in files])
+        
+        if storage_format != self.storage_format:
+            self._convert_storage(dataset_name, df)
+            # Now that it's in a mappable format, hand back the mapped version
+            if memory_map and get_storage_backend(self.storage_format).supports_memory_map:
+                return get_storage_backend(self.storage_format).open_memory_mapped(info["file_path"])
+        return df
+
+    def _can_memory_map(self, dataset_name: str) -> bool:
+        """Check if _read_dataset can open a dataset memory-mapped (its format, or the one it is converted to, allows it)."""
+        storage_format = self.metadata[dataset_name].get("storage_format", "csv")
+        return get_storage_backend(storage_format).supports_memory_map \
+            or get_storage_backend(self.storage_format).supports_memory_map
+
+    def _is_memory_mapped(self, dataset_name: str, df: pd.DataFrame) -> bool:
+        """Check if a cached DataFrame is the one get_dataset opened memory-mapped."""
+        return self._memory_mapped.get(dataset_name) == id(df)
+
+    def _dataset_files(self, dataset_name: str) -> List[str]:
+        """Return the main file of a dataset followed by any appended segment files."""
+        info = self.metadata[dataset_name]
+        return [info["file_path"]] + info.get("segments", [])
+
+    @staticmethod
+    def _concat_segments(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Join the frames read from a dataset's files into one DataFrame."""
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def _drop_segments(self, dataset_name: str) -> None:
+        """Delete appended segment files once their rows have been written into the main file."""
+        segments = self.metadata[dataset_name].pop("segments", [])
+        for segment in segments:
+            if os.path.exists(segment):
+                os.remove(segment)
+        if segments:
+            self._save_metadata(dataset_name)
+
+    def _write_dataset(self, dataset_name: str, df: pd.DataFrame) -> None:
+        """Save a whole dataset to its file using its storage backend (replacing any segments)."""
+        info = self.metadata[dataset_name]
+        get_storage_backend(info.get("storage_format", "csv")).write(df, info["file_path"])
+        self._drop_segments(dataset_name)
+
+    def _flush_dataset(self, dataset_name: str, df: pd.DataFrame) -> None:
+        """Save changes that were only made in memory (DatasetCache flush callback) and record their version."""
+        self._write_dataset(dataset_name, df)
+        if not self._has_version(dataset_name):
+            analyses = self.metadata[dataset_name].get("analyses_performed") or [None]
+            self._record_version(dataset_name, df, analyses[-1])
+
+    def _has_version(self, dataset_name: str) -> bool:
+        """Check if the dataset's current version is recorded (always True without versioning, or for a view)."""
+        if self.version_store is None or self._is_view(dataset_name):
+            return True
+        return self.version_store.has_version(dataset_name, self.metadata[dataset_name].get("version", 0))
+
+    def _record_version(self, dataset_name: str, frames: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                        description: Optional[str] = None) -> None:
+        """
+        Record the dataset's current version in the version store.
+        
+        The data is already saved by the time this runs, so failing to record
+        the version only prints a warning.
         """
-        # Try to load existing metadata
-        if self.metadata_file.exists():
-            with open(self.metadata_file, 'r') as f:
-                self.metadata = json.load(f)
-        else:
-            # Create new metadata if file doesn't exist
-            self.metadata = {}
-            self._save_metadata()
+        if self.version_store is None or self._is_view(dataset_name):
+            return
+        try:
+            self.version_store.record(dataset_name, self.metadata[dataset_name].get("version", 0), frames, description)
+        except Exception as e:
+            print(f"Warning: could not record version of '{dataset_name}': {str(e)}")
 
-    def _save_metadata(self) -> None:
-        """Save the current metadata to a JSON file."""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=4)
+    def _apply_stored_schema(self, dataset_name: str, df: pd.DataFrame, compact: Optional[bool] = None) -> pd.DataFrame:
+        """
+        Convert a freshly read dataset to the compact schema saved in its metadata.
+        
+        If compaction is requested for a dataset that doesn't have a schema yet,
+        one is inferred now and saved so later reloads can reuse it.
+        """
+        if compact is None:
+            compact = self.compact_dtypes
+        
+        info = self.metadata[dataset_name]
+        if "schema" not in info:
+            if not compact:
+                return df
+            info["schema"] = infer_compact_schema(df)
+            self._save_metadata(dataset_name)
+        
+        return apply_schema(df, info["schema"])
+
+    def _convert_storage(self, dataset_name: str, df: pd.DataFrame) -> None:
+        """Rewrite a dataset in the configured storage format and drop the old file."""
+        info = self.metadata[dataset_name]
+        old_path = Path(info["file_path"])
+        new_path = self._dataset_file(dataset_name, self.storage_format)
+        
+        try:
+            get_storage_backend(self.storage_format).write(df, new_path)
+        except Exception as e:
+            # Keep using the old file if it can't be converted (e.g. mixed-type columns)
+            print(f"Warning: could not convert '{dataset_name}' to {self.storage_format}: {str(e)}")
+            if new_path.exists():
+                os.remove(new_path)
+            return
+        
+        info["file_path"] = str(new_path)
+        info["storage_format"] = self.storage_format
+        self._save_metadata(dataset_name)
+        
+        if old_path != new_path and old_path.exists():
+            os.remove(old_path)
+        self._drop_segments(dataset_name)
 
 
 
 
 
-    def load_dataset(self, file_path: str, dataset_name: str) -> bool:
+    def load_dataset(self, file_path: str, dataset_name: str, chunksize: Optional[int] = None,
+                     compact: Optional[bool] = None) -> bool:
         """
         Load a dataset from a CSV file and store it in the system.
         
@@ -76,9 +368,19 @@ class DatasetManager:
         4. Save the dataset
         5. Update metadata
         
+        Large files (or any file when chunksize is given) are streamed: the CSV is
+        read chunksize rows at a time and each chunk is written straight to storage,
+        so memory use stays bounded by the chunk size. The file is read twice then,
+        first to find the column types of the whole file (see infer_csv_dtypes).
+        
+        With compaction on, every column is converted to its most compact lossless
+        dtype and the resulting schema is saved in metadata for later reloads.
+        
         Args:
             file_path (str): Path to the CSV file
             dataset_name (str): Name to assign to the dataset
+            chunksize (Optional[int]): Rows per chunk when streaming (default: stream only large files)
+            compact (Optional[bool]): Compact the dtypes (defaults to the manager's compact_dtypes setting)
             
         Returns:
             bool: True if successful, False otherwise
@@ -87,9 +389,21 @@ class DatasetManager:
             # Step 1: Check if dataset name is already in use
             if dataset_name in self.metadata:
                 raise ValueError(f"Dataset name '{dataset_name}' already exists")
+            
+            # Files too big to comfortably hold in memory go through the streaming path
+            if chunksize is None and os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+                chunksize = DEFAULT_CHUNK_ROWS
+            if chunksize:
+                # The column types are worked out over the whole file first, so every chunk gets the same ones
+                return self.create_dataset_from_chunks(dataset_name, read_csv_chunks(file_path, chunksize),
+                                                       compact=compact)
 
-            # Step 2: Read the CSV file
+            # Step 2: Read the CSV file (compacting the dtypes if asked to)
             df = pd.read_csv(file_path)
+            schema = None
+            if compact or (compact is None and self.compact_dtypes):
+                schema = infer_compact_schema(df)
+                df = apply_schema(df, schema)
             
             # Step 3: Store dataset in memory
             self.datasets[dataset_name] = df # Eemember this is a dictionary, where key is the dataset name and value is the dataframe
@@ -98,25 +412,151 @@ class DatasetManager:
             dataset_dir = self.data_dir / dataset_name
             dataset_dir.mkdir(exist_ok=True)
             
-            # Step 5: Save dataset to file
-            output_path = dataset_dir / f"{dataset_name}.csv"
-            df.to_csv(output_path, index=False)
+            # Step 5: Save dataset to file in the configured storage format
+            output_path = self._dataset_file(dataset_name, self.storage_format)
+            get_storage_backend(self.storage_format).write(df, output_path)
             
             # Step 6: Update metadata with dataset information
             self.metadata[dataset_name] = {
                 "file_path": str(output_path),
+                "storage_format": self.storage_format,
                 "rows": len(df),
                 "columns": len(df.columns),
                 "column_names": list(df.columns),
                 "last_modified": pd.Timestamp.now().isoformat(),
-                "analyses_performed": []
+                "analyses_performed": [],
+                "version": 1
+            }
+            if schema is not None:
+                self.metadata[dataset_name]["schema"] = schema
+            self._save_metadata(dataset_name)
+            self._record_version(dataset_name, df, f"Loaded from {os.path.basename(file_path)}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error loading dataset: {str(e)}")
+            return False
+
+
+    def _feed_recorder(self, recorder, dataset_name: str, chunk: pd.DataFrame):
+        """
+        Add rows to a version recorder (see _record_version: a failure only
+        prints a warning and stops the recording).
+        
+        Returns:
+            The recorder, or None once recording failed
+        """
+        if recorder is None:
+            return None
+        try:
+            recorder.add(chunk)
+            return recorder
+        except Exception as e:
+            print(f"Warning: could not record version of '{dataset_name}': {str(e)}")
+            return None
+
+    def _close_recorder(self, recorder, dataset_name: str) -> None:
+        """Store a recorded version (a failure only prints a warning, like _record_version)."""
+        if recorder is None:
+            return
+        try:
+            recorder.close()
+        except Exception as e:
+            print(f"Warning: could not record version of '{dataset_name}': {str(e)}")
+
+
+    def create_dataset_from_chunks(self, dataset_name: str, chunks: Iterable[pd.DataFrame],
+                                   analysis_description: str = None, compact: Optional[bool] = None,
+                                   schema=None) -> bool:
+        """
+        Create a new stored dataset from an iterable of DataFrame chunks.
+        
+        Each chunk is written to storage as soon as it arrives and the metadata
+        entry (rows, columns, column_names) is built up as chunks go by, so the
+        whole dataset is never held in memory. The dataset is not kept in memory
+        afterwards either - it is read back lazily by get_dataset.
+        
+        With compaction on, the compact schema is built up chunk by chunk (a dtype
+        that fits the first chunk may not fit the whole file) and applied on every
+        reload; the chunks themselves are stored as they came in.
+        
+        The chunks are recorded as the dataset's first version on the way
+        (see version_store.py), without reading the data back.
+        
+        Steps:
+        1. Check if dataset name is already in use
+        2. Create a directory for the dataset
+        3. Write every chunk to storage
+        4. Update metadata
+        
+        Args:
+            dataset_name (str): Name to assign to the dataset
+            chunks (Iterable[pd.DataFrame]): Chunks of rows, all with the same columns
+            analysis_description (str): Optional description to record in analyses_performed
+            compact (Optional[bool]): Build a compact schema (defaults to the manager's compact_dtypes setting)
+            schema: Optional column types to store the chunks with (from StorageBackend.read_schema),
+                instead of the types of the first chunk
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        dataset_dir = self.data_dir / dataset_name
+        try:
+            # Step 1: Check if dataset name is already in use
+            if dataset_name in self.metadata:
+                raise ValueError(f"Dataset name '{dataset_name}' already exists")
+            
+            # Step 2: Create dataset directory
+            dataset_dir.mkdir(exist_ok=True)
+            output_path = self._dataset_file(dataset_name, self.storage_format)
+            
+            # Step 3: Write the chunks, collecting metadata along the way
+            entry = {
+                "file_path": str(output_path),
+                "storage_format": self.storage_format,
+                "rows": 0,
+                "columns": 0,
+                "column_names": []
             }
-            self._save_metadata()
+            if compact is None:
+                compact = self.compact_dtypes
+            schema_builder = SchemaBuilder() if compact else None
+            recorder = None
+            if self.version_store is not None:
+                recorder = self.version_store.recorder(dataset_name, 1, analysis_description or "Created")
+            
+            with get_storage_backend(self.storage_format).open_writer(output_path, schema) as writer:
+                for chunk in chunks:
+                    if not entry["column_names"]:
+                        entry["columns"] = len(chunk.columns)
+                        entry["column_names"] = list(chunk.columns)
+                    elif list(chunk.columns) != entry["column_names"]:
+                        raise ValueError("All chunks must have the same columns")
+                    
+                    writer.write(chunk)
+                    entry["rows"] += len(chunk)
+                    if schema_builder is not None:
+                        schema_builder.update(chunk)
+                    recorder = self._feed_recorder(recorder, dataset_name, chunk)
+            
+            # Step 4: Update metadata with dataset information
+            entry["last_modified"] = pd.Timestamp.now().isoformat()
+            entry["analyses_performed"] = [analysis_description] if analysis_description else []
+            entry["version"] = 1
+            if schema_builder is not None:
+                entry["schema"] = schema_builder.schema()
+            self.metadata[dataset_name] = entry
+            self._save_metadata(dataset_name)
+            self._close_recorder(recorder, dataset_name)
             
             return True
             
         except Exception as e:
             print(f"Error loading dataset: {str(e)}")
+            # Don't leave a half-written dataset behind
+            if dataset_name not in self.metadata and dataset_dir.exists():
+                shutil.rmtree(dataset_dir)
             return False
 
 
@@ -127,6 +567,9 @@ class DatasetManager:
         Returns:
             List[Tuple[str, Dict]]: List of (dataset_name, metadata) pairs
         """
+        # Pick up datasets added, changed or removed by other processes
+        self._refresh_metadata()
+        
         # Eempty list to store dataset information
         dataset_list = []
         
@@ -149,22 +592,13 @@ class DatasetManager:
         Returns:
             Optional[pd.DataFrame]: First N rows of the dataset, or None if not found
         """
-        # Check if dataset exists in metadata
-        if dataset_name not in self.metadata:
-            print(f"Dataset '{dataset_name}' not found")
+        # Get the dataset (loading it from disk if it isn't in memory)
+        df = self.get_dataset(dataset_name)
+        if df is None:
             return None
             
-        # If dataset is not in memory, load it from disk
-        if dataset_name not in self.datasets:
-            try:
-                file_path = self.metadata[dataset_name]["file_path"]
-                self.datasets[dataset_name] = pd.read_csv(file_path)
-            except Exception as e:
-                print(f"Error loading dataset from disk: {str(e)}")
-                return None
-            
         # Return first N rows
-        return self.datasets[dataset_name].head(n_rows)
+        return df.head(n_rows)
 
 
     def remove_dataset(self, dataset_name: str) -> bool:
@@ -187,19 +621,23 @@ class DatasetManager:
             # Step 1: Check if dataset exists in metadata
             if dataset_name not in self.metadata:
                 raise ValueError(f"Dataset '{dataset_name}' not found")
+            views = self._views_of(dataset_name)
+            if views:
+                raise ValueError(f"Dataset '{dataset_name}' has views ({', '.join(views)}), remove them first")
+            
+            # Step 2: Remove from memory
+            self.datasets.pop(dataset_name)
             
-            # Step 2: Remove dataset files
+            # Step 3: Remove dataset files
             dataset_dir = self.data_dir / dataset_name
             if dataset_dir.exists():
-                # Delete all files in the dataset directory
-                for file in dataset_dir.iterdir():
-                    os.remove(file)
-                # Remove the empty directory
-                dataset_dir.rmdir()
+                # Delete the dataset directory with everything in it (data files, indexes, caches)
+                shutil.rmtree(dataset_dir)
             
-            # Step 3: Update metadata
+            # Step 4: Update metadata
             del self.metadata[dataset_name]
-            self._save_metadata()
+            self.catalog.delete(dataset_name)
+            self._data_changed(dataset_name)
             
             return True
             
@@ -208,51 +646,86 @@ class DatasetManager:
             return False
 
     # We created this method to fetch the dataset from metadata file to be used in data_explorer.py
-    def get_dataset(self, dataset_name: str) -> Optional[pd.DataFrame]:
+    def get_dataset(self, dataset_name: str, memory_map: Optional[bool] = None,
+                    compact: Optional[bool] = None) -> Optional[pd.DataFrame]:
         """
         Get a dataset by name. If not in memory, load it from disk.
         
         Args:
             dataset_name (str): Name of the dataset to get
+            memory_map (Optional[bool]): Open the file memory-mapped (defaults to the manager's
+                memory_map setting). If the dataset is already in memory but was opened the
+                other way, it is saved (if it has unsaved changes) and opened again as asked.
+            compact (Optional[bool]): Compact the dtypes if the dataset has no saved schema yet
+                (defaults to the manager's compact_dtypes setting). A saved schema is always applied.
             
         Returns:
             Optional[pd.DataFrame]: The dataset if found, None otherwise
         """
-        # Check if dataset exists in metadata
+        # Check if dataset exists in metadata (including changes made by other processes)
+        self._refresh_metadata()
         if dataset_name not in self.metadata:
             print(f"Dataset '{dataset_name}' not found")
             return None
             
         # If dataset is not in memory, load it from disk
-        if dataset_name not in self.datasets:
+        df = self.datasets.get(dataset_name)
+        if df is not None and memory_map is not None and not self._is_view(dataset_name) \
+                and (memory_map and self._can_memory_map(dataset_name)) != self._is_memory_mapped(dataset_name, df):
+            # Opened the other way: save any unsaved changes, then open it again as asked
+            self.datasets.flush(dataset_name)
+            self.datasets.pop(dataset_name, keep_pin=True)
+            df = None
+        
+        if df is None and self._is_view(dataset_name):
+            try:
+                df = self._materialize_view(dataset_name)
+                if self.metadata[dataset_name].get("cache", True):
+                    self.datasets[dataset_name] = df
+            
+            except Exception as e:
+                print(f"Error materializing view: {str(e)}")
+                return None
+        
+        elif df is None:
             try:
-                file_path = self.metadata[dataset_name]["file_path"]
-                self.datasets[dataset_name] = pd.read_csv(file_path)
+                df = self._read_dataset(dataset_name, memory_map)
+                df = self._apply_stored_schema(dataset_name, df, compact)
+                self.datasets[dataset_name] = df
+                
+                if (self.memory_map if memory_map is None else memory_map) and self._can_memory_map(dataset_name):
+                    self._memory_mapped[dataset_name] = id(df)
+                else:
+                    self._memory_mapped.pop(dataset_name, None)
             
             except Exception as e:
                 print(f"Error loading dataset from disk: {str(e)}")
                 return None
             
-        return self.datasets[dataset_name] 
+        return df
 
 
 
 
 
-    def update_dataset(self, dataset_name: str, new_df: pd.DataFrame, analysis_description: str = None) -> bool:
+    def update_dataset(self, dataset_name: str, new_df: pd.DataFrame,
+                       analysis_description: Union[str, List[str], None] = None, persist: bool = True) -> bool:
         """
         Update an existing dataset with new data.
         
         Steps:
         1. Check if dataset exists
-        2. Update dataset in memory
-        3. Save updated dataset to file
+        2. Save updated dataset to file
+        3. Update dataset in memory
         4. Update metadata
         
         Args:
             dataset_name (str): Name of the dataset to update
             new_df (pd.DataFrame): New data to replace the existing dataset
-            analysis_description (str): Description of the analysis performed on the dataset
+            analysis_description (Union[str, List[str], None]): Description of the analysis performed on
+                the dataset, or a list of them (e.g. every step of a CleaningPipeline)
+            persist (bool): Write the data to disk now. If False the dataset is only marked
+                dirty in memory and saved when it is evicted or flush_datasets() is called.
             
         Returns:
             bool: True if successful, False otherwise
@@ -261,18 +734,35 @@ class DatasetManager:
             # Step 1: Check if dataset exists
             if dataset_name not in self.metadata:
                 raise ValueError(f"Dataset '{dataset_name}' not found")
-                
-            # Step 2: Update dataset in memory
-            self.datasets[dataset_name] = new_df
             
-            # Step 3: Save updated dataset to file
+            # Keep the data being replaced if its version was never recorded (e.g. a dataset
+            # saved before versioning was added) - unsaved in-memory changes are never recorded
+            if not self._has_version(dataset_name) and not self.datasets.is_dirty(dataset_name):
+                self._record_version(dataset_name, self.iter_chunks(dataset_name), "Data before versioning")
+            
+            # Updating a view turns it into a regular dataset with its own file
+            if self._is_view(dataset_name):
+                self._detach_view(dataset_name)
             file_path = self.metadata[dataset_name]["file_path"]
-            new_df.to_csv(file_path, index=False)
+            
+            # Compacted datasets stay compacted (the new data may need different types)
+            if "schema" in self.metadata[dataset_name]:
+                self.metadata[dataset_name]["schema"] = infer_compact_schema(new_df)
+                new_df = apply_schema(new_df, self.metadata[dataset_name]["schema"])
+                
+            # Step 2: Save updated dataset to file using its storage backend
+            if persist:
+                self._write_dataset(dataset_name, new_df)
+            
+            # Step 3: Update dataset in memory
+            self.datasets.put(dataset_name, new_df, dirty=not persist)
             
             # Step 4: Update metadata with new information
             if "analyses_performed" not in self.metadata[dataset_name]:
                 self.metadata[dataset_name]["analyses_performed"] = []
-            if analysis_description:
+            if isinstance(analysis_description, list):
+                self.metadata[dataset_name]["analyses_performed"].extend(analysis_description)
+            elif analysis_description:
                 self.metadata[dataset_name]["analyses_performed"].append(analysis_description)
             
             
@@ -283,10 +773,463 @@ class DatasetManager:
                 "column_names": list(new_df.columns),
                 "last_modified": pd.Timestamp.now().isoformat()
             })
-            self._save_metadata()
+            self._data_changed(dataset_name)
+            self._save_metadata(dataset_name)
+            
+            # Step 5: Record the new version (unsaved changes are recorded when they are flushed)
+            if persist:
+                if isinstance(analysis_description, list):
+                    analysis_description = "; ".join(analysis_description)
+                self._record_version(dataset_name, new_df, analysis_description)
             
             return True
             
         except Exception as e:
             print(f"Error updating dataset: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+
+
+    def export_dataset(self, dataset_name: str, file_path: str) -> bool:
+        """
+        Export a dataset to a CSV file, whatever format it is stored in.
+        
+        Args:
+            dataset_name (str): Name of the dataset to export
+            file_path (str): Destination CSV file
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            df = self.get_dataset(dataset_name)
+            if df is None:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            
+            get_storage_backend("csv").write(df, file_path)
+            return True
+            
+        except Exception as e:
+            print(f"Error exporting dataset: {str(e)}")
+            return False
+
+
+
+    def pin_dataset(self, dataset_name: str) -> bool:
+        """
+        Keep a dataset in memory even when the memory budget is exceeded.
+        
+        Args:
+            dataset_name (str): Name of the dataset to pin
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if self.get_dataset(dataset_name) is None:
+            return False
+        self.datasets.pin(dataset_name)
+        return True
+
+
+    def unpin_dataset(self, dataset_name: str) -> None:
+        """Allow a pinned dataset to be evicted again."""
+        self.datasets.unpin(dataset_name)
+
+
+    def flush_datasets(self) -> None:
+        """Save every dataset that has unsaved changes in memory."""
+        self.datasets.flush_all()
+
+
+    def cache_stats(self) -> Dict[str, float]:
+        """
+        Get hit, miss and eviction counts for the in-memory dataset cache.
+        
+        Returns:
+            Dict[str, float]: Cache statistics (see DatasetCache.stats)
+        """
+        return self.datasets.stats()
+
+
+
+    def append_rows(self, dataset_name: str, rows: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                    analysis_description: str = None) -> bool:
+        """
+        Append new rows to a dataset without rewriting the data already stored.
+        
+        The rows are written as a new segment file next to the dataset's main
+        file, and only rows and last_modified are updated in metadata. Segments
+        are merged back into the main file the next time the whole dataset is
+        rewritten (e.g. by update_dataset). The new version is recorded from
+        the previous one plus the new rows, without reading the old rows.
+        
+        Steps:
+        1. Check if dataset exists
+        2. Save any unsaved in-memory changes
+        3. Write the new rows to a segment file
+        4. Update metadata
+        
+        Args:
+            dataset_name (str): Name of the dataset to append to
+            rows (Union[pd.DataFrame, Iterable[pd.DataFrame]]): The new rows, as one DataFrame
+                or an iterable of chunks (e.g. from pd.read_csv(..., chunksize=...))
+            analysis_description (str): Optional description to record in analyses_performed
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        segment_path = None
+        segment_saved = False
+        try:
+            # Step 1: Check if dataset exists
+            if dataset_name not in self.metadata:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            if self._is_view(dataset_name):
+                raise ValueError(f"'{dataset_name}' is a view, append the rows to '{self.metadata[dataset_name]['parent']}' instead")
+            info = self.metadata[dataset_name]
+            column_names = info["column_names"]
+            
+            # Step 2: Unsaved changes have to reach disk first, then the in-memory copy is stale
+            self.datasets.flush(dataset_name)
+            self.datasets.pop(dataset_name, keep_pin=True)
+            
+            # Step 3: Write the new rows to the next segment file
+            segments = info.get("segments", [])
+            main_path = Path(info["file_path"])
+            segment_path = main_path.with_name(f"{main_path.stem}.part-{len(segments) + 1:04d}{main_path.suffix}")
+            
+            if isinstance(rows, pd.DataFrame):
+                rows = [rows]
+            recorder = None
+            if self.version_store is not None:
+                version = info.get("version", 0)
+                try:
+                    recorder = self.version_store.append_recorder(dataset_name, version + 1, version,
+                                                                  analysis_description or "Appended rows")
+                except Exception as e:
+                    print(f"Warning: could not record version of '{dataset_name}': {str(e)}")
+            # Segments are written with the column types of the main file so they line up when read back
+            backend = get_storage_backend(info.get("storage_format", "csv"))
+            schema = backend.read_schema(main_path)
+            with backend.open_writer(segment_path, schema) as writer:
+                for chunk in rows:
+                    if sorted(chunk.columns) != sorted(column_names):
+                        raise ValueError(f"New rows must have the same columns as '{dataset_name}': "
+                                         f"{', '.join(column_names)}")
+                    writer.write(chunk[column_names])
+                    recorder = self._feed_recorder(recorder, dataset_name, chunk[column_names])
+            
+            if writer.rows_written == 0:
+                os.remove(segment_path)
+                return True
+            
+            # Step 4: Update metadata incrementally
+            info["segments"] = segments + [str(segment_path)]
+            segment_saved = True
+            info["rows"] += writer.rows_written
+            info["last_modified"] = pd.Timestamp.now().isoformat()
+            if analysis_description:
+                info.setdefault("analyses_performed", []).append(analysis_description)
+            self._data_changed(dataset_name)
+            self._save_metadata(dataset_name)
+            self._close_recorder(recorder, dataset_name)
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error appending to dataset: {str(e)}")
+            # Don't leave a half-written segment behind
+            if segment_path is not None and segment_path.exists() and not segment_saved:
+                os.remove(segment_path)
+            return False
+
+
+    def append_file(self, file_path: str, dataset_name: str, chunksize: Optional[int] = None) -> bool:
+        """
+        Append the rows of a CSV file to an existing dataset (see append_rows).
+        
+        The file is read with the column types of the stored dataset, so text
+        columns stay text even where the new rows only hold numbers.
+        
+        Args:
+            file_path (str): Path to the CSV file with the new rows
+            dataset_name (str): Name of the dataset to append to
+            chunksize (Optional[int]): Rows per chunk when streaming (default: stream only large files)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if chunksize is None and os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+                chunksize = DEFAULT_CHUNK_ROWS
+            if dataset_name not in self.metadata or self._is_view(dataset_name):
+                # append_rows reports it
+                dtypes = None
+            else:
+                info = self.metadata[dataset_name]
+                schema = get_storage_backend(info.get("storage_format", "csv")).read_schema(Path(info["file_path"]))
+                dtypes = csv_dtypes_for_schema(schema) if schema is not None else None
+            
+            if chunksize:
+                rows = read_csv_chunks(file_path, chunksize, dtypes)
+            else:
+                rows = pd.read_csv(file_path, dtype=dtypes or None)
+            
+        except Exception as e:
+            print(f"Error appending to dataset: {str(e)}")
+            return False
+        
+        return self.append_rows(dataset_name, rows, f"Appended rows from {os.path.basename(file_path)}")
+
+
+    def iter_chunks(self, dataset_name: str, chunksize: int = DEFAULT_CHUNK_ROWS,
+                    columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over a dataset in chunks without loading all of it into memory.
+        
+        If the dataset is already in memory the chunks are slices of it,
+        otherwise they are read from the stored files (and any appended
+        segments) one at a time, with the dataset's compact schema applied.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            chunksize (int): Maximum rows per chunk
+            columns (Optional[List[str]]): Optional list of columns to read (None reads all of them)
+            
+        Yields:
+            pd.DataFrame: One chunk of rows at a time
+        """
+        if dataset_name not in self.metadata:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+        
+        if dataset_name in self.datasets or self._is_view(dataset_name):
+            # Views only exist in memory
+            df = self.datasets[dataset_name] if dataset_name in self.datasets else self.get_dataset(dataset_name)
+            if columns is not None:
+                df = df[columns]
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+            return
+        
+        info = self.metadata[dataset_name]
+        backend = get_storage_backend(info.get("storage_format", "csv"))
+        schema = info.get("schema")
+        for file_path in self._dataset_files(dataset_name):
+            for chunk in backend.iter_batches(file_path, chunksize, columns):
+                yield apply_schema(chunk, schema) if schema else chunk
+
+
+    def stored_size(self, dataset_name: str) -> int:
+        """
+        Get the size on disk (in bytes) of a dataset's files.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            
+        Returns:
+            int: Total size of the main file and any appended segments (0 for a view)
+        """
+        if self._is_view(dataset_name):
+            return 0
+        return sum(os.path.getsize(f) for f in self._dataset_files(dataset_name) if os.path.exists(f))
+
+
+
+    def take_rows(self, dataset_name: str, positions: np.ndarray, chunksize: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+        """
+        Get some rows of a dataset by position, without loading all of it into memory.
+        
+        The result is the same as get_dataset(dataset_name).iloc[positions]:
+        rows in the same order, labelled with their positions, with the same
+        dtypes (category columns keep all the dataset's categories). Only
+        one chunk of the stored data is held in memory at a time.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            positions (np.ndarray): Sorted row positions to take
+            chunksize (int): Rows read per chunk
+            
+        Returns:
+            pd.DataFrame: The selected rows
+        """
+        if dataset_name in self.datasets or self._is_view(dataset_name):
+            return self.get_dataset(dataset_name).iloc[positions]
+        
+        parts = []
+        categories = {}
+        offset = 0
+        for chunk in self.iter_chunks(dataset_name, chunksize):
+            # Each chunk only knows its own categories - collect them all
+            for col in chunk.columns:
+                if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    categories[col] = categories.get(col, pd.Index([])).union(chunk[col].cat.categories)
+            
+            start, end = np.searchsorted(positions, [offset, offset + len(chunk)])
+            part = chunk.iloc[positions[start:end] - offset]
+            part.index = positions[start:end]
+            parts.append(part)
+            offset += len(chunk)
+        
+        if not parts:
+            return pd.DataFrame(columns=self.metadata[dataset_name].get("column_names", []))
+        
+        df = pd.concat(parts)
+        if categories:
+            df = df.assign(**{col: df[col].astype(pd.CategoricalDtype(cats)) for col, cats in categories.items()})
+        return df
+
+
+
+    def create_view(self, view_name: str, parent_name: str, condition: str,
+                    analysis_description: str = None, cache: bool = True) -> bool:
+        """
+        Save a filtered subset of a dataset as a view.
+        
+        A view only stores its parent's name and the filter condition in
+        the catalog. Its rows are computed from the parent when get_dataset()
+        is called, so saving a subset costs no storage and no write time. When
+        the parent changes, the view's rows are dropped and recomputed on next
+        use. Updating a view (e.g. after cleaning it) turns it into a regular
+        dataset with its own file.
+        
+        Steps:
+        1. Check the names
+        2. Evaluate the condition once (to validate it and record the view's shape)
+        3. Save the view's metadata
+        
+        Args:
+            view_name (str): Name for the view
+            parent_name (str): Dataset (or view) to filter
+            condition (str): Filter condition in DataFrame.query syntax
+            analysis_description (str): Optional description to record in analyses_performed
+            cache (bool): Keep the computed rows in memory between get_dataset() calls
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Step 1: Check the names
+            if view_name in self.metadata:
+                raise ValueError(f"Dataset name '{view_name}' already exists")
+            if parent_name not in self.metadata:
+                raise ValueError(f"Dataset '{parent_name}' not found")
+            
+            # Step 2: Evaluate the condition once
+            parent_df = self.get_dataset(parent_name)
+            if parent_df is None:
+                raise ValueError(f"Dataset '{parent_name}' could not be loaded")
+            df = self._filter_rows(parent_df, condition)
+            
+            # Step 3: Save the view's metadata (there are no data files)
+            self.metadata[view_name] = {
+                "type": "view",
+                "parent": parent_name,
+                "condition": condition,
+                "cache": cache,
+                "rows": len(df),
+                "columns": len(df.columns),
+                "column_names": list(df.columns),
+                "last_modified": pd.Timestamp.now().isoformat(),
+                "analyses_performed": [analysis_description] if analysis_description else [],
+                "version": 1
+            }
+            if cache:
+                self.datasets[view_name] = df
+            self._save_metadata(view_name)
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error creating view: {str(e)}")
+            return False
+
+    @staticmethod
+    def _filter_rows(df: pd.DataFrame, condition: str) -> pd.DataFrame:
+        plan = compile_condition(condition, list(df.columns))
+        return df[plan.evaluate(df)]
+
+    def _materialize_view(self, view_name: str) -> pd.DataFrame:
+        """Compute a view's rows from its parent (and keep its row count in metadata current)."""
+        info = self.metadata[view_name]
+        parent_df = self.get_dataset(info["parent"])
+        if parent_df is None:
+            raise ValueError(f"Parent dataset '{info['parent']}' of view '{view_name}' could not be loaded")
+        
+        df = self._filter_rows(parent_df, info["condition"])
+        if info.get("rows") != len(df) or info.get("column_names") != list(df.columns):
+            info.update({"rows": len(df), "columns": len(df.columns), "column_names": list(df.columns)})
+            self._save_metadata(view_name)
+        return df
+
+    def _detach_view(self, view_name: str) -> None:
+        """Turn a view into a regular dataset (its data is written by the caller)."""
+        info = self.metadata[view_name]
+        description = f"Saved from view of '{info['parent']}' filtered with: {info['condition']}"
+        for key in ("type", "parent", "condition", "cache"):
+            info.pop(key, None)
+        
+        (self.data_dir / view_name).mkdir(parents=True, exist_ok=True)
+        info["file_path"] = str(self._dataset_file(view_name, self.storage_format))
+        info["storage_format"] = self.storage_format
+        info.setdefault("analyses_performed", []).append(description)
+
+
+
+    def list_versions(self, dataset_name: str) -> Optional[List[Dict]]:
+        """
+        Get the recorded versions of a dataset, oldest first.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            
+        Returns:
+            Optional[List[Dict]]: One entry per version (version, created, description, rows,
+                columns, new_chunks, new_bytes, chunk_count), or None if error
+        """
+        try:
+            if dataset_name not in self.metadata:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            if self.version_store is None:
+                raise ValueError("Versioning is turned off (see DatasetManager(versioning=True))")
+            if self._is_view(dataset_name):
+                raise ValueError(f"'{dataset_name}' is a view, it has no versions of its own")
+            return self.version_store.list_versions(dataset_name)
+            
+        except Exception as e:
+            print(f"Error listing versions: {str(e)}")
+            return None
+
+
+    def checkout_version(self, dataset_name: str, version: int) -> bool:
+        """
+        Restore an earlier version of a dataset's data.
+        
+        The old data becomes a new version on top of the current one (like
+        any other update), so nothing is lost and checking out is undone by
+        checking out the version before it. Since it is made of chunks that
+        are already stored, the new version costs no extra space.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            version (int): The version to restore (see list_versions)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if dataset_name not in self.metadata:
+                raise ValueError(f"Dataset '{dataset_name}' not found")
+            if self.version_store is None:
+                raise ValueError("Versioning is turned off (see DatasetManager(versioning=True))")
+            if self._is_view(dataset_name):
+                raise ValueError(f"'{dataset_name}' is a view, it has no versions of its own")
+            if not self.version_store.has_version(dataset_name, version):
+                raise ValueError(f"Version {version} of '{dataset_name}' not found")
+            
+            df = self.version_store.read_version(dataset_name, version)
+            
+        except Exception as e:
+            print(f"Error checking out version: {str(e)}")
+            return False
+        
+        return self.update_dataset(dataset_name, df, f"Checked out version {version}")
@@ -0,0 +1,182 @@
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+# Two different hash keys give every row a 128-bit fingerprint, so two different
+# rows getting the same one is practically impossible even for billions of rows
+HASH_KEYS = ("0123456789123456", "pylytics-dedup-2")
+
+# (fingerprint, row position) records as they are buffered and spilled to disk
+RECORD_TYPE = np.dtype([("hi", "<u8"), ("lo", "<u8"), ("pos", "<i8")])
+
+# Rows are split into 2 ** PARTITION_BITS partitions by the top bits of their fingerprint
+PARTITION_BITS = 6
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash every row of a DataFrame into a 128-bit fingerprint.
+
+    Equal rows get equal fingerprints whichever chunk they are in: a column
+    can be read as int64 in one chunk and float64 in another, so every
+    number is hashed the same way whatever its column's dtype (see
+    _numeric_parts), and categorical columns are hashed by value, not by code.
+
+    Returns:
+        np.ndarray: One RECORD_TYPE record per row ("pos" is left at 0)
+    """
+    parts = {}
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            parts[(position, "int")], parts[(position, "float")] = _numeric_parts(series)
+        else:
+            parts[(position, "value")] = series.array
+    hashed = pd.DataFrame(parts) if parts else df.reset_index(drop=True)
+
+    records = np.zeros(len(df), dtype=RECORD_TYPE)
+    records["hi"] = pd.util.hash_pandas_object(hashed, index=False, hash_key=HASH_KEYS[0]).to_numpy()
+    records["lo"] = pd.util.hash_pandas_object(hashed, index=False, hash_key=HASH_KEYS[1]).to_numpy()
+    return records
+
+
+def _numeric_parts(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split a numerical column into an int64 part and a float64 part that are hashed together.
+
+    Whole numbers go into the int64 part exactly (so ids above 2 ** 53 stay
+    distinct, and 5 in an int64 chunk matches 5.0 in a float64 chunk) with a
+    float part of 0.0; fractions, infinities and missing values (NaN) go into
+    the float part with an int part of 0.
+    """
+    if pd.api.types.is_integer_dtype(series):
+        missing = series.isna().to_numpy()
+        ints = series.to_numpy(dtype="int64", na_value=0)
+        return ints, np.where(missing, np.nan, 0.0)
+
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        whole = (values == np.floor(values)) & (values >= -2.0 ** 63) & (values < 2.0 ** 63)
+    ints = np.where(whole, values, 0.0).astype(np.int64)
+    return ints, np.where(whole, 0.0, values)
+
+
+
+class StreamingDeduplicator:
+    """
+    Find duplicate rows in a dataset that is read chunk by chunk.
+
+    Only a 24-byte record (row fingerprint and position) is kept per row, never
+    the rows themselves. Records are split into partitions by fingerprint, so
+    every copy of a row ends up in the same partition; once the buffered records
+    use more than memory_mb they are appended to one file per partition in a
+    temporary spill directory. keep_mask() then goes through the partitions one
+    at a time and marks the first occurrence of every fingerprint, which gives
+    exactly the rows DataFrame.drop_duplicates() keeps.
+
+    Usage:
+        dedup = StreamingDeduplicator(memory_mb=256)
+        for chunk in chunks:
+            dedup.add(chunk)
+        keep = dedup.keep_mask()   # True for the rows to keep
+        dedup.close()
+    """
+
+    def __init__(self, memory_mb: float = 256, spill_dir: Optional[str] = None):
+        """
+        Args:
+            memory_mb: Memory the buffered records may use before they are spilled to disk
+            spill_dir: Where to create the temporary spill directory (the system default if None)
+        """
+        self.max_buffered = max(1, int(memory_mb * 1024 ** 2) // RECORD_TYPE.itemsize)
+        self.spill_dir = spill_dir
+        self.rows = 0
+
+        self._partitions = 2 ** PARTITION_BITS
+        self._buffers: List[List[np.ndarray]] = [[] for _ in range(self._partitions)]
+        self._buffered = 0
+        self._spill_path = None  # Created the first time records are spilled
+
+    @property
+    def spilled(self) -> bool:
+        """Whether any records had to be written to disk."""
+        return self._spill_path is not None
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Add the next chunk of rows (only the columns that define a duplicate)."""
+        records = row_fingerprints(chunk)
+        records["pos"] = np.arange(self.rows, self.rows + len(records))
+        self.rows += len(records)
+
+        partition = (records["hi"] >> np.uint64(64 - PARTITION_BITS)).astype(np.intp)
+        order = np.argsort(partition, kind="stable")
+        bounds = np.searchsorted(partition[order], np.arange(self._partitions + 1))
+        for i in range(self._partitions):
+            if bounds[i] < bounds[i + 1]:
+                self._buffers[i].append(records[order[bounds[i]:bounds[i + 1]]])
+
+        self._buffered += len(records)
+        if self._buffered > self.max_buffered:
+            self._spill()
+
+    def keep_mask(self) -> np.ndarray:
+        """
+        Mark the first occurrence of every distinct row.
+
+        Returns:
+            np.ndarray: Boolean array with one entry per row added, True for the rows to keep
+        """
+        keep = np.zeros(self.rows, dtype=bool)
+        for i in range(self._partitions):
+            records = self._partition_records(i)
+            if len(records) == 0:
+                continue
+
+            # Stable sort by fingerprint: copies of a row stay in position order,
+            # so the first record of each group is the row's first occurrence
+            order = np.lexsort((records["lo"], records["hi"]))
+            records = records[order]
+            first = np.ones(len(records), dtype=bool)
+            first[1:] = (records["hi"][1:] != records["hi"][:-1]) | (records["lo"][1:] != records["lo"][:-1])
+            keep[records["pos"][first]] = True
+        return keep
+
+    def close(self) -> None:
+        """Delete the spill files."""
+        self._buffers = [[] for _ in range(self._partitions)]
+        if self._spill_path is not None:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+
+    def __enter__(self) -> "StreamingDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+
+    def _spill(self) -> None:
+        """Append the buffered records to their partitions' files."""
+        if self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(prefix="pylytics-dedup-", dir=self.spill_dir)
+        for i, buffer in enumerate(self._buffers):
+            if buffer:
+                with open(f"{self._spill_path}/{i}.bin", "ab") as f:
+                    np.concatenate(buffer).tofile(f)
+                buffer.clear()
+        self._buffered = 0
+
+    def _partition_records(self, i: int) -> np.ndarray:
+        parts = []
+        if self._spill_path is not None:
+            try:
+                parts.append(np.fromfile(f"{self._spill_path}/{i}.bin", dtype=RECORD_TYPE))
+            except FileNotFoundError:
+                pass
+        parts.extend(self._buffers[i])
+        if not parts:
+            return np.zeros(0, dtype=RECORD_TYPE)
+        return np.concatenate(parts)
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+# Object columns with at most this many distinct values (and mostly repeated values) become categories
+MAX_CATEGORIES = 1000
+MAX_CATEGORY_RATIO = 0.5
+
+INT_TYPES = ["int8", "int16", "int32", "int64"]
+UINT_TYPES = ["uint8", "uint16", "uint32", "uint64"]
+
+
+class SchemaBuilder:
+    """
+    Work out the most compact lossless dtype for every column of a dataset.
+
+    Columns are inspected one chunk at a time with update(), so a schema can be
+    built for data that never fits in memory all at once. Only small summaries
+    are kept per column (min/max, null flags and up to MAX_CATEGORIES distinct values).
+
+    The rules are:
+    - integers are downcast to the smallest (unsigned) integer type that fits
+    - floats holding only whole numbers become nullable integers (Int8, UInt16, ...)
+    - other floats become float32 if that doesn't change any value
+    - object columns of True/False (with missing values) become nullable "boolean"
+    - low-cardinality object columns become "category"
+    """
+
+    def __init__(self, max_categories: int = MAX_CATEGORIES, max_category_ratio: float = MAX_CATEGORY_RATIO):
+        self.max_categories = max_categories
+        self.max_category_ratio = max_category_ratio
+        self.columns: Dict[str, Dict] = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Fold another chunk of rows into the column summaries."""
+        for col in df.columns:
+            series = df[col]
+            info = self.columns.setdefault(col, {
+                "dtype": str(series.dtype),
+                "count": 0,
+                "has_nulls": False,
+                "min": None,
+                "max": None,
+                "integral": True,
+                "float32_exact": True,
+                "all_bool": True,
+                "uniques": set()
+            })
+
+            # A column that changes dtype between chunks is left alone
+            if info["dtype"] != str(series.dtype):
+                info["dtype"] = "mixed"
+                continue
+
+            values = series.dropna()
+            info["count"] += len(values)
+            info["has_nulls"] = info["has_nulls"] or len(values) < len(series)
+            if len(values) == 0:
+                continue
+
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                arr = values.to_numpy()
+                low, high = arr.min(), arr.max()
+                info["min"] = low if info["min"] is None else min(info["min"], low)
+                info["max"] = high if info["max"] is None else max(info["max"], high)
+
+                if pd.api.types.is_float_dtype(series):
+                    info["integral"] = info["integral"] and bool(np.all(np.mod(arr, 1) == 0))
+                    info["float32_exact"] = info["float32_exact"] and bool(
+                        np.all(arr.astype(np.float32).astype(arr.dtype) == arr))
+
+            elif pd.api.types.is_object_dtype(series):
+                info["all_bool"] = info["all_bool"] and bool(values.map(type).eq(bool).all())
+                if len(info["uniques"]) <= self.max_categories:
+                    info["uniques"].update(values.unique()[:self.max_categories + 1])
+
+    def schema(self) -> Dict[str, str]:
+        """
+        Get the compact dtype for every column seen so far.
+
+        Returns:
+            Dictionary mapping column name to a dtype string accepted by astype()
+        """
+        return {col: self._compact_dtype(info) for col, info in self.columns.items()}
+
+    def _compact_dtype(self, info: Dict) -> str:
+        dtype = info["dtype"]
+        if info["count"] == 0 or dtype == "mixed":
+            return dtype
+
+        if dtype in INT_TYPES + UINT_TYPES:
+            return smallest_int_type(info["min"], info["max"])
+
+        if dtype in ("float32", "float64"):
+            if info["integral"] and abs(info["min"]) < 2 ** 53 and abs(info["max"]) < 2 ** 53:
+                # Nullable integer types are spelled with capitals (Int8, UInt16, ...)
+                int_type = smallest_int_type(info["min"], info["max"])
+                return int_type.replace("uint", "UInt").replace("int", "Int")
+            return "float32" if info["float32_exact"] else dtype
+
+        if dtype == "object":
+            if info["all_bool"]:
+                return "boolean"
+            n_unique = len(info["uniques"])
+            if n_unique <= self.max_categories and n_unique <= info["count"] * self.max_category_ratio:
+                return "category"
+
+        return dtype
+
+
+
+def smallest_int_type(low, high) -> str:
+    """Return the name of the smallest numpy integer type that holds every value in [low, high]."""
+    candidates = UINT_TYPES if low >= 0 else INT_TYPES
+    for name in candidates:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return name
+    return "int64"
+
+
+def infer_compact_schema(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Work out the compact dtype for every column of an in-memory DataFrame.
+
+    Args:
+        df: DataFrame to inspect
+
+    Returns:
+        Dictionary mapping column name to its compact dtype
+    """
+    builder = SchemaBuilder()
+    builder.update(df)
+    return builder.schema()
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """
+    Convert the columns of a DataFrame to the dtypes in a schema.
+
+    Columns that are already the right type are left untouched (not copied).
+    A column is also left alone if converting it would lose data - for example
+    when rows appended since the schema was built no longer fit in an int8.
+
+    Args:
+        df: DataFrame to convert
+        schema: Dictionary mapping column name to dtype (from infer_compact_schema)
+
+    Returns:
+        DataFrame with the schema applied
+    """
+    converted = {}
+    for col, dtype in schema.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+
+        series = df[col]
+        target = pd.api.types.pandas_dtype(dtype)
+
+        # numpy silently wraps integers that overflow, so check the range first
+        if pd.api.types.is_integer_dtype(target) and pd.api.types.is_numeric_dtype(series):
+            limits = np.iinfo(target.numpy_dtype if hasattr(target, "numpy_dtype") else target)
+            values = series.dropna()
+            if len(values) and (values.min() < limits.min or values.max() > limits.max):
+                continue
+
+        try:
+            result = series.astype(target)
+        except (TypeError, ValueError):
+            continue
+
+        # Don't accept a float conversion that changes values
+        if pd.api.types.is_float_dtype(target) and pd.api.types.is_float_dtype(series):
+            if not np.array_equal(result.to_numpy(series.dtype), series.to_numpy(), equal_nan=True):
+                continue
+
+        converted[col] = result
+
+    if not converted:
+        return df
+    return df.assign(**converted)
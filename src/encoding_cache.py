@@ -0,0 +1,181 @@
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+ENCODING_DIR = "_encodings"
+
+
+def encode_column(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Label encode a column: each value becomes the position of its string form among the sorted distinct strings.
+
+    Gives the same codes as LabelEncoder().fit_transform(series.astype(str))
+    for the values that are present, but without sorting every row: one hash
+    pass (pd.factorize) finds the distinct values, only those are turned into
+    strings and sorted, and the codes are remapped with one lookup.
+
+    Args:
+        series: The column
+
+    Returns:
+        Tuple of (codes, with -1 for missing values, and the sorted distinct strings)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    # Different values can have the same string form (e.g. 1 and "1"), np.unique merges them
+    categories, remap = np.unique(np.asarray(uniques, dtype=object).astype(str), return_inverse=True)
+    dtype = np.int32 if len(categories) < 2 ** 31 else np.int64
+    remap = np.append(remap.astype(dtype), -1)  # codes of -1 (missing) stay -1
+    return remap[codes], categories
+
+
+class ColumnEncoding:
+    """Integer codes of a categorical column and the strings they stand for."""
+
+    def __init__(self, codes: np.ndarray, categories: np.ndarray, version: Optional[int] = None):
+        self.codes = codes              # -1 where the value is missing
+        self.categories = categories    # code -> string, sorted
+        self.version = version          # Dataset version the codes were computed from
+
+    def with_missing_as(self, missing: str) -> np.ndarray:
+        """
+        The codes, with missing values encoded as if they were the string `missing`.
+
+        That's what encoding column.fillna(missing).astype(str) would give:
+        `missing` takes its place among the sorted strings (or the code of an
+        equal value) and the codes after it move up by one.
+        """
+        codes = np.asarray(self.codes)
+        is_missing = codes < 0
+        if not is_missing.any():
+            return codes
+        position = int(np.searchsorted(self.categories, missing))
+        if position < len(self.categories) and self.categories[position] == missing:
+            return np.where(is_missing, position, codes)
+        return np.where(is_missing, position, codes + (codes >= position))
+
+
+
+class EncodingCache:
+    """
+    Label encodings of categorical columns, computed once per dataset version and shared.
+
+    The Visualizer (correlation heatmaps) and the models (preprocess_data)
+    both turn categorical columns into integer codes. Instead of fitting a
+    LabelEncoder, which sorts every string, on every call, the codes are
+    computed once with encode_column, saved under data/<dataset>/_encodings/
+    and memory-mapped back (also across restarts). Every encoding stores the
+    dataset version it was computed from and all of a dataset's encodings
+    are dropped as soon as its data changes.
+    """
+
+    def __init__(self, dataset_manager):
+        """
+        Args:
+            dataset_manager: Instance of DatasetManager
+        """
+        self.dataset_manager = dataset_manager
+
+        # (dataset name, column) -> loaded encoding
+        self._loaded: Dict[Tuple[str, str], ColumnEncoding] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        dataset_manager.add_change_listener(self.invalidate)
+
+
+
+    def encoding(self, dataset_name: str, column: str) -> ColumnEncoding:
+        """
+        Get the encoding of a column for the current version of a dataset (computing it if needed).
+
+        Args:
+            dataset_name: Name of the dataset
+            column: Column to encode
+
+        Returns:
+            ColumnEncoding: The codes (one per row, -1 for missing values) and their strings
+        """
+        version = self.dataset_manager.dataset_version(dataset_name)
+        if version is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+
+        encoding = self._loaded.get((dataset_name, column))
+        if encoding is None or encoding.version != version:
+            encoding = self._load(dataset_name, column)
+        if encoding is not None and encoding.version == version:
+            self.hits += 1
+            return encoding
+
+        self.misses += 1
+        df = self.dataset_manager.get_dataset(dataset_name)
+        if df is None or column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in dataset '{dataset_name}'")
+        codes, categories = encode_column(df[column])
+        return self._save(dataset_name, column, ColumnEncoding(codes, categories, version))
+
+    def codes(self, dataset_name: str, column: str, missing: Optional[str] = None) -> np.ndarray:
+        """
+        Get the codes of a column (see encoding).
+
+        Args:
+            dataset_name: Name of the dataset
+            column: Column to encode
+            missing: Encode missing values as this string (e.g. "Missing"), instead of -1
+        """
+        encoding = self.encoding(dataset_name, column)
+        return np.asarray(encoding.codes) if missing is None else encoding.with_missing_as(missing)
+
+    def invalidate(self, dataset_name: str) -> None:
+        """Forget every encoding of a dataset (in memory and on disk)."""
+        for key in [key for key in self._loaded if key[0] == dataset_name]:
+            del self._loaded[key]
+        shutil.rmtree(self.dataset_manager.data_dir / dataset_name / ENCODING_DIR, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache's hit and miss counts."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+
+    def _encoding_dir(self, dataset_name: str, column: str) -> Path:
+        return self.dataset_manager.data_dir / dataset_name / ENCODING_DIR / quote(str(column), safe="")
+
+    def _save(self, dataset_name: str, column: str, encoding: ColumnEncoding) -> ColumnEncoding:
+        """Save an encoding (if the dataset has a folder) and keep it loaded."""
+        self._loaded[(dataset_name, column)] = encoding
+        if not (self.dataset_manager.data_dir / dataset_name).exists():
+            return encoding
+
+        # Write to a temporary directory first so readers never see a half-written encoding
+        encoding_dir = self._encoding_dir(dataset_name, column)
+        tmp_dir = encoding_dir.with_name(encoding_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        with open(tmp_dir / "meta.pkl", "wb") as f:
+            pickle.dump({"version": encoding.version, "categories": encoding.categories}, f)
+        np.save(tmp_dir / "codes.npy", encoding.codes)
+
+        shutil.rmtree(encoding_dir, ignore_errors=True)
+        os.replace(tmp_dir, encoding_dir)
+        return encoding
+
+    def _load(self, dataset_name: str, column: str) -> Optional[ColumnEncoding]:
+        """Load a saved encoding (codes memory-mapped), or None if there is no usable one."""
+        encoding_dir = self._encoding_dir(dataset_name, column)
+        try:
+            with open(encoding_dir / "meta.pkl", "rb") as f:
+                meta = pickle.load(f)
+            codes = np.load(encoding_dir / "codes.npy", mmap_mode="r")
+        except Exception:
+            # A missing or corrupt encoding is simply computed again
+            return None
+
+        encoding = ColumnEncoding(codes, meta["categories"], meta["version"])
+        self._loaded[(dataset_name, column)] = encoding
+        return encoding
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sketches import KLLSketch, MomentAccumulator
+
+# How missing values in a column can be handled
+STRATEGIES = ("mean", "median", "mode", "constant", "drop")
+
+
+class Imputer:
+    """
+    Fill (or drop) missing values in several columns at once.
+
+    Each column gets a strategy: "mean", "median", "mode", "constant" (a value
+    from `constants`) or "drop" (remove the rows where it is missing). fit()
+    computes all the fill values in one vectorized pass per strategy (e.g. a
+    single DataFrame.mean() over every "mean" column); transform() then drops
+    rows and fills values without copying the whole DataFrame: the result is
+    a shallow copy in which only the columns that actually had missing values
+    are replaced, everything else shares memory with the input. Don't modify
+    the result in place, or the input changes too.
+
+    Fill values are computed from the rows left after the "drop" columns are
+    applied, so `{"Embarked": "drop", "Age": "mean"}` fills Age with the mean
+    age of the passengers whose port is known.
+
+    fit_chunks()/transform_chunks() do the same over chunks of a dataset that
+    doesn't fit in memory. Means and modes are exact there; medians come from
+    a KLL sketch, which is exact up to about a thousand values per column and
+    approximate (to about 1% of the rank) after that.
+
+    Usage:
+        imputer = Imputer({"Age": "median", "Cabin": "constant", "Embarked": "drop"},
+                          constants={"Cabin": "Unknown"})
+        cleaned_df = imputer.fit_transform(df)
+    """
+
+    def __init__(self, strategies: Dict[str, str], constants: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            strategies: Column name -> strategy (one of STRATEGIES)
+            constants: Column name -> fill value, for the "constant" columns
+        """
+        constants = constants or {}
+        for col, strategy in strategies.items():
+            if strategy not in STRATEGIES:
+                raise ValueError(f"Unknown strategy '{strategy}' for column '{col}' (use {', '.join(STRATEGIES)})")
+            if strategy == "constant" and col not in constants:
+                raise ValueError(f"No constant given for column '{col}'")
+
+        self.strategies = dict(strategies)
+        self.constants = {col: constants[col] for col, strategy in strategies.items() if strategy == "constant"}
+
+        # Column -> value its missing values are replaced with (set by fit)
+        self.fill_values: Optional[Dict[str, Any]] = None
+
+    def columns(self, strategy: str) -> List[str]:
+        """Get the columns handled with a strategy."""
+        return [col for col, s in self.strategies.items() if s == strategy]
+
+
+
+    def fit(self, df: pd.DataFrame) -> "Imputer":
+        """Compute the fill values from a DataFrame."""
+        self._check_columns(df.columns)
+        df = df[self._keep_mask(df)] if self.columns("drop") else df
+
+        fill_values = dict(self.constants)
+        mean_cols, median_cols, mode_cols = self.columns("mean"), self.columns("median"), self.columns("mode")
+        if mean_cols:
+            fill_values.update(df[mean_cols].mean().to_dict())
+        if median_cols:
+            fill_values.update(df[median_cols].median().to_dict())
+        if mode_cols:
+            # One row per tied mode, sorted - take the first like Series.mode()[0]
+            modes = df[mode_cols].mode(dropna=True)
+            fill_values.update({col: modes[col].iloc[0] for col in mode_cols
+                                if len(modes) and not pd.isna(modes[col].iloc[0])})
+
+        self.fill_values = fill_values
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame]) -> "Imputer":
+        """Compute the fill values from chunks of a dataset, one chunk at a time."""
+        mean_cols, median_cols, mode_cols = self.columns("mean"), self.columns("median"), self.columns("mode")
+        moments = {col: MomentAccumulator() for col in mean_cols}
+        sketches = {col: KLLSketch() for col in median_cols}
+        counts = {col: pd.Series(dtype="int64") for col in mode_cols}
+
+        for chunk in chunks:
+            self._check_columns(chunk.columns)
+            if self.columns("drop"):
+                chunk = chunk[self._keep_mask(chunk)]
+            if mean_cols or median_cols:
+                numeric = chunk[mean_cols + median_cols].to_numpy(dtype="float64", na_value=np.nan)
+                for i, col in enumerate(mean_cols + median_cols):
+                    if col in moments:
+                        moments[col].update(numeric[:, i])
+                    else:
+                        sketches[col].update(numeric[:, i])
+            for col in mode_cols:
+                counts[col] = counts[col].add(chunk[col].value_counts(dropna=True, sort=False), fill_value=0)
+
+        fill_values = dict(self.constants)
+        fill_values.update({col: m.mean for col, m in moments.items() if m.count > 0})
+        fill_values.update({col: float(s.quantiles([0.5])[0]) for col, s in sketches.items() if s.count > 0})
+        for col, col_counts in counts.items():
+            if len(col_counts):
+                tied = col_counts.index[col_counts == col_counts.max()]
+                try:
+                    tied = sorted(tied)
+                except TypeError:
+                    pass
+                fill_values[col] = tied[0]
+
+        self.fill_values = fill_values
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop and fill the missing values of a DataFrame (see the class docstring on copying).
+
+        Returns:
+            pd.DataFrame: The cleaned data (the input itself if nothing had to change)
+        """
+        if self.fill_values is None:
+            raise ValueError("Imputer has not been fitted")
+        self._check_columns(df.columns)
+
+        # Step 1: Drop rows first, so only the remaining rows are filled
+        if self.columns("drop"):
+            keep = self._keep_mask(df)
+            if not keep.all():
+                df = df[keep]
+
+        # Step 2: Find the columns that have something to fill (one isna pass over all of them)
+        fill_cols = [col for col in self.strategies if not pd.isna(self.fill_values.get(col, np.nan))]
+        if not fill_cols:
+            return df
+        missing = df[fill_cols].isna().any()
+        fill_cols = [col for col in fill_cols if missing[col]]
+        if not fill_cols:
+            return df
+
+        # Step 3: Replace just those columns in a shallow copy
+        result = df.copy(deep=False)
+        for col in fill_cols:
+            result[col] = _fill_column(df[col], self.fill_values[col])
+        return result
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Drop and fill the missing values of every chunk (after fit or fit_chunks)."""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+
+
+    def _check_columns(self, columns) -> None:
+        missing = [col for col in self.strategies if col not in columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(map(str, missing))}")
+
+    def _keep_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Rows that have a value in every "drop" column."""
+        return ~df[self.columns("drop")].isna().any(axis=1).to_numpy()
+
+
+
+def _fill_column(series: pd.Series, value: Any) -> pd.Series:
+    """Fill a column's missing values, widening its dtype if the value doesn't fit."""
+    if pd.api.types.is_integer_dtype(series) and not _is_integral(value):
+        # A nullable integer column can't hold a fractional mean
+        series = series.astype("float64")
+    elif isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def _is_integral(value: Any) -> bool:
+    return isinstance(value, (int, np.integer)) or (isinstance(value, (float, np.floating)) and float(value).is_integer())
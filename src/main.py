@@ -3,7 +3,7 @@ import sys
 import os
 import pandas as pd
 import numpy as np
-from dataset_manager import DatasetManager
+from dataset_manager import STREAMING_THRESHOLD_BYTES, DatasetManager
 from data_explorer import DataExplorer
 from report_generator import ReportCreator
 from visualizer import Visualizer
@@ -25,14 +25,25 @@ def print_help():
     
     # Dataset Management Commands
     print(f"{PURPLE}Dataset Management:{RESET}")
-    print("load [file_path] [dataset_name]")
-    print("    - Load a dataset from a CSV file")
+    print("load [file_path] [dataset_name] [chunk_rows] [--compact]")
+    print("    - Load a dataset from a CSV file (optionally streamed in chunks of chunk_rows rows)")
+    print("    - --compact stores columns with the smallest lossless dtypes (categories, int8, ...)")
     print("list")
     print("    - List all loaded datasets")
     print("view [dataset_name] [n_rows]")
     print("    - View first N rows of a dataset")
+    print("append [file_path] [dataset_name]")
+    print("    - Append the rows of a CSV file to an existing dataset")
     print("remove [dataset_name]")
     print("    - Remove a dataset")
+    print("export [dataset_name] [file_path]")
+    print("    - Export a dataset to a CSV file")
+    print("versions [dataset_name]")
+    print("    - List the saved versions of a dataset")
+    print("checkout [dataset_name] [version]")
+    print("    - Restore an earlier version of a dataset (saved as a new version)")
+    print("cache")
+    print("    - Show in-memory dataset cache statistics")
     
     # Data Exploration Commands
     print(f"\n{PURPLE}Data Exploration & Analysis:{RESET}")
@@ -41,12 +52,22 @@ def print_help():
     print("      2. Missing data report")
     print("      3. Frequency counts")
     print("      4. Filter data (e.g., 'age > 25 and country == \"USA\"')")
+    print("index [dataset_name] [column] [sorted|bitmap]")
+    print("    - Index a column to speed up filters on it (without a column: list the indexes)")
 
     # Data Cleaning Commands
     print(f"\n{PURPLE}Data Cleaning:{RESET}")
     print("clean [dataset_name]")
     print("      1. Remove duplicates")
     print("      2. Handle missing values")
+    print("      3. Apply queued steps (all steps run together and the dataset is saved once)")
+    
+    # Visualization Commands
+    print(f"\n{PURPLE}Visualization:{RESET}")
+    print("visualize [dataset_name]")
+    print("    - Create a histogram, bar chart, heatmap or scatter plot")
+    print("visualize-all [dataset_name] [workers]")
+    print("    - Render every applicable plot of a dataset in parallel (workers defaults to the number of CPUs)")
     
     # System Commands
     print(f"\n{PURPLE}System:{RESET}")
@@ -67,8 +88,20 @@ def print_help():
 
 
 
+def parse_args():
+    """Parse the command-line options PyLytics is started with."""
+    parser = argparse.ArgumentParser(description="PyLytics - A Python-Based Data Analysis Tool")
+    parser.add_argument("--versioning", action="store_true",
+                        help="Keep every version of the datasets' data, so 'checkout' can bring them back")
+    parser.add_argument("--memory-map", action="store_true",
+                        help="Store datasets as Arrow (Feather) files and open them memory-mapped")
+    return parser.parse_args()
+
+
+
 def main():
-    dataset_manager = DatasetManager()
+    options = parse_args()
+    dataset_manager = DatasetManager(memory_map=options.memory_map, versioning=options.versioning)
     data_explorer = DataExplorer(dataset_manager)
 
     print(f"\n{CYAN}=== PyLytics - Data Management Tool ==={RESET}")
@@ -88,6 +121,8 @@ def main():
             args = parts[1:] # ['iris', '10']
             
             if command == "exit":
+                # Make sure no unsaved changes are lost
+                dataset_manager.flush_datasets()
                 print(f"\n{PURPLE}Thank you for using PyLytics!{RESET}\n")
                 sys.exit(0)
                 
@@ -95,16 +130,32 @@ def main():
                 print_help()
                 
             elif command == "load":
-                if len(args) != 2:
-                    print(f"{YELLOW}Usage: load <file_path> <dataset_name>{RESET}")
+                compact = "--compact" in args
+                args = [arg for arg in args if arg != "--compact"]
+                
+                if len(args) < 2 or len(args) > 3 or (len(args) == 3 and not args[2].isdigit()):
+                    print(f"{YELLOW}Usage: load <file_path> <dataset_name> [chunk_rows] [--compact]{RESET}")
                     print(f"{YELLOW}Example: load C:\\Users\\user\\Downloads\\data.csv my_dataset{RESET}")
                     print("\n")
                     continue
                     
-                file_path, dataset_name = args
-                if dataset_manager.load_dataset(file_path, dataset_name):
+                file_path, dataset_name = args[:2]
+                chunksize = int(args[2]) if len(args) > 2 else None
+                if dataset_manager.load_dataset(file_path, dataset_name, chunksize, compact=compact or None):
                     print(f"{GREEN}Successfully loaded dataset '{dataset_name}'\n{RESET}")
                     
+            elif command == "append":
+                if len(args) != 2:
+                    print(f"{YELLOW}Usage: append <file_path> <dataset_name>{RESET}")
+                    print(f"{YELLOW}Example: append C:\\Users\\user\\Downloads\\new_rows.csv my_dataset{RESET}")
+                    print("\n")
+                    continue
+                
+                file_path, dataset_name = args
+                if dataset_manager.append_file(file_path, dataset_name):
+                    rows = dataset_manager.metadata[dataset_name]['rows']
+                    print(f"{GREEN}Appended rows to '{dataset_name}' (now {rows} rows)\n{RESET}")
+                    
             elif command == "list":
                 datasets = dataset_manager.list_datasets()
                 if not datasets:
@@ -113,7 +164,8 @@ def main():
                     print(f"\n{CYAN}Loaded datasets:{RESET}")
                     i=0
                     for name, info in datasets:
-                        print(f"{i+1}. {name} (Rows: {info['rows']}, Columns: {info['columns']})")
+                        view_note = f", View of: {info['parent']}" if info.get('type') == 'view' else ""
+                        print(f"{i+1}. {name} (Rows: {info['rows']}, Columns: {info['columns']}{view_note})")
                         i+=1
                     print("\n")
                     
@@ -237,8 +289,9 @@ def main():
                                 print("\nEnter name for the filtered dataset:")
                                 new_name = input("> ").strip()
                                 analysis_desc = f"Filtered with condition: {condition}"
-                                dataset_manager.update_dataset(new_name, filtered_df, analysis_desc)
-                                print(f"{GREEN}Filtered dataset updated as '{new_name}'{RESET}")
+                                # Saved as a view: only the condition is stored, the rows come from the original dataset
+                                if dataset_manager.create_view(new_name, dataset_name, condition, analysis_desc):
+                                    print(f"{GREEN}Filtered dataset saved as view '{new_name}' of '{dataset_name}'{RESET}")
                             print("\n")
                     
                     
@@ -258,98 +311,117 @@ def main():
                     continue
                 
                 dataset_name = args[0]
-                print("\nSelect cleaning option:")
-                print("1. Remove duplicates")
-                print("2. Handle missing values")
-                
-                
-                clean_choice = input("Enter your choice (1-2): ").strip()
+                if dataset_name not in dataset_manager.metadata:
+                    print(f"{RED}Dataset '{dataset_name}' not found.{RESET}\n")
+                    continue
                 
+                # Steps are queued and run together at the end, so the dataset is only written once
+                pipeline = data_explorer.cleaning_pipeline(dataset_name)
                 
-                if clean_choice == "1":
-                    print(f"{CYAN}Specify columns for duplicate check (leave empty for all columns):{RESET}")
-                    print("Enter column names separated by comma:")
-                    cols = input("> ").strip()
+                while True:
+                    if pipeline.steps:
+                        print(f"\n{CYAN}Queued steps:{RESET}")
+                        for i, description in enumerate(pipeline.descriptions()):
+                            print(f"  {i+1}. {description}")
                     
-                    subset = [col.strip() for col in cols.split(',')] if cols.strip() else None
+                    print("\nSelect cleaning option:")
+                    print("1. Remove duplicates")
+                    print("2. Handle missing values")
+                    print("3. Apply queued steps")
+                    print("4. Cancel")
                     
-                    cleaned_df, duplicates_removed = data_explorer.clean_duplicates(dataset_name, subset)
+                    clean_choice = input("Enter your choice (1-4): ").strip()
                     
-                    if cleaned_df is not None:
-                        print(f"\n{GREEN}Removed {duplicates_removed} duplicate rows{RESET}")
-                        if duplicates_removed > 0:
-                            print(f"\n{CYAN}First few rows of cleaned dataset:{RESET}")
-                            print(cleaned_df.head())
-
-                            print("\nWould you like to update the original dataset? (y/n)")
-                            update_choice = input("> ").strip().lower()
-                            if update_choice == 'y':
-                                analysis_desc = f"Removed duplicates on columns: {', '.join(subset) if subset else 'all columns'}"
-                                dataset_manager.update_dataset(dataset_name, cleaned_df, analysis_desc)
-                                print(f"{GREEN}Dataset '{dataset_name}' updated successfully{RESET}")
-                        print("\n")
-                
-                
-                elif clean_choice == "2":
-                    print("\nHandle missing values:")
-                    print("1. Remove rows with missing values")
-                    print("2. Fill missing values with mean (numerical columns)")
-                    print("3. Fill missing values with mode (categorical columns)")
-
-                    missing_choice = input("Enter your choice (1-3): ").strip()
-
-                    if missing_choice == "1":
-                        cleaned_df = data_explorer.remove_rows_with_missing(dataset_name)
+                    
+                    if clean_choice == "1":
+                        print(f"{CYAN}Specify columns for duplicate check (leave empty for all columns):{RESET}")
+                        print("Enter column names separated by comma:")
+                        cols = input("> ").strip()
                         
-                        if cleaned_df is not None:
-                            print(f"\n{GREEN}Rows with missing values dropped. Remaining rows: {len(cleaned_df)}{RESET}")
-                            print(cleaned_df.head())
-
-
-                            print("\nWould you like to update the original dataset? (y/n)")
-                            update_choice = input("> ").strip().lower()
-                            if update_choice == 'y':
-                                analysis_desc = "Removed rows with missing values"
-                                dataset_manager.update_dataset(dataset_name, cleaned_df, analysis_desc)
-                                print(f"{GREEN}Dataset '{dataset_name}' updated successfully{RESET}")
-                            print("\n")
+                        subset = [col.strip() for col in cols.split(',')] if cols.strip() else None
+                        
+                        # Datasets too big to load are deduplicated chunk by chunk into a new dataset straight away
+                        if not pipeline.steps and dataset_name not in dataset_manager.datasets \
+                                and dataset_manager.stored_size(dataset_name) > STREAMING_THRESHOLD_BYTES:
+                            print(f"{CYAN}This dataset is large, so the result is saved as a new dataset.{RESET}")
+                            print("Enter name for the deduplicated dataset:")
+                            new_name = input("> ").strip()
+                            
+                            cleaned_df, duplicates_removed = data_explorer.clean_duplicates(dataset_name, subset, streaming=True,
+                                                                                            output_name=new_name)
+                            if cleaned_df is not None:
+                                print(f"\n{GREEN}Removed {duplicates_removed} duplicate rows, saved as '{new_name}'{RESET}\n")
+                            break
+                        
+                        pipeline.remove_duplicates(subset)
                     
                     
-                    elif missing_choice == "2":
-                        cleaned_df = data_explorer.fill_missing_with_mean(dataset_name)
-                        
-                        if cleaned_df is not None:
-                            print(f"\n{GREEN}Missing values in numeric columns filled with column mean.{RESET}")
-                            print(cleaned_df.head())
+                    elif clean_choice == "2":
+                        print("\nHandle missing values:")
+                        print("1. Remove rows with missing values")
+                        print("2. Fill missing values with mean (numerical columns)")
+                        print("3. Fill missing values with mode (categorical columns)")
+                        print("4. Choose a strategy per column (mean, median, mode, constant, drop)")
 
+                        missing_choice = input("Enter your choice (1-4): ").strip()
 
-                            print("\nWould you like to update the original dataset? (y/n)")
-                            update_choice = input("> ").strip().lower()
-                            if update_choice == 'y':
-                                analysis_desc = "Filled missing values in numeric columns with mean"
-                                dataset_manager.update_dataset(dataset_name, cleaned_df, analysis_desc)
-                                print(f"{GREEN}Dataset '{dataset_name}' updated successfully{RESET}")
-                            print("\n")
+                        if missing_choice == "1":
+                            pipeline.drop_missing()
+                        
+                        elif missing_choice == "2":
+                            pipeline.fill_mean()
+                        
+                        elif missing_choice == "3":
+                            pipeline.fill_mode()
+                        
+                        elif missing_choice == "4":
+                            print(f"{CYAN}Enter column:strategy pairs separated by comma (e.g., Age:median, Cabin:constant=Unknown, Embarked:drop):{RESET}")
+                            strategies, constants = {}, {}
+                            for pair in input("> ").split(','):
+                                if ':' not in pair:
+                                    continue
+                                col, strategy = [part.strip() for part in pair.split(':', 1)]
+                                if strategy.startswith('constant='):
+                                    strategy, constants[col] = 'constant', strategy[len('constant='):]
+                                strategies[col] = strategy
+                            
+                            try:
+                                pipeline.impute(strategies, constants)
+                            except ValueError as e:
+                                print(f"{RED}Error: {str(e)}{RESET}")
+                        
+                        else:
+                            print(f"{RED}Invalid choice. Please enter a number between 1 and 4.{RESET}")
                     
                     
-                    elif missing_choice == "3":
-                        cleaned_df = data_explorer.fill_missing_with_mode(dataset_name)
+                    elif clean_choice == "3":
+                        if not pipeline.steps:
+                            print(f"{YELLOW}No cleaning steps queued.{RESET}\n")
+                            break
+                        
+                        rows_before = dataset_manager.metadata[dataset_name]['rows']
+                        cleaned_df = pipeline.run()
                         
                         if cleaned_df is not None:
-                            print(f"\n{GREEN}Missing values in categorical columns filled with column mode.{RESET}")
+                            print(f"\n{GREEN}Removed {pipeline.duplicates_removed} duplicate rows and {pipeline.rows_dropped} rows with missing values "
+                                  f"({rows_before} -> {len(cleaned_df)} rows){RESET}")
+                            print(f"\n{CYAN}First few rows of cleaned dataset:{RESET}")
                             print(cleaned_df.head())
-
                             
                             print("\nWould you like to update the original dataset? (y/n)")
                             update_choice = input("> ").strip().lower()
-                            if update_choice == 'y':
-                                analysis_desc = "Filled missing values in categorical columns with mode"
-                                dataset_manager.update_dataset(dataset_name, cleaned_df, analysis_desc)
+                            if update_choice == 'y' and pipeline.save():
                                 print(f"{GREEN}Dataset '{dataset_name}' updated successfully{RESET}")
-                            print("\n")
+                        print("\n")
+                        break
+                    
+                    
+                    elif clean_choice == "4":
+                        print("\n")
+                        break
                     
                     else:
-                        print(f"{RED}Invalid choice. Please enter a number between 1 and 3.{RESET}\n")
+                        print(f"{RED}Invalid choice. Please enter a number between 1 and 4.{RESET}")
                     
             
             
@@ -368,6 +440,101 @@ def main():
                     print(f"{GREEN}Successfully removed the dataset: '{dataset_name}'\n{RESET}")
                     
             
+            elif command == "export":
+                if len(args) != 2:
+                    print(f"{YELLOW}Usage: export <dataset_name> <file_path>{RESET}")
+                    print(f"{YELLOW}Example: export my_dataset C:\\Users\\user\\Downloads\\data.csv{RESET}")
+                    print("\n")
+                    continue
+                
+                dataset_name, file_path = args
+                if dataset_manager.export_dataset(dataset_name, file_path):
+                    print(f"{GREEN}Exported dataset '{dataset_name}' to {file_path}\n{RESET}")
+                    
+            
+            elif command == "versions":
+                if len(args) != 1:
+                    print(f"{YELLOW}Usage: versions <dataset_name>{RESET}")
+                    print(f"{YELLOW}Example: versions titanic{RESET}")
+                    print("\n")
+                    continue
+                
+                dataset_name = args[0]
+                if dataset_manager.version_store is None:
+                    print(f"{YELLOW}Versioning is turned off. Start PyLytics with --versioning to keep versions.{RESET}\n")
+                    continue
+                versions = dataset_manager.list_versions(dataset_name)
+                if versions is None:
+                    continue
+                if not versions:
+                    print(f"{YELLOW}Dataset '{dataset_name}' has no saved versions yet{RESET}\n")
+                    continue
+                
+                current = dataset_manager.dataset_version(dataset_name)
+                print(f"\n{CYAN}Versions of '{dataset_name}':{RESET}")
+                for v in versions:
+                    marker = f" {GREEN}(current){RESET}" if v['version'] == current else ""
+                    print(f"  - Version {v['version']}{marker}: {v['created'][:19].replace('T', ' ')}, "
+                          f"{v['rows']} rows, +{v['new_bytes'] / 1024:.1f} KB stored")
+                    if v['description']:
+                        print(f"      {v['description']}")
+                print(f"  Total stored for all versions: {dataset_manager.version_store.stored_bytes(dataset_name) / 1024:.1f} KB")
+                print("\n")
+                
+            
+            elif command == "checkout":
+                if len(args) != 2 or not args[1].isdigit():
+                    print(f"{YELLOW}Usage: checkout <dataset_name> <version>{RESET}")
+                    print(f"{YELLOW}Example: checkout titanic 2{RESET}")
+                    print("\n")
+                    continue
+                
+                dataset_name, version = args[0], int(args[1])
+                if dataset_manager.version_store is None:
+                    print(f"{YELLOW}Versioning is turned off. Start PyLytics with --versioning to keep versions.{RESET}\n")
+                    continue
+                if dataset_manager.checkout_version(dataset_name, version):
+                    new_version = dataset_manager.dataset_version(dataset_name)
+                    print(f"{GREEN}Restored version {version} of '{dataset_name}' (saved as version {new_version})\n{RESET}")
+                    
+            
+            elif command == "cache":
+                stats = dataset_manager.cache_stats()
+                budget = stats['memory_budget_mb']
+                print(f"\n{CYAN}Dataset cache:{RESET}")
+                print(f"  - Datasets in memory: {stats['datasets']} (pinned: {stats['pinned']}, unsaved: {stats['dirty']})")
+                print(f"  - Memory used: {stats['memory_used_mb']} MB / {budget if budget is not None else 'unlimited'} MB")
+                print(f"  - Hits: {stats['hits']}, Misses: {stats['misses']} (hit rate: {stats['hit_rate']:.1%})")
+                print(f"  - Evictions: {stats['evictions']}")
+                print("\n")
+                
+            
+            elif command == "index":
+                if len(args) not in (1, 2, 3):
+                    print(f"{YELLOW}Usage: index <dataset_name> [column] [sorted|bitmap]{RESET}")
+                    print(f"{YELLOW}Example: index titanic Age sorted{RESET}")
+                    print("\n")
+                    continue
+                
+                dataset_name = args[0]
+                if len(args) == 1:
+                    indexes = data_explorer.index_manager.list_indexes(dataset_name)
+                    if indexes:
+                        print(f"\n{CYAN}Indexes on '{dataset_name}':{RESET}")
+                        for column, kind in indexes.items():
+                            print(f"  - {column} ({kind})")
+                    else:
+                        print(f"{YELLOW}Dataset '{dataset_name}' has no indexes{RESET}")
+                    print("\n")
+                    continue
+                
+                column = args[1]
+                kind = args[2] if len(args) == 3 else None
+                if data_explorer.index_manager.create_index(dataset_name, column, kind):
+                    kind = data_explorer.index_manager.list_indexes(dataset_name)[column]
+                    print(f"{GREEN}Created {kind} index on '{dataset_name}.{column}'\n{RESET}")
+                    
+            
             elif command == "report":
                 if len(args) != 1:
                     print(f"{YELLOW}Usage: report <dataset_name>{RESET}")
@@ -389,6 +556,42 @@ def main():
             
             
             
+            elif command == "visualize-all":
+                if len(args) not in (1, 2) or (len(args) == 2 and not args[1].isdigit()):
+                    print(f"{YELLOW}Usage: visualize-all <dataset_name> [workers]{RESET}")
+                    print(f"{YELLOW}Example: visualize-all my_dataset 4{RESET}")
+                    print("\n")
+                    continue
+                
+                dataset_name = args[0]
+                n_workers = int(args[1]) if len(args) == 2 else None
+                
+                try:
+                    visualizer = Visualizer(dataset_manager, data_explorer)
+                    plots = visualizer.plan_plots(dataset_name)
+                    counts = pd.Series([plot["kind"] for plot in plots]).value_counts()
+                    print(f"\n{CYAN}Rendering {len(plots)} plots for '{dataset_name}': "
+                          f"{', '.join(f'{n} {kind}' for kind, n in counts.items())}{RESET}")
+                    
+                    def show_progress(done, total, plot, filepath, error):
+                        label = f"{plot['kind']} of {', '.join(plot['columns'])}" if plot["kind"] != "heatmap" else "heatmap"
+                        if error is None:
+                            print(f"  [{done}/{total}] {GREEN}{label}{RESET} -> {os.path.basename(filepath)}")
+                        else:
+                            print(f"  [{done}/{total}] {RED}{label} failed: {str(error)}{RESET}")
+                    
+                    summary = visualizer.render_all(dataset_name, plots, n_workers, progress=show_progress)
+                    cached = f" ({summary['cached']} unchanged since last time)" if summary["cached"] else ""
+                    print(f"\n{GREEN}Saved {len(summary['rendered'])} plots to '{visualizer.graphs_dir}' "
+                          f"in {summary['seconds']:.1f}s{cached}{RESET}")
+                    if summary["failed"]:
+                        print(f"{RED}{len(summary['failed'])} plots failed{RESET}")
+                    print("\n")
+                
+                except Exception as e:
+                    print(f"{RED}Error creating plots: {str(e)}{RESET}")
+            
+            
             elif command == "visualize":
                 if len(args) != 1:
                     print(f"{YELLOW}Usage: visualize <dataset_name>{RESET}")
@@ -447,6 +650,9 @@ def main():
                         filepath = visualizer.create_heatmap(dataset_name)
                         filename = os.path.basename(filepath)
                         print(f"Heatmap generated and saved as '{filename}'.")
+                        print(f"\n{CYAN}Strongest correlations:{RESET}")
+                        for x_column, y_column, r in visualizer.strongest_correlations(dataset_name, 5):
+                            print(f"  - {x_column} / {y_column}: {r:+.2f}")
                     
                     elif choice == "4":
                         # Scatter Plot
@@ -522,8 +728,8 @@ def main():
                     
                     
                     model_name = f"{dataset_name}_{target}_linreg"
-                    model_instance = LinearRegressionModel()
-                    model, score, X_test, y_test, y_pred = model_instance.train(df, feature_cols, target, model_name)
+                    model_instance = LinearRegressionModel(encoding_cache=data_explorer.encoding_cache)
+                    model, score, X_test, y_test, y_pred = model_instance.train(df, feature_cols, target, model_name, dataset_name)
                     
                     
                     if model is not None:
@@ -549,8 +755,8 @@ def main():
                     
                     
                     model_name = f"{dataset_name}_{target}_logreg"
-                    model_instance = LogisticRegressionModel()
-                    model, acc, prec, rec, f1, report, X_test, y_test, y_pred = model_instance.train(df, feature_cols, target, model_name)
+                    model_instance = LogisticRegressionModel(encoding_cache=data_explorer.encoding_cache)
+                    model, acc, prec, rec, f1, report, X_test, y_test, y_pred = model_instance.train(df, feature_cols, target, model_name, dataset_name)
                     
                     if model is not None:
                         print(f"{GREEN}Classification model trained and saved as models/{model_name}.joblib{RESET}")
@@ -581,8 +787,8 @@ def main():
                     
                     
                     model_name = f"{dataset_name}_kmeans_{n_clusters}clusters"
-                    model_instance = KMeansModel()
-                    model, labels = model_instance.train(df, feature_cols, n_clusters, model_name)
+                    model_instance = KMeansModel(encoding_cache=data_explorer.encoding_cache)
+                    model, labels = model_instance.train(df, feature_cols, n_clusters, model_name, dataset_name)
                     
                     
                     if model is not None:
@@ -11,28 +11,43 @@ from sklearn.metrics import (
 )
 import matplotlib.pyplot as plt
 from sklearn.preprocessing import LabelEncoder
+from encoding_cache import ColumnEncoding, encode_column
 
 YELLOW = '\033[93m'
 STOP = '\033[0m'
 
 
 class BaseModel:
-    def __init__(self, models_dir="models", confmat_dir="confusion_matrices"):
+    def __init__(self, models_dir="models", confmat_dir="confusion_matrices", encoding_cache=None):
         self.models_dir = models_dir
         self.confmat_dir = confmat_dir
+        # Shared label encodings (DataExplorer.encoding_cache), so categorical features aren't re-encoded every time
+        self.encoding_cache = encoding_cache
         os.makedirs(self.models_dir, exist_ok=True)
         os.makedirs(self.confmat_dir, exist_ok=True)
     
     
     
-    def preprocess_data(self, df, features, target=None):
-        """Common preprocessing for all models"""
-        X = df[features].copy()
+    def preprocess_data(self, df, features, target=None, dataset_name=None):
+        """
+        Common preprocessing for all models.
+        
+        Categorical features are label encoded (missing values as the category "nan").
+        When df holds the rows of the dataset `dataset_name` (not a subset of them),
+        the codes come from the encoding cache.
+        """
+        X = df[features].copy(deep=False)
+        use_cache = False
+        if self.encoding_cache is not None and dataset_name is not None:
+            dataset = self.encoding_cache.dataset_manager.get_dataset(dataset_name)
+            use_cache = dataset is not None and (dataset is df or dataset.index.equals(df.index))
         
         # Encode categorical features
         for col in X.select_dtypes(include=['object', 'category']).columns:
-            le = LabelEncoder()
-            X[col] = le.fit_transform(X[col].astype(str))
+            if use_cache:
+                X[col] = self.encoding_cache.codes(dataset_name, col, missing='nan')
+            else:
+                X[col] = ColumnEncoding(*encode_column(X[col])).with_missing_as('nan')
         
         # Check for NaN values
         if X.isnull().any().any():
@@ -74,8 +89,8 @@ class BaseModel:
 
 
 class LinearRegressionModel(BaseModel):
-    def train(self, df, features, target, model_name):
-        X, y = self.preprocess_data(df, features, target)
+    def train(self, df, features, target, model_name, dataset_name=None):
+        X, y = self.preprocess_data(df, features, target, dataset_name)
         if X is None:
             return None, None, None, None, None
         
@@ -98,8 +113,8 @@ class LinearRegressionModel(BaseModel):
 
 
 class LogisticRegressionModel(BaseModel):
-    def train(self, df, features, target, model_name):
-        X, y = self.preprocess_data(df, features, target)
+    def train(self, df, features, target, model_name, dataset_name=None):
+        X, y = self.preprocess_data(df, features, target, dataset_name)
         if X is None:
             return None, None, None, None, None, None, None, None, None
         
@@ -145,8 +160,8 @@ class LogisticRegressionModel(BaseModel):
 
 
 class KMeansModel(BaseModel):
-    def train(self, df, features, n_clusters, model_name):
-        X, _ = self.preprocess_data(df, features, None)  # No target for clustering
+    def train(self, df, features, n_clusters, model_name, dataset_name=None):
+        X, _ = self.preprocess_data(df, features, None, dataset_name)  # No target for clustering
         if X is None:
             return None, None
         
@@ -0,0 +1,90 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_ordered(func: Callable[[T], R], items: Iterable[T], n_workers: int = 1) -> Iterator[R]:
+    """
+    Apply a function to every item, in a thread pool, yielding the results in input order.
+
+    Threads (not processes) are used because the work is NumPy/pandas code
+    that releases the GIL, and chunks don't have to be copied to workers.
+    At most 2 * n_workers items are in flight at a time, so when `items`
+    is a lazy stream of chunks, memory stays bounded by the chunk size.
+
+    Args:
+        func: Function to apply
+        items: Iterable of inputs (consumed lazily)
+        n_workers: Number of threads. With 1 or less everything runs in the calling thread.
+
+    Yields:
+        func(item) for every item, in the same order as items
+    """
+    if n_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def map_processes(func: Callable[[T], R], items: Iterable[T], n_workers: int = 1,
+                  initializer: Optional[Callable[[], None]] = None) -> Iterator[Tuple[T, Optional[R], Optional[Exception]]]:
+    """
+    Apply a function to every item in a process pool, yielding results as they finish.
+
+    For CPU-bound pure-Python work that holds the GIL (e.g. matplotlib
+    rendering), where threads wouldn't run in parallel. `func` and the items
+    must be picklable. Like map_ordered, at most 2 * n_workers items are in
+    flight at a time. A failing item doesn't stop the others: its exception
+    is yielded instead of a result.
+
+    Args:
+        func: Module-level function to apply
+        items: Iterable of inputs (consumed lazily)
+        n_workers: Number of processes. With 1 or less everything runs in the calling process.
+        initializer: Optional function every worker process runs once at start
+
+    Yields:
+        (item, func(item), None) or (item, None, exception), in the order the items finish
+    """
+    if n_workers <= 1:
+        if initializer is not None:
+            initializer()
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=initializer) as executor:
+        pending = {}
+        items = iter(items)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 2 * n_workers:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, item)] = item
+
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
@@ -0,0 +1,444 @@
+import ast
+import io
+import operator
+import re
+import tokenize
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# numexpr is optional - without it plans are evaluated with plain pandas/NumPy operations
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# A comparison of a column with a constant: (column, operator, value)
+Predicate = Tuple[str, str, Any]
+
+_COMPARE_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+                ast.In: "in", ast.NotIn: "not in"}
+_FLIPPED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+_COMPARE_FUNCS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+                  ">": operator.gt, ">=": operator.ge}
+_BINARY_FUNCS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                 ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+                 ast.Pow: operator.pow}
+
+# Operators numexpr can evaluate (in its own syntax)
+_NUMEXPR_BINARY = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%", ast.Pow: "**"}
+
+# Below this many rows numexpr's setup costs more than it saves (pandas uses the same cut-off)
+NUMEXPR_MIN_ROWS = 10_000
+
+# Names DataFrame.query resolves besides the columns
+_SPECIAL_NAMES = {"index"}
+
+
+class PredicatePlan:
+    """
+    A filter condition, parsed and validated once, ready to be evaluated on any number of frames.
+
+    The condition uses DataFrame.query syntax and gives the same rows. It
+    is compiled into a tree of vectorized pandas/NumPy operations; if
+    numexpr is installed and the condition only does arithmetic and
+    comparisons on plain numerical columns, the whole expression is
+    instead evaluated by numexpr in one fused pass, without the temporary
+    arrays every intermediate operation would otherwise allocate.
+    Conditions using anything else (method calls like `Name.str.contains`)
+    are handed to DataFrame.eval.
+
+    Attributes:
+        condition: The original condition string
+        columns: Columns the condition reads
+        predicates: The top-level `and`-ed comparisons of a column with a
+            constant - the part column indexes and storage can answer
+        complete: True if the condition is exactly the conjunction of `predicates`
+        row_local: True if each row's result only depends on that row, so the
+            condition can be evaluated on any subset or chunk of the rows.
+            False for e.g. `SibSp in Parch` (membership in a whole column) and
+            for conditions handed to DataFrame.eval (`Age > Age.mean()`).
+    """
+
+    def __init__(self, condition: str, columns: List[str], predicates: List[Predicate], complete: bool,
+                 evaluator: Optional[Callable[[pd.DataFrame], Any]], numexpr_source: Optional[str],
+                 numexpr_names: Dict[str, str], row_local: bool = True):
+        self.condition = condition
+        self.columns = columns
+        self.predicates = predicates
+        self.complete = complete
+        self.row_local = row_local
+        self._evaluator = evaluator
+        self._numexpr_source = numexpr_source
+        self._numexpr_names = numexpr_names
+
+    @property
+    def fused(self) -> bool:
+        """True if the plan can be evaluated by numexpr (given plain numerical columns)."""
+        return numexpr is not None and self._numexpr_source is not None
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the condition on a DataFrame.
+
+        Args:
+            df: DataFrame (or chunk of one) holding at least the plan's columns
+
+        Returns:
+            Boolean NumPy array, True for the rows matching the condition
+            (missing values never match, as in DataFrame.query)
+        """
+        if (self.fused and len(df) >= NUMEXPR_MIN_ROWS
+                and all(_plain_numeric(df[col]) for col in self._numexpr_names.values())):
+            local_dict = {name: df[col].to_numpy() for name, col in self._numexpr_names.items()}
+            result = numexpr.evaluate(self._numexpr_source, local_dict=local_dict)
+        elif self._evaluator is not None:
+            result = self._evaluator(df)
+        else:
+            result = df.eval(self.condition)
+
+        if isinstance(result, (pd.Series, pd.Index)):
+            return result.to_numpy(dtype=bool, na_value=False)
+        if np.ndim(result) == 0:
+            # A condition without any column, e.g. "1 == 1"
+            return np.full(len(df), bool(result))
+        return np.asarray(result, dtype=bool)
+
+
+
+def compile_condition(condition: str, column_names: List[str]) -> PredicatePlan:
+    """
+    Parse a filter condition and check it against the dataset's columns.
+
+    Args:
+        condition: Condition in DataFrame.query syntax (e.g. "Age > 30 and Sex == 'male'")
+        column_names: The dataset's columns
+
+    Returns:
+        PredicatePlan for the condition
+
+    Raises:
+        ValueError: If the condition can't be parsed or uses a column the dataset doesn't have
+    """
+    source, quoted = _normalize(condition)
+    try:
+        tree = ast.parse(source, mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition '{condition}': {e.msg}")
+
+    def column_of(name: str) -> str:
+        return quoted.get(name, name)
+
+    # Step 1: Validate every column the condition mentions
+    known = set(column_names)
+    functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    columns = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and id(node) not in functions:
+            column = column_of(node.id)
+            if column not in known and column not in _SPECIAL_NAMES:
+                raise ValueError(f"Unknown column '{column}' in condition (columns: {', '.join(map(str, column_names))})")
+            if column in known and column not in columns:
+                columns.append(column)
+
+    # Step 2: Pull out the comparisons indexes and storage can answer
+    terms = tree.values if isinstance(tree, ast.BoolOp) and isinstance(tree.op, ast.And) else [tree]
+    predicates, complete = [], True
+    for term in terms:
+        found = _comparisons(term, column_of)
+        if found is None:
+            complete = False
+        else:
+            predicates.extend(found)
+
+    # Step 3: Build the evaluators
+    evaluator = _compile_node(tree, column_of)
+    numexpr_names = {}
+    numexpr_source = _numexpr_source(tree, column_of, numexpr_names)
+
+    # Membership in anything but a constant list looks at a whole column, not just the row
+    row_local = evaluator is not None and not any(
+        isinstance(op, (ast.In, ast.NotIn)) and not _is_literal(right)
+        for node in ast.walk(tree) if isinstance(node, ast.Compare)
+        for op, right in zip(node.ops, node.comparators))
+
+    return PredicatePlan(condition, columns, predicates, complete, evaluator, numexpr_source, numexpr_names,
+                         row_local)
+
+
+def _normalize(condition: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Turn query syntax into plain Python the way DataFrame.query does.
+
+    Backtick-quoted column names become placeholder names, and `&` / `|`
+    become `and` / `or` (so `a > 1 & b < 2` groups like `(a > 1) and (b < 2)`).
+    """
+    quoted = {}
+
+    def placeholder(match) -> str:
+        name = f"__column_{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    source = re.sub(r"`([^`]*)`", placeholder, condition.strip())
+    try:
+        tokens = [(tokenize.NAME, {"&": "and", "|": "or"}[tok.string])
+                  if tok.type == tokenize.OP and tok.string in ("&", "|") else (tok.type, tok.string)
+                  for tok in tokenize.generate_tokens(io.StringIO(source).readline)]
+    except (tokenize.TokenError, SyntaxError):
+        # Leave it to ast.parse to report
+        return source, quoted
+    return tokenize.untokenize(tokens), quoted
+
+
+
+def _comparisons(node: ast.AST, column_of: Callable[[str], str]) -> Optional[List[Predicate]]:
+    if not isinstance(node, ast.Compare):
+        return None
+
+    # A chained comparison like `18 < Age <= 30` is one comparison per pair
+    operands = [node.left] + node.comparators
+    predicates = []
+    for left, op, right in zip(operands, node.ops, operands[1:]):
+        op = _COMPARE_OPS.get(type(op))
+        if op is None:
+            return None
+        if isinstance(left, ast.Name) and _is_literal(right):
+            column, value = column_of(left.id), ast.literal_eval(right)
+        elif isinstance(right, ast.Name) and _is_literal(left) and op in _FLIPPED:
+            column, value, op = column_of(right.id), ast.literal_eval(left), _FLIPPED[op]
+        else:
+            return None
+        if column in _SPECIAL_NAMES:
+            return None
+        # In query syntax `col == [1, 2]` means `col in [1, 2]`
+        if isinstance(value, (list, tuple)) and op in ("==", "!="):
+            op = "in" if op == "==" else "not in"
+        predicates.append((column, op, value))
+    return predicates
+
+
+def _is_literal(node: ast.AST) -> bool:
+    try:
+        ast.literal_eval(node)
+        return True
+    except (ValueError, TypeError, SyntaxError):
+        return False
+
+
+
+def _compile_node(node: ast.AST, column_of: Callable[[str], str]) -> Optional[Callable[[pd.DataFrame], Any]]:
+    """
+    Compile an expression into a function of a DataFrame, with the semantics of DataFrame.query.
+
+    Returns None for anything that isn't supported (calls, attributes, ...).
+    """
+    if isinstance(node, ast.Name):
+        column = column_of(node.id)
+        if column in _SPECIAL_NAMES:
+            return lambda df: _column_values(df[column]) if column in df.columns else df.index.to_series()
+        return lambda df: _column_values(df[column])
+
+    if isinstance(node, (ast.Constant, ast.List, ast.Tuple, ast.Set)) or _is_literal(node):
+        if not _is_literal(node):
+            return None
+        value = ast.literal_eval(node)
+        return lambda df: value
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value, column_of) for value in node.values]
+        if any(part is None for part in parts):
+            return None
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+        def boolean(df):
+            result = parts[0](df)
+            for part in parts[1:]:
+                result = combine(result, part(df))
+            return result
+        return boolean
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, column_of)
+        if operand is None:
+            return None
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return lambda df: ~operand(df)
+        if isinstance(node.op, ast.USub):
+            return lambda df: -operand(df)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        return None
+
+    if isinstance(node, ast.BinOp):
+        func = _BINARY_FUNCS.get(type(node.op))
+        left, right = _compile_node(node.left, column_of), _compile_node(node.right, column_of)
+        if func is None or left is None or right is None:
+            return None
+        return lambda df: func(left(df), right(df))
+
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(operand, column_of) for operand in [node.left] + node.comparators]
+        ops = [_COMPARE_OPS.get(type(op)) for op in node.ops]
+        if any(operand is None for operand in operands) or any(op is None for op in ops):
+            return None
+
+        def compare(df):
+            values = [operand(df) for operand in operands]
+            result = None
+            for left, op, right in zip(values, ops, values[1:]):
+                part = _compare(left, op, right)
+                result = part if result is None else result & part
+            return result
+        return compare
+
+    return None
+
+
+def _column_values(series: pd.Series):
+    # Plain numerical columns are compared as NumPy arrays (no index alignment overhead);
+    # object, category and nullable columns stay Series so missing values keep pandas' semantics
+    return series.to_numpy() if _plain_numeric(series) else series
+
+
+def _compare(left, op: str, right):
+    # Like DataFrame.query, `col == 'text'` is answered with isin(['text']) (a hash lookup
+    # instead of comparing string by string)
+    if op in ("==", "!=") and isinstance(right, str) and isinstance(left, (np.ndarray, pd.Series, pd.Index)):
+        right = [right]
+
+    # Membership tests (and == / != against a list, as in query syntax) use isin()
+    if op in ("in", "not in") or (op in ("==", "!=") and isinstance(right, (list, tuple, set))):
+        if not isinstance(left, (np.ndarray, pd.Series, pd.Index)):
+            left, right = right, left
+        values = list(right) if isinstance(right, (list, tuple, set)) else right
+        if isinstance(left, np.ndarray):
+            # Back to a plain array so it can't be aligned against another column's index
+            result = pd.Series(left, copy=False).isin(values).to_numpy()
+        else:
+            result = left.isin(values)
+        return ~result if op in ("not in", "!=") else result
+    return _COMPARE_FUNCS[op](left, right)
+
+
+
+def _numexpr_source(node: ast.AST, column_of: Callable[[str], str], names: Dict[str, str]) -> Optional[str]:
+    """
+    Translate an expression into numexpr syntax, or None if numexpr can't evaluate it.
+
+    Column names are replaced by safe variable names, recorded in `names`.
+    """
+    if isinstance(node, ast.Name):
+        column = column_of(node.id)
+        if column in _SPECIAL_NAMES:
+            return None
+        for name, col in names.items():
+            if col == column:
+                return name
+        name = f"c{len(names)}"
+        names[name] = column
+        return name
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool):
+            return "True" if node.value else "False"
+        if isinstance(node.value, (int, float)):
+            return repr(node.value)
+        return None
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_numexpr_source(value, column_of, names) for value in node.values]
+        if any(part is None for part in parts):
+            return None
+        joiner = " & " if isinstance(node.op, ast.And) else " | "
+        return "(" + joiner.join(f"({part})" for part in parts) + ")"
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _numexpr_source(node.operand, column_of, names)
+        if operand is None:
+            return None
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return f"(~({operand}))"
+        if isinstance(node.op, ast.USub):
+            return f"(-({operand}))"
+        return None
+
+    if isinstance(node, ast.BinOp):
+        symbol = _NUMEXPR_BINARY.get(type(node.op))
+        left = _numexpr_source(node.left, column_of, names)
+        right = _numexpr_source(node.right, column_of, names)
+        if symbol is None or left is None or right is None:
+            return None
+        return f"(({left}) {symbol} ({right}))"
+
+    if isinstance(node, ast.Compare):
+        operands = [_numexpr_source(operand, column_of, names) for operand in [node.left] + node.comparators]
+        ops = [_COMPARE_OPS.get(type(op)) for op in node.ops]
+        if any(operand is None for operand in operands) or any(op not in _COMPARE_FUNCS for op in ops):
+            return None
+        parts = [f"(({left}) {op} ({right}))" for left, op, right in zip(operands, ops, operands[1:])]
+        return "(" + " & ".join(parts) + ")"
+
+    return None
+
+
+def _plain_numeric(series: pd.Series) -> bool:
+    """True for NumPy-backed numerical and bool columns (not nullable, category or object columns)."""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf"
+
+
+
+class PredicateCompiler:
+    """
+    Compiles filter conditions and caches the resulting plans.
+
+    Plans are cached per (dataset, dataset version, condition), so running
+    the same filter again skips parsing and validation, and a plan is never
+    reused after the dataset (and so possibly its columns) changed.
+    """
+
+    def __init__(self, dataset_manager, max_plans: int = 256):
+        """
+        Args:
+            dataset_manager: Instance of DatasetManager
+            max_plans: Maximum number of plans kept (least recently used ones are dropped)
+        """
+        self.dataset_manager = dataset_manager
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[Tuple[str, int, str], PredicatePlan]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, dataset_name: str, condition: str) -> PredicatePlan:
+        """
+        Get the plan for a condition on a dataset, compiling it if it isn't cached.
+
+        Raises:
+            ValueError: If the dataset doesn't exist or the condition is invalid for it
+        """
+        version = self.dataset_manager.dataset_version(dataset_name)
+        if version is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+
+        key = (dataset_name, version, condition)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self.hits += 1
+            self._plans.move_to_end(key)
+            return plan
+
+        self.misses += 1
+        column_names = self.dataset_manager.metadata[dataset_name].get("column_names", [])
+        plan = compile_condition(condition, column_names)
+
+        self._plans[key] = plan
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan
+
+    def stats(self) -> Dict[str, int]:
+        """Get the plan cache's hit and miss counts."""
+        return {"plans": len(self._plans), "hits": self.hits, "misses": self.misses}
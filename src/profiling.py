@@ -0,0 +1,165 @@
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from statistics_engine import (FREQUENCY_TOP_K, MAX_EXACT_UNIQUE, StreamingFrequencies, StreamingSummary,
+                               _summarize_chunks, summarize_categorical, summarize_numeric)
+
+
+@dataclass
+class ColumnProfile:
+    """Everything a report shows about one column."""
+    name: str
+    dtype: str
+    missing: int
+    stats: Optional[Dict] = None        # Numerical columns: the summarize_numeric entry
+    frequencies: Optional[Dict] = None  # Categorical columns: the summarize_categorical entry
+
+
+@dataclass
+class DatasetProfile:
+    """
+    The profile of a dataset: its size and a ColumnProfile per column, in column order.
+
+    The accessors return the same layouts as the DataExplorer methods
+    (get_summary_statistics, get_missing_data_info, get_frequency_counts),
+    so one profile can answer all of them.
+    """
+    rows: int
+    columns: List[ColumnProfile] = field(default_factory=list)
+    streaming: bool = False  # Medians and quartiles are approximate (see StreamingSummary)
+
+    def column(self, name: str) -> ColumnProfile:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise KeyError(name)
+
+    def missing_percentage(self, column: ColumnProfile) -> float:
+        return round(float(column.missing / self.rows * 100), 1) if self.rows else 0.0
+
+    def summary_statistics(self) -> Dict[str, Dict]:
+        return {column.name: column.stats for column in self.columns if column.stats is not None}
+
+    def missing_data_info(self) -> Dict[str, Dict]:
+        """Only the columns with missing values, like get_missing_data_info."""
+        return {column.name: {'count': column.missing, 'percentage': self.missing_percentage(column)}
+                for column in self.columns if column.missing > 0}
+
+    def frequency_counts(self) -> Dict[str, Dict]:
+        return {column.name: column.frequencies for column in self.columns if column.frequencies is not None}
+
+
+
+def profile_dataframe(df: pd.DataFrame, top_k: int = FREQUENCY_TOP_K,
+                      max_unique: int = MAX_EXACT_UNIQUE) -> DatasetProfile:
+    """
+    Profile a DataFrame: dtypes, missing values, numerical statistics and categorical counts.
+
+    Every part of the profile is computed once: the numerical columns go
+    through one summarize_numeric block, whose counts also give their
+    missing values, the categorical columns through summarize_categorical,
+    and only the remaining columns are checked for missing values
+    separately.
+
+    Args:
+        df: DataFrame to profile
+        top_k: Number of values reported for high-cardinality columns
+        max_unique: Number of distinct values above which a column switches to top-k
+
+    Returns:
+        DatasetProfile: The profile
+    """
+    rows = len(df)
+    stats = summarize_numeric(df)
+    frequencies = summarize_categorical(df, top_k, max_unique)
+
+    # Numerical columns already know how many values they have
+    others = [col for col in df.columns if col not in stats]
+    missing = df[others].isna().sum() if others else pd.Series(dtype='int64')
+
+    columns = []
+    for col in df.columns:
+        columns.append(ColumnProfile(
+            name=col,
+            dtype=str(df[col].dtype),
+            missing=rows - stats[col]['count'] if col in stats else int(missing[col]),
+            stats=stats.get(col),
+            frequencies=frequencies.get(col)
+        ))
+    return DatasetProfile(rows=rows, columns=columns)
+
+
+
+class StreamingProfile:
+    """
+    A DatasetProfile built up one chunk at a time.
+
+    Each chunk is scanned once: StreamingSummary takes the numerical
+    columns, StreamingFrequencies the categorical ones, and only the other
+    columns are checked for missing values (the numerical ones are derived
+    from the value counts). Profiles of different chunks can be merged, so
+    chunks can be processed in parallel.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes: Dict[str, str] = {}  # Column -> dtype, in column order
+        self.missing: Dict[str, int] = {}
+        self.summary = StreamingSummary()
+        self.frequencies = StreamingFrequencies()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        for col in chunk.columns:
+            self.dtypes.setdefault(col, str(chunk[col].dtype))
+        self.rows += len(chunk)
+        self.summary.update(chunk)
+        self.frequencies.update(chunk)
+
+        others = [col for col in chunk.columns if col not in self.summary.moments]
+        if others:
+            for col, count in chunk[others].isna().sum().items():
+                self.missing[col] = self.missing.get(col, 0) + int(count)
+
+    def merge(self, other: "StreamingProfile") -> None:
+        """Fold another profile (e.g. of a different chunk) into this one."""
+        for col, dtype in other.dtypes.items():
+            self.dtypes.setdefault(col, dtype)
+        self.rows += other.rows
+        self.summary.merge(other.summary)
+        self.frequencies.merge(other.frequencies)
+        for col, count in other.missing.items():
+            self.missing[col] = self.missing.get(col, 0) + count
+
+    def result(self, top_k: int = FREQUENCY_TOP_K, max_unique: int = MAX_EXACT_UNIQUE) -> DatasetProfile:
+        stats = self.summary.result()
+        frequencies = self.frequencies.result(top_k, max_unique)
+
+        columns = []
+        for col, dtype in self.dtypes.items():
+            columns.append(ColumnProfile(
+                name=col,
+                dtype=dtype,
+                missing=self.rows - stats[col]['count'] if col in stats else self.missing.get(col, 0),
+                stats=stats.get(col),
+                frequencies=frequencies.get(col)
+            ))
+        return DatasetProfile(rows=self.rows, columns=columns, streaming=True)
+
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], n_workers: int = 1, top_k: int = FREQUENCY_TOP_K,
+                   max_unique: int = MAX_EXACT_UNIQUE) -> DatasetProfile:
+    """
+    Profile a stream of chunks (see StreamingProfile).
+
+    Args:
+        chunks: Iterable of DataFrame chunks (e.g. DatasetManager.iter_chunks)
+        n_workers: Number of threads profiling chunks
+        top_k: Number of values reported for high-cardinality columns
+        max_unique: Number of distinct values above which a column switches to top-k
+
+    Returns:
+        DatasetProfile: The profile (with approximate medians and quartiles)
+    """
+    return _summarize_chunks(chunks, StreamingProfile, n_workers).result(top_k, max_unique)
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional
+from profiling import DatasetProfile
 
 class ReportCreator:
     def __init__(self, dataset_manager, data_explorer, reports_dir="reports"):
@@ -14,26 +15,57 @@ class ReportCreator:
         Path(self.reports_dir).mkdir(parents=True, exist_ok=True)
 
     
-    def generate_report(self, dataset_name: str) -> str:
+    def generate_report(self, dataset_name: str, streaming: Optional[bool] = None) -> str:
         """
         Generate a detailed analysis report for a dataset and save it as a text file.
         
+        The dataset is profiled in one scan (DataExplorer.get_profile) and the
+        report is a rendering of that profile (see render_report).
+        
         Args:
             dataset_name (str): Name of the dataset
+            streaming (Optional[bool]): Profile the dataset chunk by chunk (None decides by its size)
         
         Returns:
             str: Path to the saved report file
 
         """
 
-        # Step 1: Get dataset and metadata
-        df = self.dataset_manager.get_dataset(dataset_name)
+        # Step 1: Get metadata and the dataset's profile
         metadata = self.dataset_manager.metadata.get(dataset_name, {})
-        
-        if df is None or not metadata:
+        if not metadata:
             raise ValueError(f"Dataset '{dataset_name}' not found.")
         
-        # Step 2: Header
+        profile = self.data_explorer.get_profile(dataset_name, streaming=streaming)
+        if profile is None:
+            raise ValueError(f"Could not profile dataset '{dataset_name}'.")
+        
+        # Step 2: Render it
+        report = self.render_report(dataset_name, profile, metadata)
+        
+        # Step 3: Write to file
+        report_path = os.path.join(self.reports_dir, f"{dataset_name}_report.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        
+        return report_path
+
+
+    
+    def render_report(self, dataset_name: str, profile: DatasetProfile, metadata: Dict[str, Any]) -> str:
+        """
+        Render a dataset's profile as the text of a report.
+        
+        Args:
+            dataset_name (str): Name of the dataset
+            profile (DatasetProfile): The dataset's profile
+            metadata (Dict[str, Any]): The dataset's metadata
+        
+        Returns:
+            str: The report
+        """
+        
+        # Step 1: Header
         lines = []
         lines.append("================================================")
         lines.append("PyLytics Data Analysis Report")
@@ -41,50 +73,44 @@ class ReportCreator:
         
 
 
-        # Step 3: Dataset Overview
+        # Step 2: Dataset Overview
         lines.append("\nDATASET OVERVIEW:")
         lines.append("------------------------------------------------")
         lines.append(f"  Name: {dataset_name}")
-        lines.append(f"  Shape: {df.shape[0]} rows x {df.shape[1]} columns")
+        lines.append(f"  Shape: {profile.rows} rows x {len(profile.columns)} columns")
         lines.append(f"  Last Modified: {metadata.get('last_modified', 'N/A')}")
         lines.append("")
 
 
 
-        # Step 4: Column Information
+        # Step 3: Column Information
         lines.append("\n\nCOLUMN INFORMATION:")
         lines.append("-" * 58)
         lines.append(f"{'Column Name':<25} {'Type':<15} {'Missing Values':<15}")
         lines.append("-" * 58)
         
-        for col in df.columns:
-            dtype = str(df[col].dtype)
-            missing = df[col].isnull().sum()
-            lines.append(f"{col:<25} {dtype:<15} {missing:<15}")
+        for column in profile.columns:
+            lines.append(f"{column.name:<25} {column.dtype:<15} {column.missing:<15}")
         lines.append("")
 
 
 
-        # Step 5.5: Missing Values Summary
+        # Step 4: Missing Values Summary
         lines.append("\nMISSING VALUES SUMMARY:")
         lines.append("-" * 70)
         lines.append(f"{'Column Name':<25} {'Missing':<10} {'% Missing':<10}")
         lines.append("-" * 70)
         
-        missing_info = self.data_explorer.get_missing_data_info(dataset_name)
-        
-        for col in df.columns:
-            count = missing_info.get(col, {}).get('count', 0)
-            percent = missing_info.get(col, {}).get('percentage', 0.0)
-            lines.append(f"{col:<25} {count:<10} {percent:<10.2f}")
+        for column in profile.columns:
+            lines.append(f"{column.name:<25} {column.missing:<10} {profile.missing_percentage(column):<10.2f}")
         
         lines.append("")
 
 
 
 
-        # Step 6: Numerical Columns Summary
-        num_stats = self.data_explorer.get_summary_statistics(dataset_name)
+        # Step 5: Numerical Columns Summary
+        num_stats = profile.summary_statistics()
         
         if num_stats:
             lines.append("\n\nNUMERICAL COLUMNS SUMMARY:")
@@ -104,15 +130,19 @@ class ReportCreator:
 
 
     
-        # Step 7: Categorical Columns Summary
-        cat_stats = self.data_explorer.get_frequency_counts(dataset_name)
+        # Step 6: Categorical Columns Summary
+        cat_stats = profile.frequency_counts()
         
         if cat_stats:
             lines.append("\n\nCATEGORICAL COLUMNS SUMMARY:")
             lines.append("------------------------------------------------")
             
             for col, info in cat_stats.items():
-                lines.append(f"  {col} (unique: {info['total_unique']}):")
+                unique = f"~{info['total_unique']}" if info.get('approximate') else info['total_unique']
+                if info.get('truncated'):
+                    lines.append(f"  {col} (unique: {unique}, top {len(info['counts'])} shown):")
+                else:
+                    lines.append(f"  {col} (unique: {unique}):")
                 
                 for value, count in info['counts'].items():
                     lines.append(f"    {value}: {count}")
@@ -122,7 +152,7 @@ class ReportCreator:
         
         
         
-        # Step 8: Analyses Performed
+        # Step 7: Analyses Performed
         analyses = metadata.get("analyses_performed", [])
         
         lines.append("\n\nANALYSES PERFORMED:")
@@ -138,14 +168,7 @@ class ReportCreator:
         
 
         
-        # Step 9: End of file
+        # Step 8: End of file
         lines.append("======================= End of Report =======================")
         
-
-
-        # Step 10: Write to file
-        report_path = os.path.join(self.reports_dir, f"{dataset_name}_report.txt")
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
-        
-        return report_path 
\ No newline at end of file
+        return "\n".join(lines)
@@ -0,0 +1,136 @@
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Returned by get() when nothing is cached (None and {} are valid results)
+MISSING = object()
+
+
+class ResultCache:
+    """
+    A cache for analysis results (summary statistics, missing data, frequency counts, ...).
+
+    Entries are keyed by dataset name, dataset version, operation and the
+    operation's parameters. The version comes from DatasetManager and goes up
+    whenever the data changes, so a stale result can never be returned; on top
+    of that the cache listens for changes and drops the dataset's entries
+    straight away.
+
+    Results are kept in memory and, optionally, in a small pickle file inside
+    the dataset's folder so they survive restarts.
+    """
+
+    CACHE_FILE = "analysis_cache.pkl"
+
+    def __init__(self, dataset_manager, persist: bool = True):
+        """
+        Args:
+            dataset_manager: Instance of DatasetManager
+            persist: Also save results next to the dataset on disk
+        """
+        self.dataset_manager = dataset_manager
+        self.persist = persist
+
+        # dataset name -> {"version": int, "results": {(operation, params): result}}
+        self._entries: Dict[str, Dict] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        dataset_manager.add_change_listener(self.invalidate)
+
+
+
+    def get(self, dataset_name: str, operation: str, params: Optional[Dict] = None) -> Any:
+        """
+        Look up a cached result.
+
+        Args:
+            dataset_name: Name of the dataset the result was computed from
+            operation: Name of the analysis (e.g. "summary_statistics")
+            params: The analysis' parameters
+
+        Returns:
+            The cached result, or MISSING if there is none for the current version
+        """
+        entry = self._entry(dataset_name)
+        if entry is not None:
+            key = self._key(operation, params)
+            if key in entry["results"]:
+                self.hits += 1
+                return entry["results"][key]
+
+        self.misses += 1
+        return MISSING
+
+    def put(self, dataset_name: str, operation: str, params: Optional[Dict], result: Any) -> None:
+        """Store a result computed from the current version of a dataset."""
+        version = self.dataset_manager.dataset_version(dataset_name)
+        if version is None:
+            return
+
+        entry = self._entry(dataset_name)
+        if entry is None:
+            entry = {"version": version, "results": {}}
+            self._entries[dataset_name] = entry
+        entry["results"][self._key(operation, params)] = result
+
+        if self.persist:
+            self._save(dataset_name, entry)
+
+    def invalidate(self, dataset_name: str) -> None:
+        """Forget every result for a dataset (in memory and on disk)."""
+        self._entries.pop(dataset_name, None)
+        cache_file = self._cache_file(dataset_name)
+        if cache_file.exists():
+            os.remove(cache_file)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache's hit and miss counts."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+
+    @staticmethod
+    def _key(operation: str, params: Optional[Dict]) -> Tuple:
+        return (operation, tuple(sorted((params or {}).items())))
+
+    def _cache_file(self, dataset_name: str) -> Path:
+        return self.dataset_manager.data_dir / dataset_name / self.CACHE_FILE
+
+    def _entry(self, dataset_name: str) -> Optional[Dict]:
+        """Get the results cached for the current version of a dataset (loading them from disk if needed)."""
+        version = self.dataset_manager.dataset_version(dataset_name)
+        if version is None:
+            return None
+
+        entry = self._entries.get(dataset_name)
+        if entry is None and self.persist:
+            entry = self._load(dataset_name)
+            if entry is not None:
+                self._entries[dataset_name] = entry
+
+        if entry is None or entry["version"] != version:
+            return None
+        return entry
+
+    def _load(self, dataset_name: str) -> Optional[Dict]:
+        cache_file = self._cache_file(dataset_name)
+        if not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # A corrupt or unreadable cache file is just a cache miss
+            return None
+
+    def _save(self, dataset_name: str, entry: Dict) -> None:
+        cache_file = self._cache_file(dataset_name)
+        if not cache_file.parent.exists():
+            return
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_file, cache_file)
@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+class MomentAccumulator:
+    """
+    Online count / mean / variance / min / max for one numerical column.
+
+    Each chunk's moments are computed with vectorized NumPy and folded into
+    the running totals with Chan et al.'s parallel form of Welford's update,
+    so accumulators built on different chunks (or in different threads) can
+    be merged and give the same result as one pass over all the data.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values (NaN values are ignored)."""
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        other = MomentAccumulator()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "MomentAccumulator") -> None:
+        """Fold another accumulator's values into this one."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, like pandas)."""
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+
+class KLLSketch:
+    """
+    A mergeable quantile sketch (Karnin, Lang & Liberty, "Optimal Quantile
+    Approximation in Streams", 2016).
+
+    Values are kept in a stack of "compactors". When a level fills up it is
+    sorted and every other value (starting at a random offset) moves up a
+    level with twice the weight, so memory stays around a few times k values
+    no matter how many are added. Until the first compaction the sketch is
+    exact.
+
+    Compactions are where error comes from: each one at a level of weight w
+    moves any rank by at most w, with mean zero. rank_error() turns the total
+    variance of those moves into a ~99% confidence bound on the rank error.
+    """
+
+    def __init__(self, k: int = 1000, seed: Optional[int] = None):
+        """
+        Args:
+            k: Accuracy parameter - larger k means more memory and smaller error
+            seed: Optional seed for the random compaction offsets
+        """
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._variance = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        # The top level holds k values and each level below holds 2/3 as many (but at least 2)
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values (NaN values are ignored)."""
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Fold another sketch's values into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.count += other.count
+        self._variance += other._variance
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                values = np.sort(self.levels[level])
+                # With an odd number of values the last one stays behind
+                keep = values[-1:] if len(values) % 2 else values[:0]
+                values = values[:len(values) - len(keep)]
+
+                offset = self._rng.integers(2)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], values[offset::2]])
+                self.levels[level] = keep
+                self._variance += float(2 ** level) ** 2
+            level += 1
+
+    def _sorted_with_weights(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2.0 ** level) for level, v in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Estimate quantiles of everything added so far.
+
+        Args:
+            qs: Quantiles between 0 and 1
+
+        Returns:
+            Array of estimates, one per quantile (NaN if the sketch is empty)
+        """
+        qs = np.asarray(qs, dtype="float64")
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+
+        values, cumulative = self._sorted_with_weights()
+        total = cumulative[-1]
+
+        if self._variance == 0:
+            # Nothing has been compacted - interpolate exactly like pandas/numpy do
+            return np.quantile(values, qs)
+
+        index = np.searchsorted(cumulative, qs * total, side="left")
+        return values[np.minimum(index, len(values) - 1)]
+
+    def rank_error(self) -> float:
+        """
+        ~99% confidence bound on the normalized rank error of quantiles().
+
+        For example 0.01 means the value returned for the 25% quantile lies
+        between the true 24% and 26% quantiles.
+        """
+        if self.count == 0:
+            return 0.0
+        return float(2.576 * np.sqrt(self._variance) / self.count)
+
+
+
+class SpaceSavingSketch:
+    """
+    A mergeable heavy-hitter sketch (Metwally, Agrawal & El Abbadi, "Efficient
+    Computation of Frequent and Top-k Elements in Data Streams", 2005, in the
+    mergeable form of Agarwal et al., 2012).
+
+    At most `capacity` values are tracked, each with a count that may
+    overestimate the true count by at most its `error`. Any value that is
+    not tracked occurred at most `floor` times. Each batch is counted exactly
+    with value_counts() and then merged in, so updates are vectorized. Until
+    the number of distinct values exceeds the capacity, floor stays 0 and
+    every count is exact.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity: Number of distinct values tracked - larger means more memory and smaller error
+        """
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+        self.floor = 0
+
+    @property
+    def exact(self) -> bool:
+        """True while no value has been dropped, i.e. the counts are exact."""
+        return self.floor == 0
+
+    def update(self, values: pd.Series) -> None:
+        """Add a batch of values (missing values are ignored)."""
+        counts = values.value_counts()
+        counts = counts[counts > 0]  # Category columns also list categories that don't appear
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts.index = counts.index.astype(object)
+
+        other = SpaceSavingSketch(self.capacity)
+        other.counts = counts.astype("int64")
+        other.errors = pd.Series(0, index=counts.index, dtype="int64")
+        other._truncate()
+        self.merge(other)
+
+    def merge(self, other: "SpaceSavingSketch") -> None:
+        """Fold another sketch's counts into this one."""
+        # A value missing from one side may still have occurred up to that side's floor times
+        index = self.counts.index.union(other.counts.index, sort=False)
+        self.counts = (self.counts.reindex(index, fill_value=self.floor) +
+                       other.counts.reindex(index, fill_value=other.floor))
+        self.errors = (self.errors.reindex(index, fill_value=self.floor) +
+                       other.errors.reindex(index, fill_value=other.floor))
+        self.floor += other.floor
+        self._truncate()
+
+    def _truncate(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        order = np.argsort(-self.counts.to_numpy(), kind="stable")
+        keep, dropped = order[:self.capacity], order[self.capacity:]
+        self.floor = max(self.floor, int(self.counts.iloc[dropped].max()))
+        self.counts = self.counts.iloc[keep]
+        self.errors = self.errors.iloc[keep]
+
+
+
+class HyperLogLog:
+    """
+    A mergeable distinct-count sketch (Flajolet et al., "HyperLogLog: the
+    analysis of a near-optimal cardinality estimation algorithm", 2007).
+
+    Values are hashed with pandas' hash_pandas_object; the first p bits of the
+    hash pick one of 2**p registers, which keeps the longest run of leading
+    zeros seen in the rest of the bits. The sketch uses 2**p bytes and the
+    estimate has a relative standard error of about 1.04 / sqrt(2**p)
+    (0.8% for the default p=14).
+    """
+
+    def __init__(self, p: int = 14):
+        """
+        Args:
+            p: Number of index bits (4 to 18)
+        """
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        """Add a batch of values (missing values are ignored)."""
+        values = values.dropna()
+        if len(values) == 0:
+            return
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+
+        # Position of the first 1 bit in the remaining 64 - p bits (the values fit a float64 exactly)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another sketch (with the same p) into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        """Estimate the number of distinct values added so far."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+
+        # Small cardinalities are estimated better by counting empty registers
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
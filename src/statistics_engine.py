@@ -0,0 +1,342 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List
+from parallel import map_ordered
+from sketches import HyperLogLog, KLLSketch, MomentAccumulator, SpaceSavingSketch
+
+# Quantiles reported for every numerical column, keyed by the name used in the results
+QUANTILES = {'25%': 0.25, '50%': 0.50, '75%': 0.75}
+
+# Categorical columns with more distinct values than this only report their most frequent values
+MAX_EXACT_UNIQUE = 50
+FREQUENCY_TOP_K = 20
+
+# Distinct values tracked per column by the streaming heavy-hitter sketch
+FREQUENCY_SKETCH_CAPACITY = 1000
+
+
+def categorical_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Get the categorical columns of a DataFrame.
+    
+    These are object and category columns, plus nullable "boolean" columns
+    (which is what object columns of True/False become after dtype compaction).
+    """
+    cat_cols = df.select_dtypes(include=['object', 'category']).columns
+    return [col for col in df.columns if col in cat_cols or isinstance(df[col].dtype, pd.BooleanDtype)]
+
+
+def summarize_numeric(df: pd.DataFrame, decimals: int = 4) -> Dict[str, Dict]:
+    """
+    Calculate summary statistics for every numerical column of a DataFrame at once.
+
+    Instead of a separate pandas call per statistic per column, the numerical
+    columns are turned into a single float64 matrix and every statistic is
+    computed for all columns together: vectorized moments (count, mean, std,
+    min, max) over the whole block, and one batched quantile call that also
+    provides the median.
+
+    Args:
+        df: DataFrame to summarize
+        decimals: Number of decimals to round the results to
+
+    Returns:
+        Dictionary mapping each numerical column to its count, mean, median,
+        std, min, 25%, 50%, 75% and max (the same layout as
+        DataExplorer.get_summary_statistics has always returned)
+    """
+    numeric = df.select_dtypes(include='number')
+    if numeric.shape[1] == 0:
+        return {}
+
+    # One float64 block for all the columns (nullable missing values become NaN)
+    values = numeric.to_numpy(dtype='float64', na_value=np.nan)
+    present = ~np.isnan(values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Moments, for every column at once
+        count = present.sum(axis=0)
+        mean = np.where(present, values, 0.0).sum(axis=0) / count
+        squares = np.where(present, values - mean, 0.0) ** 2
+        std = np.sqrt(squares.sum(axis=0) / (count - 1))
+        std[count < 2] = np.nan
+        col_min = np.where(present, values, np.inf).min(axis=0)
+        col_max = np.where(present, values, -np.inf).max(axis=0)
+        col_min[count == 0] = np.nan
+        col_max[count == 0] = np.nan
+
+    # Quartiles (and so the median), for every column at once
+    quantiles = _batched_quantiles(values, count, list(QUANTILES.values()))
+
+    stats = {}
+    for i, col in enumerate(numeric.columns):
+        stats[col] = {
+            'count': int(count[i]),
+            'mean': round(float(mean[i]), decimals),
+            'median': round(float(quantiles[1, i]), decimals),
+            'std': round(float(std[i]), decimals),
+            'min': round(float(col_min[i]), decimals),
+            '25%': round(float(quantiles[0, i]), decimals),
+            '50%': round(float(quantiles[1, i]), decimals),
+            '75%': round(float(quantiles[2, i]), decimals),
+            'max': round(float(col_max[i]), decimals)
+        }
+
+    return stats
+
+
+def _batched_quantiles(values: np.ndarray, count: np.ndarray, qs) -> np.ndarray:
+    """
+    Linear-interpolated quantiles (like pandas' default) of every column, ignoring NaN.
+
+    Each column is sorted once (NaN sorts to the end, after the `count` real
+    values) and every requested quantile is then read straight off the sorted
+    block, which is much cheaper than one partition per quantile.
+
+    Returns:
+        Array of shape (len(qs), n_columns)
+    """
+    # Sort along contiguous rows - one row per column of the original data
+    ordered = np.sort(np.ascontiguousarray(values.T), axis=1)
+
+    result = np.full((len(qs), values.shape[1]), np.nan)
+    cols = np.flatnonzero(count > 0)
+    n = count[cols]
+
+    for i, q in enumerate(qs):
+        position = q * (n - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, n - 1)
+        fraction = position - lower
+        a = ordered[cols, lower]
+        b = ordered[cols, upper]
+        # Same interpolation formula numpy/pandas use, so results match exactly
+        result[i, cols] = np.where(fraction >= 0.5, b - (b - a) * (1 - fraction), a + (b - a) * fraction)
+
+    return result
+
+
+
+class StreamingSummary:
+    """
+    Summary statistics for numerical columns, built up one chunk at a time.
+
+    Count, mean, std, min and max are exact (Welford-style accumulators);
+    the median and quartiles come from a KLL sketch per column and carry a
+    rank error bound. Summaries of different chunks can be merged, so chunks
+    can be processed in parallel.
+    """
+
+    def __init__(self, sketch_k: int = 1000):
+        self.sketch_k = sketch_k
+        self.moments: Dict[str, MomentAccumulator] = {}
+        self.sketches: Dict[str, KLLSketch] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        numeric = chunk.select_dtypes(include='number')
+        values = numeric.to_numpy(dtype='float64', na_value=np.nan)
+        for i, col in enumerate(numeric.columns):
+            if col not in self.moments:
+                self.moments[col] = MomentAccumulator()
+                self.sketches[col] = KLLSketch(self.sketch_k)
+            self.moments[col].update(values[:, i])
+            self.sketches[col].update(values[:, i])
+
+    def merge(self, other: "StreamingSummary") -> None:
+        """Fold another summary (e.g. of a different chunk) into this one."""
+        for col in other.moments:
+            if col not in self.moments:
+                self.moments[col] = MomentAccumulator()
+                self.sketches[col] = KLLSketch(self.sketch_k)
+            self.moments[col].merge(other.moments[col])
+            self.sketches[col].merge(other.sketches[col])
+
+    def result(self, decimals: int = 4) -> Dict[str, Dict]:
+        """
+        Get the statistics in the same layout as summarize_numeric, plus a
+        'rank_error' entry per column: the ~99% confidence bound on the
+        normalized rank error of the median and quartiles (0 means exact).
+        """
+        stats = {}
+        for col, moments in self.moments.items():
+            quantiles = self.sketches[col].quantiles(list(QUANTILES.values()))
+            empty = moments.count == 0
+            stats[col] = {
+                'count': int(moments.count),
+                'mean': round(float(np.nan if empty else moments.mean), decimals),
+                'median': round(float(quantiles[1]), decimals),
+                'std': round(moments.std(), decimals),
+                'min': round(float(np.nan if empty else moments.min), decimals),
+                '25%': round(float(quantiles[0]), decimals),
+                '50%': round(float(quantiles[1]), decimals),
+                '75%': round(float(quantiles[2]), decimals),
+                'max': round(float(np.nan if empty else moments.max), decimals),
+                'rank_error': round(self.sketches[col].rank_error(), decimals)
+            }
+        return stats
+
+
+
+def summarize_numeric_chunks(chunks: Iterable[pd.DataFrame], n_workers: int = 1,
+                             decimals: int = 4) -> Dict[str, Dict]:
+    """
+    Calculate summary statistics over a stream of chunks (see StreamingSummary).
+
+    With n_workers > 1 chunks are summarized in a thread pool (see _summarize_chunks).
+
+    Args:
+        chunks: Iterable of DataFrame chunks (e.g. DatasetManager.iter_chunks)
+        n_workers: Number of threads summarizing chunks
+        decimals: Number of decimals to round the results to
+
+    Returns:
+        Dictionary of statistics per numerical column
+    """
+    return _summarize_chunks(chunks, StreamingSummary, n_workers).result(decimals)
+
+
+
+def summarize_categorical(df: pd.DataFrame, top_k: int = FREQUENCY_TOP_K,
+                          max_unique: int = MAX_EXACT_UNIQUE) -> Dict[str, Dict]:
+    """
+    Count the values of every categorical column of a DataFrame.
+
+    Columns with more than max_unique distinct values (names, ticket numbers,
+    IDs, ...) only report their top_k most frequent values, so results and
+    reports stay small however many distinct values there are.
+
+    Args:
+        df: DataFrame to summarize
+        top_k: Number of values reported for high-cardinality columns
+        max_unique: Number of distinct values above which a column switches to top-k
+
+    Returns:
+        Dictionary mapping each categorical column to its 'counts' (value -> count,
+        most frequent first), 'total_unique', and whether the counts were
+        'truncated' to the top-k or are 'approximate' (never, here)
+    """
+    freq_counts = {}
+    for col in categorical_columns(df):
+        value_counts = df[col].value_counts()
+        value_counts = value_counts[value_counts > 0]  # Category columns also list categories that no longer appear
+        freq_counts[col] = _frequency_result(value_counts, len(value_counts), top_k, max_unique)
+    return freq_counts
+
+
+def _frequency_result(value_counts: pd.Series, total_unique: int, top_k: int, max_unique: int,
+                      approximate: bool = False) -> Dict:
+    # Most frequent first; ties are ordered by value so every code path gives the same order
+    order = np.lexsort((value_counts.index.astype(str), -value_counts.to_numpy()))
+    value_counts = value_counts.iloc[order]
+
+    truncated = approximate or total_unique > max_unique
+    if truncated:
+        value_counts = value_counts.head(top_k)
+    return {
+        'counts': {value: int(count) for value, count in value_counts.items()},
+        'total_unique': int(total_unique),
+        'truncated': truncated,
+        'approximate': approximate
+    }
+
+
+
+class StreamingFrequencies:
+    """
+    Frequency counts for categorical columns, built up one chunk at a time.
+
+    Each column gets a Space-Saving sketch for its most frequent values and a
+    HyperLogLog sketch for its number of distinct values, so memory per column
+    is fixed no matter how many distinct values there are. As long as a
+    column has at most `capacity` distinct values the results are exact.
+    Summaries of different chunks can be merged, so chunks can be processed
+    in parallel.
+    """
+
+    def __init__(self, capacity: int = FREQUENCY_SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.heavy_hitters: Dict[str, SpaceSavingSketch] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+
+    def _add_column(self, col: str) -> None:
+        if col not in self.heavy_hitters:
+            self.heavy_hitters[col] = SpaceSavingSketch(self.capacity)
+            self.distinct[col] = HyperLogLog()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        for col in categorical_columns(chunk):
+            self._add_column(col)
+            self.heavy_hitters[col].update(chunk[col])
+            self.distinct[col].update(chunk[col])
+
+    def merge(self, other: "StreamingFrequencies") -> None:
+        """Fold another summary (e.g. of a different chunk) into this one."""
+        for col in other.heavy_hitters:
+            self._add_column(col)
+            self.heavy_hitters[col].merge(other.heavy_hitters[col])
+            self.distinct[col].merge(other.distinct[col])
+
+    def result(self, top_k: int = FREQUENCY_TOP_K, max_unique: int = MAX_EXACT_UNIQUE) -> Dict[str, Dict]:
+        """
+        Get the counts in the same layout as summarize_categorical.
+
+        For a column with more than `capacity` distinct values, total_unique
+        is the HyperLogLog estimate, the counts of the top values may be
+        overestimated by up to 'max_error', and 'approximate' is True.
+        """
+        freq_counts = {}
+        for col, sketch in self.heavy_hitters.items():
+            if sketch.exact:
+                freq_counts[col] = _frequency_result(sketch.counts, len(sketch.counts), top_k, max_unique)
+            else:
+                total_unique = max(round(self.distinct[col].estimate()), len(sketch.counts))
+                freq_counts[col] = _frequency_result(sketch.counts, total_unique, top_k, max_unique,
+                                                     approximate=True)
+                freq_counts[col]['max_error'] = int(sketch.floor)
+        return freq_counts
+
+
+
+def summarize_categorical_chunks(chunks: Iterable[pd.DataFrame], n_workers: int = 1,
+                                 top_k: int = FREQUENCY_TOP_K,
+                                 max_unique: int = MAX_EXACT_UNIQUE) -> Dict[str, Dict]:
+    """
+    Count categorical values over a stream of chunks (see StreamingFrequencies).
+
+    Args:
+        chunks: Iterable of DataFrame chunks (e.g. DatasetManager.iter_chunks)
+        n_workers: Number of threads summarizing chunks
+        top_k: Number of values reported for high-cardinality columns
+        max_unique: Number of distinct values above which a column switches to top-k
+
+    Returns:
+        Dictionary of frequency counts per categorical column
+    """
+    return _summarize_chunks(chunks, StreamingFrequencies, n_workers).result(top_k, max_unique)
+
+
+
+def _summarize_chunks(chunks: Iterable[pd.DataFrame], summary_type: Callable, n_workers: int):
+    """
+    Fold a stream of chunks into a mergeable summary (StreamingSummary, StreamingFrequencies).
+
+    With n_workers > 1 each chunk is summarized in a thread pool and the
+    partial summaries are merged in chunk order, so the result doesn't
+    depend on thread timing.
+    """
+    summary = summary_type()
+    if n_workers <= 1:
+        for chunk in chunks:
+            summary.update(chunk)
+        return summary
+
+    def summarize_chunk(chunk: pd.DataFrame):
+        partial = summary_type()
+        partial.update(chunk)
+        return partial
+
+    for partial in map_ordered(summarize_chunk, chunks, n_workers):
+        summary.merge(partial)
+    return summary
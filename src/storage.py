@@ -0,0 +1,430 @@
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# pyarrow is optional - without it we can still store everything as CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+class StorageBackend:
+    """
+    Base class for the on-disk formats a dataset can be stored in.
+
+    Every backend knows how to write a whole DataFrame to a single file
+    and read it back. DatasetManager only talks to this interface, so
+    adding a new format means adding a subclass and registering it in
+    STORAGE_BACKENDS.
+    """
+
+    name = None
+    extension = None
+    supports_memory_map = False
+
+    def is_available(self) -> bool:
+        """Return True if the libraries needed by this backend are installed."""
+        return True
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        """
+        Write a DataFrame to the given path.
+
+        Args:
+            df: DataFrame to store
+            path: Destination file
+        """
+        raise NotImplementedError
+
+    def read(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a stored DataFrame back from disk.
+
+        Args:
+            path: File written by write()
+            columns: Optional list of columns to read (None reads all of them)
+
+        Returns:
+            pd.DataFrame: The stored data
+        """
+        raise NotImplementedError
+
+    def open_memory_mapped(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Open a stored DataFrame without copying it into process memory.
+
+        Column buffers point straight into the OS page cache, so several
+        processes opening the same file share one copy of the data.
+        Only backends with supports_memory_map = True implement this.
+
+        Args:
+            path: File written by write()
+            columns: Optional list of columns to open (None opens all of them)
+
+        Returns:
+            pd.DataFrame: A read-only view of the stored data
+        """
+        raise NotImplementedError(f"Storage format '{self.name}' cannot be memory-mapped")
+
+    def iter_batches(self, path: Path, batch_size: int,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a stored file back in chunks of at most batch_size rows.
+
+        Args:
+            path: File written by write()
+            batch_size: Maximum rows per chunk
+            columns: Optional list of columns to read (None reads all of them)
+
+        Yields:
+            pd.DataFrame: One chunk of rows at a time
+        """
+        raise NotImplementedError
+
+    def read_schema(self, path: Path):
+        """
+        Get the column types of a stored file without reading its data.
+
+        Returns:
+            The file's pyarrow schema, or None for untyped formats like CSV
+        """
+        return None
+
+    def open_writer(self, path: Path, schema=None) -> "ChunkWriter":
+        """
+        Open a writer that stores a dataset one chunk at a time.
+
+        Args:
+            path: Destination file
+            schema: Optional column types to write with (from read_schema). By default
+                they are taken from the first chunk.
+
+        Returns:
+            ChunkWriter: Call write(chunk) for every chunk, then close()
+        """
+        raise NotImplementedError
+
+
+
+class ChunkWriter:
+    """
+    Writes a dataset to disk in chunks, so only one chunk is in memory at a time.
+
+    The column layout (and for typed formats, the column types) is fixed by
+    the first chunk unless a schema is given. Can be used as a context manager.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows_written = 0
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk of rows to the file."""
+        self._write(chunk)
+        self.rows_written += len(chunk)
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish the file. Must be called once all chunks are written."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSVChunkWriter(ChunkWriter):
+    def _write(self, chunk: pd.DataFrame) -> None:
+        # Header only goes in once, every later chunk is appended below it
+        first_chunk = self.rows_written == 0
+        chunk.to_csv(self.path, mode="w" if first_chunk else "a", header=first_chunk, index=False)
+
+    def close(self) -> None:
+        # Even an empty dataset should leave a file behind
+        if not os.path.exists(self.path):
+            open(self.path, "w").close()
+
+
+class ArrowChunkWriter(ChunkWriter):
+    """Shared logic for Parquet and Feather: convert each chunk to an Arrow table with one schema."""
+
+    def __init__(self, path: Path, schema=None):
+        super().__init__(path)
+        self.schema = schema
+        self._writer = None
+
+    def _open(self, schema) -> None:
+        raise NotImplementedError
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        if self.schema is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            # A text column with no values in the first chunk has no type yet; it is still text
+            nulls = [i for i, field in enumerate(table.schema) if pa.types.is_null(field.type)]
+            if nulls:
+                schema = table.schema
+                for i in nulls:
+                    schema = schema.set(i, schema.field(i).with_type(pa.string()))
+                table = table.cast(schema)
+            self.schema = table.schema
+        else:
+            table = self._to_table(chunk)
+
+        if self._writer is None:
+            self._open(self.schema)
+        self._writer.write_table(table)
+
+    def _to_table(self, chunk: pd.DataFrame):
+        """Convert a chunk to the writer's schema."""
+        try:
+            return pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"A column changed type after the first chunk ({str(e)}). "
+                             f"Read CSV files with read_csv_chunks so every chunk gets the same types.")
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetChunkWriter(ArrowChunkWriter):
+    def _open(self, schema) -> None:
+        self._writer = pq.ParquetWriter(self.path, schema)
+
+
+class FeatherChunkWriter(ArrowChunkWriter):
+    def _open(self, schema) -> None:
+        # Same temporary-file-and-swap trick as FeatherStorage.write
+        self._tmp_path = f"{self.path}.tmp"
+        options = pa.ipc.IpcWriteOptions(compression=None)
+        self._writer = pa.ipc.new_file(self._tmp_path, schema, options=options)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            super().close()
+            os.replace(self._tmp_path, self.path)
+
+
+class CSVStorage(StorageBackend):
+    """Plain CSV files. Slow to parse, but readable by anything."""
+
+    name = "csv"
+    extension = ".csv"
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        df.to_csv(path, index=False)
+
+    def read(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pd.read_csv(path, usecols=columns)
+
+    def iter_batches(self, path: Path, batch_size: int,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
+
+    def open_writer(self, path: Path, schema=None) -> ChunkWriter:
+        return CSVChunkWriter(path)
+
+
+class ParquetStorage(StorageBackend):
+    """Compressed columnar Parquet files with typed columns."""
+
+    name = "parquet"
+    extension = ".parquet"
+
+    def is_available(self) -> bool:
+        return pa is not None
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, path)
+
+    def read(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    def iter_batches(self, path: Path, batch_size: int,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+    def read_schema(self, path: Path):
+        return pq.read_schema(path)
+
+    def open_writer(self, path: Path, schema=None) -> ChunkWriter:
+        return ParquetChunkWriter(path, schema)
+
+
+class FeatherStorage(StorageBackend):
+    """
+    Arrow IPC (Feather v2) files - the fastest format to read back.
+
+    Files are written uncompressed so they can be memory-mapped: the
+    on-disk layout is exactly the in-memory Arrow layout.
+    """
+
+    name = "feather"
+    extension = ".feather"
+    supports_memory_map = True
+
+    def is_available(self) -> bool:
+        return pa is not None
+
+    def write(self, df: pd.DataFrame, path: Path) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        # Write to a temporary file and swap it in. Truncating the file in place would pull
+        # the pages out from under any process that currently has it memory-mapped.
+        tmp_path = f"{path}.tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+    def read(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return feather.read_table(path, columns=columns).to_pandas()
+
+    def iter_batches(self, path: Path, batch_size: int,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size).to_pandas()
+
+    def open_memory_mapped(self, path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        # split_blocks stops pandas from consolidating (and so copying) columns of the same dtype.
+        # Numeric columns without nulls come out as zero-copy views of the mapped file.
+        return table.to_pandas(split_blocks=True)
+
+    def read_schema(self, path: Path):
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema
+
+    def open_writer(self, path: Path, schema=None) -> ChunkWriter:
+        return FeatherChunkWriter(path, schema)
+
+
+# All the formats a dataset can be stored in, keyed by the name saved in the catalog
+STORAGE_BACKENDS: Dict[str, StorageBackend] = {
+    backend.name: backend
+    for backend in (CSVStorage(), ParquetStorage(), FeatherStorage())
+}
+
+DEFAULT_STORAGE_FORMAT = "parquet"
+
+
+def get_storage_backend(storage_format: str) -> StorageBackend:
+    """
+    Look up the backend for a storage format name.
+
+    Args:
+        storage_format: One of the keys in STORAGE_BACKENDS
+
+    Returns:
+        StorageBackend: The matching backend
+
+    Raises:
+        ValueError: If the format is unknown or its dependencies are missing
+    """
+    backend = STORAGE_BACKENDS.get(storage_format)
+    if backend is None:
+        raise ValueError(f"Unknown storage format '{storage_format}'. "
+                         f"Choose from: {', '.join(STORAGE_BACKENDS)}")
+    if not backend.is_available():
+        raise ValueError(f"Storage format '{storage_format}' requires pyarrow to be installed")
+    return backend
+
+
+
+def infer_csv_dtypes(path: Path, chunksize: int) -> Dict[str, str]:
+    """
+    Find the column types pandas would give a whole CSV file, without loading all of it.
+
+    Reading a CSV in chunks lets pandas guess the types of every chunk
+    separately: a text column can come out as float64 in a chunk where it
+    happens to be empty or all digits, and an int column as float64 where it
+    has gaps. This goes through the file once (one chunk at a time) and
+    merges what every chunk looked like, so the chunks can then be read with
+    the same types throughout (see read_csv_chunks).
+
+    Args:
+        path: The CSV file
+        chunksize: Rows per chunk
+
+    Returns:
+        Dict[str, str]: dtype to read each column with ("str", "boolean" or
+        "float64"), for the columns where one chunk's guess could be wrong
+    """
+    kinds: Dict[str, set] = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col in chunk.columns:
+            kinds.setdefault(col, set()).add(_csv_value_kind(chunk[col]))
+
+    dtypes = {}
+    for col, seen in kinds.items():
+        # An int column with an empty chunk has missing values, so the whole file reads as float64
+        had_empty = "empty" in seen
+        seen = seen - {"empty"}
+        if "text" in seen or ("bool" in seen and len(seen) > 1):
+            dtypes[col] = "str"
+        elif "bool" in seen:
+            dtypes[col] = "boolean"
+        elif "float" in seen or (seen == {"int"} and had_empty):
+            dtypes[col] = "float64"
+    return dtypes
+
+
+def _csv_value_kind(series: pd.Series) -> str:
+    """What the values of one chunk of a CSV column look like: empty, bool, int, float or text."""
+    if series.isna().all():
+        return "empty"
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    return "bool" if pd.api.types.infer_dtype(series, skipna=True) == "boolean" else "text"
+
+
+def csv_dtypes_for_schema(schema) -> Dict[str, str]:
+    """
+    Get the dtypes to read a CSV with so its columns match a stored file's schema (from read_schema).
+
+    Text columns are read as text, so values that look like numbers ("0042",
+    "12345") stay exactly as written instead of being parsed and turned back
+    into strings later.
+    """
+    dtypes = {}
+    for field in schema or []:
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            dtypes[field.name] = "str"
+        elif pa.types.is_boolean(field.type):
+            dtypes[field.name] = "boolean"
+        elif pa.types.is_floating(field.type):
+            dtypes[field.name] = "float64"
+    return dtypes
+
+
+def read_csv_chunks(path: Path, chunksize: int, dtypes: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV file in chunks that all have the same column types.
+
+    Args:
+        path: The CSV file
+        chunksize: Rows per chunk
+        dtypes: dtype per column (from infer_csv_dtypes, which is called if None)
+    """
+    if dtypes is None:
+        dtypes = infer_csv_dtypes(path, chunksize)
+    yield from pd.read_csv(path, chunksize=chunksize, dtype=dtypes or None)
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from storage import get_storage_backend
+
+VERSIONS_DIR = "_versions"
+
+# Content-defined chunking: a row whose hash is divisible by the target ends a chunk,
+# so chunks hold CHUNK_TARGET_ROWS rows on average (never fewer than the minimum
+# except at the end, and never more than the maximum)
+CHUNK_TARGET_ROWS = 2048
+CHUNK_MIN_ROWS = 256
+CHUNK_MAX_ROWS = 16384
+
+
+def chunk_boundaries(row_hashes: np.ndarray, start: int, target: int, min_rows: int, max_rows: int) -> List[int]:
+    """
+    Find where chunks end in a run of rows.
+
+    Args:
+        row_hashes: Hashes of the rows, the first of which starts a chunk
+        start: Rows already in the current chunk before row_hashes[0] (carried over from the last run)
+        target, min_rows, max_rows: Chunk size parameters (see CHUNK_TARGET_ROWS)
+
+    Returns:
+        List[int]: Positions in row_hashes after which a chunk ends (exclusive end positions)
+    """
+    candidates = np.flatnonzero(row_hashes % np.uint64(target) == 0) + 1
+    cuts = []
+    chunk_start = -start
+    for cut in list(candidates) + [None]:
+        end = len(row_hashes) if cut is None else int(cut)
+        # A chunk that would grow past the maximum is cut there, wherever that is
+        while end - chunk_start > max_rows:
+            chunk_start += max_rows
+            cuts.append(chunk_start)
+        if cut is not None and cut - chunk_start >= min_rows:
+            cuts.append(end)
+            chunk_start = end
+    return cuts
+
+
+
+class VersionRecorder:
+    """
+    Records one version of a dataset from a stream of DataFrames.
+
+    Rows are split into content-defined chunks as they arrive: a chunk ends
+    after a row whose hash is divisible by CHUNK_TARGET_ROWS. Because the
+    boundaries depend on the rows themselves, editing, inserting or deleting
+    rows only changes the chunks around the edit - every other chunk comes
+    out exactly the same, has the same content hash and is already stored.
+    """
+
+    def __init__(self, store: "VersionStore", dataset_name: str, version: int, description: Optional[str],
+                 base_chunks: Optional[List[Dict]] = None, pending: Optional[pd.DataFrame] = None):
+        self.store = store
+        self.dataset_name = dataset_name
+        self.version = version
+        self.description = description
+
+        self.chunks: List[Dict] = list(base_chunks or [])
+        self.new_chunks = 0
+        self.new_bytes = 0
+        self.columns = None
+
+        # Rows of the chunk that isn't finished yet, and their hashes
+        self._pending: List[pd.DataFrame] = []
+        self._pending_hashes: List[np.ndarray] = []
+        self._pending_rows = 0
+        if pending is not None and len(pending):
+            self.add(pending)
+
+    def add(self, frame: pd.DataFrame) -> None:
+        """Add the next rows of the version."""
+        if len(frame) == 0:
+            return
+        if self.columns is None:
+            self.columns = [str(col) for col in frame.columns]
+        frame = frame.reset_index(drop=True)
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+        cuts = chunk_boundaries(hashes, self._pending_rows, self.store.target_rows,
+                                self.store.min_rows, self.store.max_rows)
+        start = 0
+        for cut in cuts:
+            self._pending.append(frame.iloc[start:cut])
+            self._pending_hashes.append(hashes[start:cut])
+            self._flush_chunk()
+            start = cut
+        if start < len(frame):
+            self._pending.append(frame.iloc[start:])
+            self._pending_hashes.append(hashes[start:])
+            self._pending_rows += len(frame) - start
+
+    def close(self) -> Dict:
+        """Store the last chunk and the version's manifest."""
+        if self._pending:
+            self._flush_chunk()
+        manifest = {
+            "version": self.version,
+            "created": pd.Timestamp.now().isoformat(),
+            "description": self.description,
+            "rows": sum(chunk["rows"] for chunk in self.chunks),
+            "columns": self.columns or [],
+            "chunks": self.chunks,
+            "new_chunks": self.new_chunks,
+            "new_bytes": self.new_bytes
+        }
+        self.store._write_manifest(self.dataset_name, manifest)
+        return manifest
+
+    def _flush_chunk(self) -> None:
+        chunk = pd.concat(self._pending, ignore_index=True) if len(self._pending) > 1 else self._pending[0]
+        chunk = chunk.reset_index(drop=True)
+        hashes = np.concatenate(self._pending_hashes)
+        self._pending, self._pending_hashes, self._pending_rows = [], [], 0
+
+        chunk_hash, written = self.store._put_chunk(self.dataset_name, chunk, hashes)
+        self.chunks.append({"hash": chunk_hash, "rows": len(chunk)})
+        if written:
+            self.new_chunks += 1
+            self.new_bytes += written
+
+
+
+class VersionStore:
+    """
+    Content-addressed history of every dataset version.
+
+    Each dataset gets a _versions folder with:
+    - chunks/: chunks of rows, each stored once under the hash of its
+      content (column names, dtypes and row hashes)
+    - <version>.json: a manifest listing the chunks the version is made of
+
+    A new version only stores the chunks that didn't exist yet, so after a
+    small edit it costs about the size of the change, not another copy of the
+    dataset. Versions are numbered like the dataset's data version in the
+    catalog. Chunks are written once and never changed, so old versions stay
+    readable whatever happens to the dataset afterwards.
+    """
+
+    def __init__(self, data_dir: Path, target_rows: int = CHUNK_TARGET_ROWS,
+                 min_rows: int = CHUNK_MIN_ROWS, max_rows: int = CHUNK_MAX_ROWS):
+        """
+        Args:
+            data_dir: The datasets' data directory
+            target_rows, min_rows, max_rows: Chunk size parameters (see CHUNK_TARGET_ROWS)
+        """
+        self.data_dir = Path(data_dir)
+        self.target_rows = target_rows
+        self.min_rows = min(min_rows, target_rows)
+        self.max_rows = max(max_rows, target_rows)
+
+        # Chunks are stored compressed if possible, whatever format the datasets use
+        try:
+            self.backend = get_storage_backend("parquet")
+        except ValueError:
+            self.backend = get_storage_backend("csv")
+
+
+
+    def recorder(self, dataset_name: str, version: int, description: Optional[str] = None) -> VersionRecorder:
+        """Start recording a version from scratch (add() the rows, then close())."""
+        return VersionRecorder(self, dataset_name, version, description)
+
+    def append_recorder(self, dataset_name: str, version: int, base_version: int,
+                        description: Optional[str] = None) -> Optional[VersionRecorder]:
+        """
+        Start recording a version that is base_version plus rows added at the end.
+
+        The base version's chunks are reused as they are, except for the last
+        one, which is chunked again together with the new rows - exactly the
+        chunks recording the whole version from scratch would give.
+
+        Returns:
+            The recorder, or None if base_version wasn't recorded
+        """
+        base = self.manifest(dataset_name, base_version)
+        if base is None:
+            return None
+        if not base["chunks"]:
+            return self.recorder(dataset_name, version, description)
+        last = base["chunks"][-1]
+        return VersionRecorder(self, dataset_name, version, description, base_chunks=base["chunks"][:-1],
+                               pending=self._read_chunk(dataset_name, last["hash"]))
+
+    def record(self, dataset_name: str, version: int, frames: Iterable[pd.DataFrame],
+               description: Optional[str] = None) -> Dict:
+        """Record a version from its rows (one DataFrame or chunks of it) and return its manifest."""
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        recorder = self.recorder(dataset_name, version, description)
+        for frame in frames:
+            recorder.add(frame)
+        return recorder.close()
+
+    def has_version(self, dataset_name: str, version: int) -> bool:
+        return self._manifest_path(dataset_name, version).exists()
+
+    def manifest(self, dataset_name: str, version: int) -> Optional[Dict]:
+        """Get a version's manifest (None if it wasn't recorded)."""
+        path = self._manifest_path(dataset_name, version)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def list_versions(self, dataset_name: str) -> List[Dict]:
+        """
+        Get the manifests of every recorded version, oldest first (without their chunk lists).
+        """
+        versions_dir = self._versions_dir(dataset_name)
+        if not versions_dir.exists():
+            return []
+        manifests = []
+        for path in versions_dir.glob("*.json"):
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            manifest["chunk_count"] = len(manifest.pop("chunks"))
+            manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["version"])
+
+    def iter_version(self, dataset_name: str, version: int) -> Iterator[pd.DataFrame]:
+        """Read a version back one chunk at a time."""
+        manifest = self.manifest(dataset_name, version)
+        if manifest is None:
+            raise ValueError(f"Version {version} of '{dataset_name}' not found")
+        for chunk in manifest["chunks"]:
+            yield self._read_chunk(dataset_name, chunk["hash"])
+
+    def read_version(self, dataset_name: str, version: int) -> pd.DataFrame:
+        """Read a whole version back."""
+        frames = list(self.iter_version(dataset_name, version))
+        if not frames:
+            manifest = self.manifest(dataset_name, version)
+            return pd.DataFrame(columns=manifest["columns"])
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def stored_bytes(self, dataset_name: str) -> int:
+        """Get the disk space all the versions of a dataset use together."""
+        chunks_dir = self._versions_dir(dataset_name) / "chunks"
+        return sum(path.stat().st_size for path in chunks_dir.rglob("*") if path.is_file())
+
+
+
+    def _versions_dir(self, dataset_name: str) -> Path:
+        return self.data_dir / dataset_name / VERSIONS_DIR
+
+    def _manifest_path(self, dataset_name: str, version: int) -> Path:
+        return self._versions_dir(dataset_name) / f"{version}.json"
+
+    def _chunk_path(self, dataset_name: str, chunk_hash: str) -> Path:
+        return self._versions_dir(dataset_name) / "chunks" / chunk_hash[:2] / f"{chunk_hash}{self.backend.extension}"
+
+    def _put_chunk(self, dataset_name: str, chunk: pd.DataFrame, row_hashes: np.ndarray) -> Tuple[str, int]:
+        """
+        Store a chunk unless one with the same content already is.
+
+        Returns:
+            Tuple of (content hash, bytes written - 0 if it was already stored)
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in chunk.dtypes.items()]).encode())
+        digest.update(np.ascontiguousarray(row_hashes).tobytes())
+        chunk_hash = digest.hexdigest()[:40]
+
+        path = self._chunk_path(dataset_name, chunk_hash)
+        if path.exists():
+            return chunk_hash, 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        self.backend.write(chunk, tmp_path)
+        os.replace(tmp_path, path)
+        return chunk_hash, path.stat().st_size
+
+    def _read_chunk(self, dataset_name: str, chunk_hash: str) -> pd.DataFrame:
+        return self.backend.read(self._chunk_path(dataset_name, chunk_hash))
+
+    def _write_manifest(self, dataset_name: str, manifest: Dict) -> None:
+        path = self._manifest_path(dataset_name, manifest["version"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
@@ -1,13 +1,38 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
+import numpy as np
 import pandas as pd
 import os
+import time
 from pathlib import Path
-from typing import Optional, List
-from sklearn.preprocessing import LabelEncoder
+from typing import Any, Callable, Dict, Optional, List, Tuple
+from matplotlib.colors import LogNorm
+from encoding_cache import ColumnEncoding, encode_column
+from correlation import correlation_matrix, top_pairs, truncate_matrix
+from parallel import map_processes
+from result_cache import MISSING
+from statistics_engine import categorical_columns
+
+# Resolution plots are saved at
+PLOT_DPI = 300
+
+# Most scatter plots visualize-all plans (the most correlated pairs of numerical columns first)
+MAX_SCATTER_PAIRS = 20
+
+# Heatmaps show at most this many columns (the most correlated ones, clustered),
+# and print the correlation in each cell up to HEATMAP_ANNOTATE_COLUMNS columns
+MAX_HEATMAP_COLUMNS = 40
+HEATMAP_ANNOTATE_COLUMNS = 20
+
+# Scatter plots of more rows than this are drawn as a density image instead of one marker per point
+DENSITY_SCATTER_ROWS = 100_000
+DENSITY_GRID_SIZE = 400
+DENSITY_CHUNK_ROWS = 1_000_000
+
 
 class Visualizer:
-    def __init__(self, dataset_manager, data_explorer, graphs_dir="graphs"):
+    def __init__(self, dataset_manager, data_explorer, graphs_dir="graphs",
+                 density_threshold: Optional[int] = DENSITY_SCATTER_ROWS):
         """
         Initialize the Visualizer with dataset manager and data explorer.
         
@@ -15,10 +40,19 @@ class Visualizer:
             dataset_manager: Instance of DatasetManager
             data_explorer: Instance of DataExplorer
             graphs_dir: Directory to save generated plots
+            density_threshold: Scatter plots of more rows than this are drawn as
+                density images (None to always draw every point)
         """
         self.dataset_manager = dataset_manager
         self.data_explorer = data_explorer
         self.graphs_dir = graphs_dir
+        self.density_threshold = density_threshold
+        
+        # Saved plots are cached like analysis results: per dataset version, plot and options
+        self.render_cache = data_explorer.result_cache
+        
+        # Label encodings of categorical columns, shared with the models
+        self.encoding_cache = data_explorer.encoding_cache
         
         Path(self.graphs_dir).mkdir(parents=True, exist_ok=True)
         
@@ -39,6 +73,11 @@ class Visualizer:
         Returns:
             str: Path to the saved plot file
         """
+        plot = {"kind": "histogram", "columns": [column_name], "bins": bins}
+        filepath = self._cached_plot(dataset_name, plot)
+        if filepath is not None:
+            return filepath
+        
         df = self.dataset_manager.get_dataset(dataset_name)
         if df is None:
             raise ValueError(f"Dataset '{dataset_name}' not found")
@@ -50,20 +89,7 @@ class Visualizer:
         if not pd.api.types.is_numeric_dtype(df[column_name]):
             raise ValueError(f"Column '{column_name}' is not numerical")
         
-        plt.figure(figsize=(10, 6))
-        plt.hist(df[column_name].dropna(), bins=bins, edgecolor='black', alpha=0.7)
-        plt.title(f'Histogram of {column_name} in {dataset_name}')
-        plt.xlabel(column_name)
-        plt.ylabel('Frequency')
-        plt.grid(True, alpha=0.3)
-        
-        # Save plot
-        filename = f"{dataset_name}_{column_name}_histogram.png"
-        filepath = os.path.join(self.graphs_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(dataset_name, plot, self._histogram_job(df, dataset_name, column_name, bins))
 
     
     
@@ -79,6 +105,11 @@ class Visualizer:
         Returns:
             str: Path to the saved plot file
         """
+        plot = {"kind": "bar_chart", "columns": [column_name], "top_n": top_n}
+        filepath = self._cached_plot(dataset_name, plot)
+        if filepath is not None:
+            return filepath
+        
         df = self.dataset_manager.get_dataset(dataset_name)
         if df is None:
             raise ValueError(f"Dataset '{dataset_name}' not found")
@@ -87,52 +118,73 @@ class Visualizer:
             raise ValueError(f"Column '{column_name}' not found in dataset")
         
         # Check if column is categorical
-        if not (pd.api.types.is_categorical_dtype(df[column_name])) or (pd.api.types.is_object_dtype(df[column_name])):
+        if column_name not in categorical_columns(df):
             raise ValueError(f"Warning: Column '{column_name}' appears to be numeric. Bar charts work best with categorical data!")
         
-        
-        # Get value counts
-        value_counts = df[column_name].value_counts().head(top_n)
-        
-        plt.figure(figsize=(12, 6))
-        bars = plt.bar(range(len(value_counts)), value_counts.values, alpha=0.7)
-        plt.title(f'Top {top_n} Categories in {column_name} ({dataset_name})')
-        plt.xlabel('Categories')
-        plt.ylabel('Count')
-        plt.xticks(range(len(value_counts)), value_counts.index, rotation=45, ha='right')
-        
-        plt.tight_layout()
-        
-        # Save plot
-        filename = f"{dataset_name}_{column_name}_barchart.png"
-        filepath = os.path.join(self.graphs_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._render(dataset_name, plot, self._bar_chart_job(df, dataset_name, column_name, top_n))
 
     
     
     
-    def create_heatmap(self, dataset_name: str, columns: Optional[List[str]] = None) -> str:
+    def create_heatmap(self, dataset_name: str, columns: Optional[List[str]] = None,
+                       max_columns: Optional[int] = MAX_HEATMAP_COLUMNS, n_workers: int = 1) -> str:
         """
         Create a correlation heatmap for numerical and categorical columns.
         Categorical columns are automatically encoded using label encoding.
         
+        The matrix comes from the blockwise correlation engine (see
+        correlation.py). A table wider than max_columns can't be read as a
+        heatmap, so only the max_columns columns with the strongest
+        correlations are shown, clustered so related columns sit together.
+        
         Args:
             dataset_name: Name of the dataset
             columns: List of columns to include (if None, uses all columns)
+            max_columns: Most columns to show (None to show them all)
+            n_workers: Number of threads computing the correlations
             
         Returns:
             str: Path to the saved plot file
         """
+        plot = {"kind": "heatmap", "columns": columns, "max_columns": max_columns}
+        filepath = self._cached_plot(dataset_name, plot)
+        if filepath is not None:
+            return filepath
+        
         df = self.dataset_manager.get_dataset(dataset_name)
         if df is None:
             raise ValueError(f"Dataset '{dataset_name}' not found")
         
-        # Create a copy for encoding
-        df_encoded = df.copy()
+        return self._render(dataset_name, plot,
+                            self._heatmap_job(df, dataset_name, columns, max_columns, n_workers))
+
+    def strongest_correlations(self, dataset_name: str, n: int = 10, columns: Optional[List[str]] = None,
+                               n_workers: int = 1) -> List[Tuple[str, str, float]]:
+        """
+        Get the most strongly correlated pairs of columns (categorical columns label encoded).
+        
+        Args:
+            dataset_name: Name of the dataset
+            n: Number of pairs
+            columns: List of columns to include (if None, uses all columns)
+            n_workers: Number of threads computing the correlations
+            
+        Returns:
+            List of (column, column, correlation), strongest (by absolute value) first
+        """
+        df = self.dataset_manager.get_dataset(dataset_name)
+        if df is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+        return top_pairs(self._correlation_matrix(df, columns, n_workers, dataset_name), n)
+
+    def _correlation_matrix(self, df: pd.DataFrame, columns: Optional[List[str]] = None,
+                            n_workers: int = 1, dataset_name: Optional[str] = None) -> pd.DataFrame:
+        """
+        Correlation matrix of the columns, with categorical columns label encoded.
         
+        The codes come from the shared encoding cache (computed once per dataset
+        version) when df is the dataset `dataset_name`.
+        """
         # Get columns to use
         if columns is None:
             columns_to_use = df.columns.tolist()
@@ -142,46 +194,48 @@ class Visualizer:
         if len(columns_to_use) < 2:
             raise ValueError("Need at least 2 columns for correlation heatmap")
         
-        # Apply label encoding to categorical columns
-        le = LabelEncoder()
+        # Apply label encoding to categorical columns (only those are replaced, nothing else is copied)
+        df_encoded = df[columns_to_use].copy(deep=False)
         
         for col in columns_to_use:
             if df_encoded[col].dtype == 'object' or df_encoded[col].dtype.name == 'category':
-                # Handle missing values before encoding
-                df_encoded[col] = df_encoded[col].fillna('Missing')
-                df_encoded[col] = le.fit_transform(df_encoded[col].astype(str))
-        
-        # Calculate correlation matrix
-        corr_matrix = df_encoded[columns_to_use].corr()
+                # Missing values are encoded as the category "Missing"
+                if dataset_name is not None:
+                    df_encoded[col] = self.encoding_cache.codes(dataset_name, col, missing='Missing')
+                else:
+                    df_encoded[col] = ColumnEncoding(*encode_column(df[col])).with_missing_as('Missing')
         
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, 
-                   square=True, linewidths=0.5, cbar_kws={"shrink": .8}, fmt='.2f')
-        plt.title(f'Correlation Heatmap for {dataset_name}\n(Categorical columns encoded)')
-        plt.tight_layout()
-        
-        # Save plot
-        filename = f"{dataset_name}_correlation_heatmap.png"
-        filepath = os.path.join(self.graphs_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        # Calculate correlation matrix (blockwise, see correlation.py)
+        return correlation_matrix(df_encoded, n_workers=n_workers)
 
     
     
     
-    def create_scatter_plot(self, dataset_name: str, x_column: str, y_column: str) -> str:
+    def create_scatter_plot(self, dataset_name: str, x_column: str, y_column: str,
+                            density: Optional[bool] = None) -> str:
         """
         Create a scatter plot for two numerical columns.
         
+        With millions of rows, drawing a marker per point is slow, takes
+        gigabytes of memory and turns into an unreadable blob. Such plots
+        are drawn as a density image instead: the points are counted in a
+        DENSITY_GRID_SIZE x DENSITY_GRID_SIZE grid (see density_grid) and
+        each cell is colored by its count on a log scale, so the time to
+        draw doesn't grow with the number of rows.
+        
         Args:
             dataset_name: Name of the dataset
             x_column: Name of the column for the x-axis
             y_column: Name of the column for the y-axis
+            density: Draw a density image (defaults to doing so above density_threshold rows)
         Returns:
             str: Path to the saved plot file
         """
+        plot = {"kind": "scatter", "columns": [x_column, y_column], "density": density}
+        filepath = self._cached_plot(dataset_name, plot)
+        if filepath is not None:
+            return filepath
+        
         df = self.dataset_manager.get_dataset(dataset_name)
         if df is None:
             raise ValueError(f"Dataset '{dataset_name}' not found")
@@ -192,18 +246,368 @@ class Visualizer:
         if not pd.api.types.is_numeric_dtype(df[x_column]) or not pd.api.types.is_numeric_dtype(df[y_column]):
             raise ValueError(f"Both columns must be numeric for a scatter plot")
         
+        return self._render(dataset_name, plot, self._scatter_job(df, dataset_name, x_column, y_column, density))
+
+
+
+    def plan_plots(self, dataset_name: str, max_scatter_pairs: int = MAX_SCATTER_PAIRS) -> List[Dict[str, Any]]:
+        """
+        List every plot that applies to a dataset.
+        
+        That is a histogram per numerical column, a bar chart per categorical
+        column, the correlation heatmap (with 2 or more columns) and scatter
+        plots for pairs of numerical columns - the max_scatter_pairs most
+        correlated ones, since there are n * (n - 1) / 2 pairs in a wide dataset.
+        
+        Args:
+            dataset_name: Name of the dataset
+            max_scatter_pairs: Most scatter plots to include
+            
+        Returns:
+            List of plots as {"kind": ..., "columns": [...]} (kind is "histogram", "bar_chart",
+            "heatmap" or "scatter"; the heatmap's columns are None for all of them), to pass to render_all
+        """
+        df = self.dataset_manager.get_dataset(dataset_name)
+        if df is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+        
+        numeric_cols = list(df.select_dtypes(include="number").columns)
+        plots = [{"kind": "histogram", "columns": [col]} for col in numeric_cols]
+        plots += [{"kind": "bar_chart", "columns": [col]} for col in categorical_columns(df)]
+        if len(df.columns) >= 2:
+            plots.append({"kind": "heatmap", "columns": None})
+        
+        if len(numeric_cols) >= 2 and max_scatter_pairs > 0:
+            pairs = top_pairs(correlation_matrix(df[numeric_cols]), max_scatter_pairs)
+            plots += [{"kind": "scatter", "columns": [x, y]} for x, y, _ in pairs]
+        return plots
+
+    def render_all(self, dataset_name: str, plots: Optional[List[Dict[str, Any]]] = None,
+                   n_workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, int, Dict[str, Any], Optional[str], Optional[Exception]], None]] = None
+                   ) -> Dict[str, Any]:
+        """
+        Render many plots of a dataset at once, in a pool of processes.
+        
+        Saving a figure at 300 dpi is slow, pure-Python work, so the plots are
+        rendered by up to n_workers processes in parallel (with the
+        non-interactive Agg backend). The data each plot needs (histogram
+        counts, top categories, correlation matrix, points) is computed here
+        first, so only that is sent to the workers, not the dataset. At most
+        2 * n_workers plots are prepared ahead, which bounds the memory used.
+        A plot that fails is reported and the others still render. Plots that
+        are already saved for the current data (see _cached_plot) are not
+        rendered again.
+        
+        Args:
+            dataset_name: Name of the dataset
+            plots: The plots to render (defaults to plan_plots(dataset_name))
+            n_workers: Number of processes (defaults to the number of CPUs, at most one per plot)
+            progress: Optional function called as progress(done, total, plot, filepath, error)
+                after each plot finishes
+            
+        Returns:
+            Dict with "rendered" (file paths), "failed" ((plot, error message) pairs), "cached"
+            (how many of the rendered plots came from the render cache) and "seconds"
+        """
+        df = self.dataset_manager.get_dataset(dataset_name)
+        if df is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found")
+        if plots is None:
+            plots = self.plan_plots(dataset_name)
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        n_workers = max(1, min(n_workers, len(plots)))
+        
+        start = time.perf_counter()
+        summary = {"rendered": [], "failed": [], "cached": 0, "seconds": 0.0}
+        
+        # Cached plots and plots whose data can't be prepared are done here, the rest are sent to the workers
+        def jobs():
+            for plot in plots:
+                filepath = self._cached_plot(dataset_name, plot)
+                if filepath is not None:
+                    summary["cached"] += 1
+                    report(plot, filepath, None)
+                    continue
+                try:
+                    yield self._plot_job(df, dataset_name, plot)
+                except Exception as e:
+                    report(plot, None, e)
+        
+        def report(plot, filepath, error):
+            if error is None:
+                summary["rendered"].append(filepath)
+            else:
+                summary["failed"].append((plot, str(error)))
+            if progress is not None:
+                progress(len(summary["rendered"]) + len(summary["failed"]), len(plots), plot, filepath, error)
+        
+        for job, filepath, error in map_processes(render_plot, jobs(), n_workers, initializer=_use_agg_backend):
+            if error is None:
+                self._remember_plot(dataset_name, job["plot"], filepath)
+            report(job["plot"], filepath, error)
+        
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+
+
+    def _render(self, dataset_name: str, plot: Dict[str, Any], job: Dict[str, Any]) -> str:
+        """Render a prepared plot in this process and remember it in the render cache."""
+        filepath = render_plot(job)
+        self._remember_plot(dataset_name, plot, filepath)
+        return filepath
+
+    def _render_key(self, plot: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        The render cache operation and parameters of a plot: everything the image depends on
+        besides the data (defaults filled in, so equal plots get equal keys).
+        """
+        kind = plot["kind"]
+        columns = plot.get("columns")
+        params = {"columns": tuple(columns) if columns else None, "dpi": PLOT_DPI, "graphs_dir": str(self.graphs_dir)}
+        if kind == "histogram":
+            params["bins"] = plot.get("bins", 30)
+        elif kind == "bar_chart":
+            params["top_n"] = plot.get("top_n", 10)
+        elif kind == "heatmap":
+            params["max_columns"] = plot.get("max_columns", MAX_HEATMAP_COLUMNS)
+        elif kind == "scatter":
+            params["density"] = plot.get("density")
+            params["density_threshold"] = self.density_threshold
+        return f"plot_{kind}", params
+
+    def _cached_plot(self, dataset_name: str, plot: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the file of a plot rendered from the current version of the dataset, with the same options.
+        
+        The plot files are named after the dataset and columns only, so the
+        cache also keeps each file's modification time and size: if the file
+        was deleted, or overwritten since (e.g. by the same histogram with
+        other bins), it isn't returned.
+        
+        Returns:
+            Optional[str]: Path to the saved plot file, or None if it has to be rendered
+        """
+        operation, params = self._render_key(plot)
+        cached = self.render_cache.get(dataset_name, operation, params)
+        if cached is MISSING:
+            return None
+        filepath, stamp = cached
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return filepath if (stat.st_mtime_ns, stat.st_size) == stamp else None
+
+    def _remember_plot(self, dataset_name: str, plot: Dict[str, Any], filepath: str) -> None:
+        operation, params = self._render_key(plot)
+        stat = os.stat(filepath)
+        self.render_cache.put(dataset_name, operation, params, (filepath, (stat.st_mtime_ns, stat.st_size)))
+
+    def _plot_job(self, df: pd.DataFrame, dataset_name: str, plot: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare the data of a planned plot for render_plot (checking the columns like the create_* methods)."""
+        kind, columns = plot["kind"], plot.get("columns") or []
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' not found in dataset")
+        
+        if kind == "histogram":
+            if not pd.api.types.is_numeric_dtype(df[columns[0]]):
+                raise ValueError(f"Column '{columns[0]}' is not numerical")
+            job = self._histogram_job(df, dataset_name, columns[0], plot.get("bins", 30))
+        elif kind == "bar_chart":
+            if columns[0] not in categorical_columns(df):
+                raise ValueError(f"Column '{columns[0]}' is not categorical")
+            job = self._bar_chart_job(df, dataset_name, columns[0], plot.get("top_n", 10))
+        elif kind == "heatmap":
+            job = self._heatmap_job(df, dataset_name, columns or None, plot.get("max_columns", MAX_HEATMAP_COLUMNS))
+        elif kind == "scatter":
+            if not all(pd.api.types.is_numeric_dtype(df[col]) for col in columns):
+                raise ValueError("Both columns must be numeric for a scatter plot")
+            job = self._scatter_job(df, dataset_name, columns[0], columns[1], plot.get("density"))
+        else:
+            raise ValueError(f"Unknown plot type '{kind}'")
+        
+        job["plot"] = plot
+        return job
+
+    def _histogram_job(self, df: pd.DataFrame, dataset_name: str, column_name: str, bins: int) -> Dict[str, Any]:
+        # Bin here (one vectorized pass), so rendering only draws the bars
+        values = df[column_name].dropna().to_numpy(dtype="float64")
+        counts, edges = np.histogram(values, bins=bins)
+        return {
+            "kind": "histogram",
+            "filepath": os.path.join(self.graphs_dir, f"{dataset_name}_{column_name}_histogram.png"),
+            "dataset_name": dataset_name, "column_name": column_name,
+            "counts": counts, "edges": edges
+        }
+
+    def _bar_chart_job(self, df: pd.DataFrame, dataset_name: str, column_name: str, top_n: int) -> Dict[str, Any]:
+        return {
+            "kind": "bar_chart",
+            "filepath": os.path.join(self.graphs_dir, f"{dataset_name}_{column_name}_barchart.png"),
+            "dataset_name": dataset_name, "column_name": column_name, "top_n": top_n,
+            "value_counts": df[column_name].value_counts().head(top_n)
+        }
+
+    def _heatmap_job(self, df: pd.DataFrame, dataset_name: str, columns: Optional[List[str]],
+                     max_columns: Optional[int] = MAX_HEATMAP_COLUMNS, n_workers: int = 1) -> Dict[str, Any]:
+        corr_matrix = self._correlation_matrix(df, columns, n_workers, dataset_name)
+        return {
+            "kind": "heatmap",
+            "filepath": os.path.join(self.graphs_dir, f"{dataset_name}_correlation_heatmap.png"),
+            "dataset_name": dataset_name,
+            "corr_matrix": truncate_matrix(corr_matrix, max_columns),
+            "total_columns": len(corr_matrix)
+        }
+
+    def _scatter_job(self, df: pd.DataFrame, dataset_name: str, x_column: str, y_column: str,
+                     density: Optional[bool] = None) -> Dict[str, Any]:
+        job = {
+            "kind": "scatter",
+            "filepath": os.path.join(self.graphs_dir, f"{dataset_name}_{y_column}_vs_{x_column}_scatter.png"),
+            "dataset_name": dataset_name, "x_column": x_column, "y_column": y_column
+        }
+        if density is None:
+            density = self.density_threshold is not None and len(df) > self.density_threshold
+        
+        if density:
+            # Only the grid of counts is kept (and sent to a worker), not the points
+            job["grid"], job["extent"] = density_grid(df[x_column], df[y_column])
+            job["points"] = int(job["grid"].sum())
+        else:
+            job["x"] = df[x_column].to_numpy(dtype="float64", na_value=np.nan)
+            job["y"] = df[y_column].to_numpy(dtype="float64", na_value=np.nan)
+        return job
+
+
+
+def density_grid(x: pd.Series, y: pd.Series, size: int = DENSITY_GRID_SIZE,
+                 chunk_rows: int = DENSITY_CHUNK_ROWS) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+    """
+    Count how many (x, y) points fall in each cell of a size x size grid.
+    
+    The points are binned chunk_rows at a time with vectorized NumPy (each
+    point's cell index, then one bincount), so only one chunk is converted
+    to float64 at a time. Points with a missing coordinate are skipped.
+    
+    Args:
+        x, y: The coordinates
+        size: Cells along each axis
+        chunk_rows: Points binned at a time
+        
+    Returns:
+        Tuple of (counts, with x along the first axis, and (x_min, x_max, y_min, y_max))
+    """
+    # Pass 1: the extent of the grid (min/max skip missing values without converting anything)
+    x_min, x_max, y_min, y_max = (float(v) if pd.notna(v) else 0.0 for v in (x.min(), x.max(), y.min(), y.max()))
+    if x_max <= x_min:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    if y_max <= y_min:
+        y_min, y_max = y_min - 0.5, y_max + 0.5
+    x_scale, y_scale = size / (x_max - x_min), size / (y_max - y_min)
+    
+    # Pass 2: count the points per cell, a chunk at a time
+    counts = np.zeros(size * size, dtype=np.int64)
+    for start in range(0, len(x), chunk_rows):
+        xs = x.iloc[start:start + chunk_rows].to_numpy(dtype="float64", na_value=np.nan)
+        ys = y.iloc[start:start + chunk_rows].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~(np.isnan(xs) | np.isnan(ys))
+        # The maximum lands on the grid's last cell, not one past it
+        xi = np.minimum(((xs[valid] - x_min) * x_scale).astype(np.int64), size - 1)
+        yi = np.minimum(((ys[valid] - y_min) * y_scale).astype(np.int64), size - 1)
+        counts += np.bincount(xi * size + yi, minlength=size * size)
+    
+    return counts.reshape(size, size), (x_min, x_max, y_min, y_max)
+
+
+
+def render_plot(job: Dict[str, Any]) -> str:
+    """
+    Draw a prepared plot and save it (runs in the worker processes of render_all).
+    
+    Args:
+        job: The plot's data, from one of Visualizer's _*_job methods
+        
+    Returns:
+        str: Path to the saved plot file
+    """
+    kind = job["kind"]
+    dataset_name = job["dataset_name"]
+    
+    if kind == "histogram":
+        counts, edges = job["counts"], job["edges"]
+        column_name = job["column_name"]
+        plt.figure(figsize=(10, 6))
+        plt.hist(edges[:-1], bins=edges, weights=counts, edgecolor='black', alpha=0.7)
+        plt.title(f'Histogram of {column_name} in {dataset_name}')
+        plt.xlabel(column_name)
+        plt.ylabel('Frequency')
+        plt.grid(True, alpha=0.3)
+    
+    elif kind == "bar_chart":
+        value_counts = job["value_counts"]
+        plt.figure(figsize=(12, 6))
+        plt.bar(range(len(value_counts)), value_counts.values, alpha=0.7)
+        plt.title(f'Top {job["top_n"]} Categories in {job["column_name"]} ({dataset_name})')
+        plt.xlabel('Categories')
+        plt.ylabel('Count')
+        plt.xticks(range(len(value_counts)), value_counts.index, rotation=45, ha='right')
+        plt.tight_layout()
+    
+    elif kind == "heatmap":
+        corr_matrix = job["corr_matrix"]
+        shown = len(corr_matrix)
+        # Wide matrices get a bigger figure and no numbers in the cells
+        size = max(12, shown * 0.35)
+        plt.figure(figsize=(size, size * 10 / 12))
+        sns.heatmap(corr_matrix, annot=shown <= HEATMAP_ANNOTATE_COLUMNS, cmap='coolwarm', center=0,
+                   square=True, linewidths=0.5 if shown <= HEATMAP_ANNOTATE_COLUMNS else 0,
+                   cbar_kws={"shrink": .8}, fmt='.2f', xticklabels=True, yticklabels=True)
+        if shown < job.get("total_columns", shown):
+            plt.title(f'Correlation Heatmap for {dataset_name}\n(Categorical columns encoded; '
+                      f'{shown} most correlated of {job["total_columns"]} columns, clustered)')
+        else:
+            plt.title(f'Correlation Heatmap for {dataset_name}\n(Categorical columns encoded)')
+        plt.tight_layout()
+    
+    elif kind == "scatter" and "grid" in job:
+        x_column, y_column = job["x_column"], job["y_column"]
         plt.figure(figsize=(10, 6))
-        plt.scatter(df[x_column], df[y_column], alpha=0.7)
+        # Empty cells stay blank, the others are colored by count on a log scale
+        grid = np.ma.masked_equal(job["grid"].T, 0)
+        plt.imshow(grid, origin='lower', extent=job["extent"], aspect='auto', interpolation='nearest',
+                   cmap='viridis', norm=LogNorm(vmin=1, vmax=max(int(job["grid"].max()), 1)))
+        plt.colorbar(label='Points per cell')
+        plt.title(f'Scatter Plot of {y_column} vs {x_column} in {dataset_name}\n(density of {job["points"]:,} points)')
+        plt.xlabel(x_column)
+        plt.ylabel(y_column)
+        plt.tight_layout()
+    
+    elif kind == "scatter":
+        x_column, y_column = job["x_column"], job["y_column"]
+        plt.figure(figsize=(10, 6))
+        plt.scatter(job["x"], job["y"], alpha=0.7)
         plt.title(f'Scatter Plot of {y_column} vs {x_column} in {dataset_name}')
         plt.xlabel(x_column)
         plt.ylabel(y_column)
         plt.grid(True, alpha=0.3)
         plt.tight_layout()
-        
-        # Save plot
-        filename = f"{dataset_name}_{y_column}_vs_{x_column}_scatter.png"
-        filepath = os.path.join(self.graphs_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
+    
+    else:
+        raise ValueError(f"Unknown plot type '{kind}'")
+    
+    # Save plot
+    filepath = job["filepath"]
+    try:
+        plt.savefig(filepath, dpi=PLOT_DPI, bbox_inches='tight')
+    finally:
         plt.close()
-        
-        return filepath 
\ No newline at end of file
+    return filepath
+
+
+def _use_agg_backend() -> None:
+    """Render with the non-interactive Agg backend (worker processes never show windows)."""
+    plt.switch_backend("Agg")
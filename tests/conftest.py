@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules in src/ import each other by name, like main.py does when run from there
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
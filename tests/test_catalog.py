@@ -0,0 +1,30 @@
+import pandas as pd
+from dataset_manager import DatasetManager
+
+
+def write_csv(path, rows):
+    pd.DataFrame({"v": range(rows)}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_writes_keep_changes_from_other_managers(tmp_path):
+    data_dir = str(tmp_path / "data")
+    a = DatasetManager(data_dir=data_dir)
+    b = DatasetManager(data_dir=data_dir)
+    assert a.load_dataset(write_csv(tmp_path / "x.csv", 3), "x")
+    assert a.get_dataset("x") is not None
+
+    # Each change by b is followed by a write of a's own before a looks again
+    assert b.load_dataset(write_csv(tmp_path / "y.csv", 2), "y")
+    assert a.load_dataset(write_csv(tmp_path / "z.csv", 1), "z")
+    assert a.get_dataset("y") is not None
+
+    assert b.get_dataset("x") is not None
+    assert b.update_dataset("x", pd.DataFrame({"v": range(5)}))
+    assert a.load_dataset(write_csv(tmp_path / "w.csv", 1), "w")
+    assert len(a.get_dataset("x")) == 5
+    assert a.dataset_version("x") == b.dataset_version("x")
+
+    assert b.remove_dataset("y")
+    assert a.remove_dataset("w")
+    assert "y" not in dict(a.list_datasets())
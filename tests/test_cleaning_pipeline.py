@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from cleaning_pipeline import CleaningPipeline
+
+
+class InMemoryDatasets:
+    """Just enough of DatasetManager for CleaningPipeline.run()."""
+
+    def __init__(self, df):
+        self.df = df
+
+    def get_dataset(self, dataset_name):
+        return self.df
+
+    def dataset_version(self, dataset_name):
+        return 1
+
+
+def pipeline(df):
+    return CleaningPipeline(InMemoryDatasets(df), "test")
+
+
+def test_drop_stays_after_dedup_on_subset():
+    df = pd.DataFrame({"k": [1, 1, 2], "x": [np.nan, 5, 6]})
+    result = pipeline(df).remove_duplicates(["k"]).drop_missing().run()
+    assert result["k"].tolist() == [2]
+
+
+def test_drop_stays_after_mean_fill():
+    df = pd.DataFrame({"a": [1.0, 100.0, np.nan], "e": ["x", None, "y"]})
+    result = pipeline(df).fill_mean(["a"]).drop_missing(["e"]).run()
+    assert result["a"].tolist() == [1.0, 50.5]
+
+
+def test_impute_drop_stays_after_mean_fill():
+    df = pd.DataFrame({"a": [1.0, 100.0, np.nan], "e": ["x", None, "y"]})
+    result = pipeline(df).fill_mean(["a"]).impute({"e": "drop"}).run()
+    assert result["a"].tolist() == [1.0, 50.5]
+
+
+def test_drop_moves_ahead_of_full_dedup():
+    df = pd.DataFrame({"a": [1.0, 1.0, np.nan], "b": ["x", "x", "y"]})
+    p = pipeline(df).remove_duplicates().drop_missing(["a"])
+    assert [kind for kind, _ in p.plan(df)] == ["drop", "dedup"]
+    assert p.run()["a"].tolist() == [1.0]
+
+
+def test_second_fill_fills_what_the_first_left():
+    # The median of a column with no values is missing, so the constant fill still has work to do
+    df = pd.DataFrame({"k": [np.nan, np.nan], "e": ["x", "y"]})
+    result = pipeline(df).impute({"k": "median"}).impute({"k": "constant"}, {"k": -1}).run()
+    assert result["k"].tolist() == [-1, -1]
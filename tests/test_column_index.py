@@ -0,0 +1,18 @@
+import pandas as pd
+from column_index import IndexManager
+from dataset_manager import DatasetManager
+
+
+def test_index_is_rebuilt_when_used_after_append(tmp_path):
+    manager = DatasetManager(data_dir=str(tmp_path / "data"))
+    indexes = IndexManager(manager)
+    pd.DataFrame({"v": [1, 2, 3, 4, 5]}).to_csv(tmp_path / "d.csv", index=False)
+    assert manager.load_dataset(str(tmp_path / "d.csv"), "d")
+    assert indexes.create_index("d", "v", "sorted")
+    assert indexes.lookup("d", [("v", ">", 3)])[0].tolist() == [3, 4]
+
+    # The append only throws the old index away, the next lookup builds the new one
+    assert manager.append_rows("d", pd.DataFrame({"v": [10]}))
+    assert not (indexes._index_dir("d", "v") / "meta.pkl").exists()
+    assert indexes.lookup("d", [("v", ">", 3)])[0].tolist() == [3, 4, 5]
+    assert (indexes._index_dir("d", "v") / "meta.pkl").exists()
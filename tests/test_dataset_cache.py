@@ -0,0 +1,18 @@
+import pandas as pd
+from dataset_manager import DatasetManager
+
+
+def test_pinned_dataset_stays_pinned_after_append(tmp_path):
+    manager = DatasetManager(data_dir=str(tmp_path / "data"), memory_budget_mb=0.001)
+    for name in ("a", "b"):
+        pd.DataFrame({"v": range(200)}).to_csv(tmp_path / f"{name}.csv", index=False)
+    assert manager.load_dataset(str(tmp_path / "a.csv"), "a")
+    assert manager.pin_dataset("a")
+
+    assert manager.append_rows("a", pd.DataFrame({"v": [200]}))
+    assert len(manager.get_dataset("a")) == 201
+
+    # "b" alone is over the budget, so anything unpinned is evicted
+    assert manager.load_dataset(str(tmp_path / "b.csv"), "b")
+    assert manager.get_dataset("b") is not None
+    assert "a" in manager.datasets
@@ -0,0 +1,57 @@
+import pandas as pd
+from dataset_manager import DatasetManager
+from version_store import VersionRecorder, VersionStore
+
+
+def write_csv(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_append_file_keeps_stored_column_types(tmp_path):
+    manager = DatasetManager(data_dir=str(tmp_path / "data"))
+    assert manager.load_dataset(write_csv(tmp_path / "codes.csv", "code,n\nA1,1\nB2,2\n"), "codes")
+
+    # On its own the appended file would read code as numbers
+    new_rows = write_csv(tmp_path / "more.csv", "code,n\n0042,3\n12345,4\n")
+    assert manager.append_file(new_rows, "codes")
+    assert manager.append_file(new_rows, "codes", chunksize=1)
+    assert manager.get_dataset("codes")["code"].tolist() == ["A1", "B2", "0042", "12345", "0042", "12345"]
+
+
+def test_versioning_is_off_by_default(tmp_path):
+    manager = DatasetManager(data_dir=str(tmp_path / "data"))
+    assert manager.load_dataset(write_csv(tmp_path / "d.csv", "v\n1\n2\n"), "d")
+    assert manager.version_store is None
+    assert not (tmp_path / "data" / "d" / "_versions").exists()
+
+
+def test_failing_version_recording_only_warns(tmp_path, monkeypatch, capsys):
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(VersionRecorder, "close", fail)
+    monkeypatch.setattr(VersionStore, "append_recorder", fail)
+    manager = DatasetManager(data_dir=str(tmp_path / "data"), versioning=True)
+
+    assert manager.load_dataset(write_csv(tmp_path / "d.csv", "v\n1\n2\n3\n"), "d", chunksize=2)
+    assert manager.append_rows("d", pd.DataFrame({"v": [4]}))
+    assert manager.get_dataset("d")["v"].tolist() == [1, 2, 3, 4]
+    assert capsys.readouterr().out.count("Warning: could not record version of 'd': disk full") == 2
+
+
+def test_memory_map_reopens_cached_dataset(tmp_path):
+    manager = DatasetManager(data_dir=str(tmp_path / "data"), storage_format="feather")
+    assert manager.load_dataset(write_csv(tmp_path / "d.csv", "v\n1\n2\n"), "d")
+    assert manager.pin_dataset("d")
+    assert manager.update_dataset("d", pd.DataFrame({"v": [1, 2, 3]}), persist=False)
+    cached = manager.get_dataset("d")
+    assert not manager._is_memory_mapped("d", cached)
+
+    # Unsaved changes are written first, then the file is opened memory-mapped
+    mapped = manager.get_dataset("d", memory_map=True)
+    assert mapped is not cached and manager._is_memory_mapped("d", mapped)
+    assert mapped["v"].tolist() == [1, 2, 3]
+    assert manager.datasets.is_pinned("d")
+    assert manager.get_dataset("d", memory_map=True) is mapped
+    assert not manager._is_memory_mapped("d", manager.get_dataset("d", memory_map=False))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from dedup import StreamingDeduplicator, row_fingerprints
+
+
+def keep_mask(chunks):
+    dedup = StreamingDeduplicator()
+    try:
+        for chunk in chunks:
+            dedup.add(chunk)
+        return dedup.keep_mask()
+    finally:
+        dedup.close()
+
+
+def test_large_int64_ids_stay_distinct():
+    # These are all equal once converted to float64
+    df = pd.DataFrame({"id": np.array([1500000000000000001, 1500000000000000002, 1500000000000000003],
+                                      dtype="int64")})
+    assert not df.duplicated().any()
+    assert keep_mask([df]).all()
+
+
+def test_int_and_float_chunks_match():
+    ints = pd.DataFrame({"x": np.array([1, 2], dtype="int64"), "y": ["a", "b"]})
+    floats = pd.DataFrame({"x": [1.0, np.nan, 2.5], "y": ["a", "b", "c"]})
+    assert keep_mask([ints, floats]).tolist() == [True, True, False, True, True]
+
+
+def test_missing_values_differ_from_zero():
+    df = pd.DataFrame({"x": pd.array([0, None, 0], dtype="Int64")})
+    fingerprints = row_fingerprints(df)
+    assert fingerprints[0] != fingerprints[1]
+    assert fingerprints[0] == fingerprints[2]
+    assert fingerprints[1] == row_fingerprints(pd.DataFrame({"x": [np.nan]}))[0]
@@ -0,0 +1,13 @@
+import pandas as pd
+from storage import infer_csv_dtypes, read_csv_chunks
+
+
+def test_int_column_empty_in_one_chunk_reads_as_float(tmp_path):
+    path = tmp_path / "gaps.csv"
+    path.write_text("n,s\n1,a\n2,b\n,c\n,d\n")
+    assert infer_csv_dtypes(path, chunksize=2)["n"] == "float64"
+
+    chunks = list(read_csv_chunks(path, chunksize=2))
+    whole = pd.read_csv(path)
+    assert [chunk["n"].dtype for chunk in chunks] == [whole["n"].dtype] * 2
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)